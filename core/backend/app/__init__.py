@@ -1,22 +1,71 @@
 from fastapi import FastAPI
 from app.api.v1.endpoints.user import router as users_router
 from app.api.v1.endpoints.branch import router as branches_router
-from app.db.session import create_tables
-from apscheduler.schedulers.background import BackgroundScheduler
-from app.tasks import clean_unverified_users
+from app.api.v1.endpoints.notification import router as notifications_router
+from app.api.v1.endpoints.chat import router as chat_router
+from app.api.v1.endpoints.resource import router as resources_router
+from app.db.session import create_tables, async_engine
+from app.config import settings
+from app.scheduler import create_scheduler
+from app.utils.helpers import hashing_executor
+from app.services.email_outbox import EmailOutboxWorker
+from app.services.chat_gateway import chat_gateway
+from app.security.principal import principal_invalidations
+from app.metrics import MetricsMiddleware, configure_sql_logging, metrics_response
+from app.profiling import QueryProfilerMiddleware
+import asyncio
 
 def create_app():
   app = FastAPI(title="Experts API", version="0.1.0")
-  create_tables()
+  configure_sql_logging()
+  if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+  if settings.QUERY_PROFILER_ENABLED and settings.ENV != "production":
+    app.add_middleware(QueryProfilerMiddleware)
+  # En producción el esquema lo gestiona Alembic (alembic upgrade head)
+  if settings.ENV != "production":
+    create_tables()
   app.include_router(users_router, prefix="/api/v1/users", tags=["Usuarios"])
   app.include_router(branches_router, prefix="/api/v1/branches", tags=["Sedes"])
+  app.include_router(notifications_router, prefix="/api/v1/notifications", tags=["Notificaciones"])
+  app.include_router(chat_router, prefix="/api/v1/chat", tags=["Chat"])
+  app.include_router(resources_router, prefix="/api/v1/resources", tags=["Recursos"])
 
-  scheduler = BackgroundScheduler()
-  scheduler.add_job(clean_unverified_users, 'interval', minutes=1)
-  scheduler.start()
+  # Solo el líder del clúster ejecuta los jobs; se puede desactivar si corre como proceso aparte
+  scheduler = create_scheduler()
+  if settings.SCHEDULER_ENABLED:
+    scheduler.start()
+
+  email_worker = EmailOutboxWorker()
+
+  @app.on_event("startup")
+  async def startup():
+    app.state.email_worker_task = asyncio.create_task(email_worker.run())
+    await chat_gateway.start()
+    await principal_invalidations.start()
+
+  @app.on_event("shutdown")
+  async def shutdown():
+    scheduler.shutdown()
+    await chat_gateway.stop()
+    await principal_invalidations.stop()
+    email_worker.stop()
+    app.state.email_worker_task.cancel()
+    try:
+      await app.state.email_worker_task
+    except asyncio.CancelledError:
+      # Cancelado antes de llegar a su propio manejo (p. ej. durante el backoff tras un error)
+      pass
+    await async_engine.dispose()
+    hashing_executor.shutdown(wait=False)
 
   @app.get("/api/v1/health", tags=["Health"])
   async def health():
     return {"status": "ok"}
 
+  if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+      return metrics_response()
+
   return app
\ No newline at end of file
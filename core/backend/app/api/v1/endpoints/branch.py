@@ -1,44 +1,70 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlmodel import Session
-from uuid import uuid4
-from app.schemas.models import Branch, User
-from app.schemas.enum import BranchStatus
-from app.schemas.schemas import BranchCreate
-from app.db.session import get_session
+from fastapi import APIRouter, Depends, File, Header, Query, Request, Response, UploadFile, status, HTTPException
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID, uuid4
+from app.schemas.models import Branch
+from app.schemas.enum import BranchStatus, ResourceTransferStatus
+from app.schemas.schemas import (
+  BranchCreate, BranchRead, BranchSummaryRead, CursorPage, Principal, ResourceTransferCreate, ResourceTransferRecordRead
+)
+from app.services.transfers import transfer_resources
+from app.services.resource_import import import_resources
+from app.services.branch_summary import get_branch_summary
+from app.services.transfer_history import list_transfer_records
+from app.services.branch_cache import (
+  branch_cache_stats, branch_last_modified, get_branch_catalog, get_branch_json, invalidate_branch_cache
+)
+from app.db.session import get_session, get_redis
 from app.security.dependencies import get_current_admin
+from app.utils.export import export_response
+from app.utils.responses import FastJSONResponse
+from app.utils.conditional import is_not_modified, not_modified_response, validator_headers
 from sqlmodel import select
 from datetime import datetime, timezone
+from typing import Literal, Optional
 
 router = APIRouter()
 
-@router.get("/", response_model=list)
+@router.get("/", response_model=list[BranchRead])
 async def get_all_branches(
-  session: Session = Depends(get_session),
-  _: User = Depends(get_current_admin)
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  _: Principal = Depends(get_current_admin)
 ):
-  branches = session.exec(select(Branch)).all()
-
-  result = []
-  for branch in branches:
-    result.append({
-      "id": str(branch.id),
-      "name": branch.name,
-      "address": branch.address,
-      "city": branch.city,
-      "state": branch.state,
-      "country": branch.country,
-      "status": branch.status,
-      "created_at": branch.created_at,
-      "updated_at": branch.updated_at,
-    })
-
-  return result
+  # JSON ya serializado desde Redis; PostgreSQL solo tras una escritura o al expirar la entrada
+  return Response(content=await get_branch_catalog(session, redis), media_type="application/json")
+
+@router.get("/cache/stats", response_model=dict)
+async def get_branch_cache_stats(
+  redis: Redis = Depends(get_redis),
+  _: Principal = Depends(get_current_admin)
+):
+  return branch_cache_stats(redis)
+
+BRANCH_EXPORT_COLUMNS = [
+  "id", "name", "address", "city", "state", "country", "status", "created_at", "updated_at",
+]
+
+@router.get("/export")
+async def export_branches(
+  format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+  _: Principal = Depends(get_current_admin)
+):
+  stmt = (
+    select(
+      Branch.id, Branch.name, Branch.address, Branch.city, Branch.state,
+      Branch.country, Branch.status, Branch.created_at, Branch.updated_at,
+    )
+    .order_by(Branch.created_at, Branch.id)
+  )
+  return export_response(stmt, BRANCH_EXPORT_COLUMNS, format, "branches")
 
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create_branch(
   branch_data: BranchCreate,
-  session: Session = Depends(get_session),
-  admin_user: User = Depends(get_current_admin)
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  admin_user: Principal = Depends(get_current_admin)
 ):
   if not all([branch_data.name, branch_data.address, branch_data.city, branch_data.state]):
     raise HTTPException(
@@ -59,33 +85,126 @@ async def create_branch(
   )
 
   session.add(new_branch)
-  session.commit()
-  session.refresh(new_branch)
+  await session.commit()
+  await session.refresh(new_branch)
+  invalidate_branch_cache(redis)
 
   return {"message": "Branch created successfully"}
 
-@router.get("/{branch_id}", response_model=Branch)
-async def get_branch_by_id(
-  branch_id: str,
-  session: Session = Depends(get_session),
-  _: User = Depends(get_current_admin)
+@router.post("/transfer-resources", status_code=status.HTTP_200_OK)
+async def transfer_resources_bulk(
+  transfer_data: ResourceTransferCreate,
+  idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+  session: AsyncSession = Depends(get_session),
+  admin_user: Principal = Depends(get_current_admin)
+):
+  # Una sola transacción para todo el lote; reintentos con la misma Idempotency-Key no repiten el movimiento
+  result = await transfer_resources(
+    session, admin_user.id, transfer_data.to_branch_id, transfer_data.resource_ids,
+    transfer_data.status, idempotency_key
+  )
+  return {"message": "Transferencia procesada.", **result}
+
+@router.post("/transfer-resource/{resource_id}", status_code=status.HTTP_200_OK)
+async def transfer_resource(
+  resource_id: UUID,
+  to_branch_id: UUID,
+  idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+  session: AsyncSession = Depends(get_session),
+  admin_user: Principal = Depends(get_current_admin)
 ):
-  branch = session.get(Branch, branch_id)
+  result = await transfer_resources(
+    session, admin_user.id, to_branch_id, [resource_id], ResourceTransferStatus.RECEIVED, idempotency_key
+  )
+  if not result["transferred"]:
+    raise HTTPException(
+      status_code=status.HTTP_409_CONFLICT,
+      detail="El recurso no existe, ya está en la sucursal de destino o está siendo transferido."
+    )
+  return {"message": "Transferencia procesada.", **result}
+
+@router.post("/{branch_id}/resources/import", status_code=status.HTTP_200_OK)
+async def import_branch_resources(
+  branch_id: UUID,
+  file: UploadFile = File(..., description="CSV con cabecera o NDJSON (un objeto por línea)"),
+  session: AsyncSession = Depends(get_session),
+  admin_user: Principal = Depends(get_current_admin)
+):
+  branch = await session.get(Branch, branch_id)
   if not branch:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail="Branch not found"
     )
-  return branch
 
-@router.put("/update/{branch_id}", status_code=status.HTTP_200_OK)
+  # Validación por bloques + COPY a una tabla de staging + merge en una sola transacción
+  report = await import_resources(session, file, branch.id, branch.business_id, admin_user.id)
+  return {"message": "Importación procesada.", **report}
+
+@router.get("/{branch_id}/summary", response_model=BranchSummaryRead)
+async def get_branch_summary_by_id(
+  branch_id: UUID,
+  session: AsyncSession = Depends(get_session),
+  _: Principal = Depends(get_current_admin)
+):
+  summary = await get_branch_summary(session, branch_id)
+  if not summary:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Branch not found"
+    )
+  return summary
+
+@router.get("/{branch_id}/transfer-records/", response_model=CursorPage[ResourceTransferRecordRead])
+async def get_branch_transfer_records(
+  branch_id: UUID,
+  direction: Optional[Literal["sent", "received"]] = None,
+  transfer_status: Optional[ResourceTransferStatus] = Query(None, alias="status"),
+  created_from: Optional[datetime] = None,
+  created_to: Optional[datetime] = None,
+  counterparty_branch_id: Optional[UUID] = None,
+  cursor: Optional[str] = None,
+  limit: int = Query(50, ge=1, le=200),
+  session: AsyncSession = Depends(get_session),
+  _: Principal = Depends(get_current_admin)
+):
+  # Enviadas y recibidas se leen por separado con keyset sobre (created_at, id) y se mezclan en SQL
+  items, next_cursor = await list_transfer_records(
+    session, branch_id, direction, transfer_status, created_from, created_to,
+    counterparty_branch_id, cursor, limit
+  )
+  return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+@router.get("/{branch_id}", response_model=BranchRead)
+async def get_branch_by_id(
+  branch_id: UUID,
+  request: Request,
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  _: Principal = Depends(get_current_admin)
+):
+  # Cuerpo y validadores salen de la misma entrada de la caché versionada: un 304 no toca PostgreSQL
+  body = await get_branch_json(session, redis, branch_id)
+  if body is None:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Branch not found"
+    )
+
+  last_modified = branch_last_modified(body)
+  if is_not_modified(request, last_modified):
+    return not_modified_response(last_modified)
+  return Response(content=body, media_type="application/json", headers=validator_headers(last_modified))
+
+@router.put("/update/{branch_id}", status_code=status.HTTP_200_OK, response_model=BranchRead)
 async def update_branch(
-  branch_id: str,
+  branch_id: UUID,
   branch_data: BranchCreate,
-  session: Session = Depends(get_session),
-  _: User = Depends(get_current_admin)
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  _: Principal = Depends(get_current_admin)
 ):
-  branch = session.get(Branch, branch_id)
+  branch = await session.get(Branch, branch_id)
   if not branch:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
@@ -112,7 +231,8 @@ async def update_branch(
   branch.updated_at = datetime.now(timezone.utc)
 
   session.add(branch)
-  session.commit()
-  session.refresh(branch)
+  await session.commit()
+  await session.refresh(branch)
+  invalidate_branch_cache(redis)
 
   return branch
@@ -0,0 +1,128 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+from uuid import UUID
+from app.db.session import get_session, get_redis, async_session_factory, redis_client
+from app.schemas.enum import UserStatus
+from app.schemas.schemas import ChatMessageCreate, Principal
+from app.security.dependencies import get_current_user, decode_access_token
+from app.security.principal import principal_invalidations, resolve_principal
+from app.services.chat import append_message, get_history, is_room_member
+from app.services.chat_gateway import chat_gateway, ChatConnection
+import asyncio
+import time
+
+router = APIRouter()
+
+@router.get("/rooms/{room_id}/messages", response_model=dict)
+async def get_room_messages(
+  room_id: UUID,
+  cursor: Optional[str] = None,
+  limit: int = Query(50, ge=1, le=200),
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  principal: Principal = Depends(get_current_user)
+):
+  if not await is_room_member(session, redis, room_id, principal.id):
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No perteneces a esta sala.")
+
+  # Los mensajes recientes salen del buffer en Redis; PostgreSQL solo para el historial antiguo
+  items, next_cursor = await get_history(session, redis, room_id, cursor, limit)
+  return {"items": items, "next_cursor": next_cursor}
+
+@router.post("/rooms/{room_id}/messages", status_code=status.HTTP_201_CREATED)
+async def post_room_message(
+  room_id: UUID,
+  message_data: ChatMessageCreate,
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  principal: Principal = Depends(get_current_user)
+):
+  if not await is_room_member(session, redis, room_id, principal.id):
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No perteneces a esta sala.")
+
+  message = append_message(redis, room_id, principal.id, message_data.content)
+  return message
+
+def _can_chat(principal: Principal | None) -> bool:
+  # Un usuario eliminado o sin sesiones (sign-out, sign-out-all) queda INACTIVE o sin principal
+  return principal is not None and principal.status == UserStatus.ACTIVE
+
+@router.websocket("/ws/rooms/{room_id}")
+async def room_socket(
+  websocket: WebSocket,
+  room_id: UUID,
+  token: str = Query(...)
+):
+  # Los navegadores no envían cabeceras en WebSocket: el access token va en la query
+  try:
+    user_id, payload = decode_access_token(token)
+  except HTTPException:
+    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    return
+  exp = payload.get("exp")
+
+  # Sesión corta solo para validar usuario y membresía; no se retiene una conexión del pool por socket
+  async with async_session_factory() as session:
+    principal = await resolve_principal(session, user_id, exp)
+    is_member = _can_chat(principal) and await is_room_member(session, redis_client, room_id, user_id)
+  if not is_member:
+    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    return
+
+  await websocket.accept()
+  connection = ChatConnection(websocket, user_id)
+  sender = asyncio.create_task(connection.sender())
+  await chat_gateway.join(room_id, connection)
+
+  with principal_invalidations.watch(user_id) as invalidated:
+    # La lectura corre junto a la señal de cierre y a la vigencia de la sesión: si el gateway cierra
+    # el socket (cliente lento), el usuario pierde el acceso o el tóken expira, el handler sale
+    # y libera la sala sin esperar al siguiente frame
+    receiver = asyncio.create_task(_receive_messages(websocket, room_id, user_id))
+    closed = asyncio.create_task(connection.closed.wait())
+    revoked = asyncio.create_task(_wait_for_revocation(user_id, exp, invalidated))
+    try:
+      await asyncio.wait({receiver, closed, revoked}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+      for task in (receiver, closed, revoked, sender):
+        task.cancel()
+      await chat_gateway.leave(room_id, connection)
+      # asyncio.wait espera a las tareas sin tragarse una cancelación del propio handler
+      await asyncio.wait({receiver, closed, revoked, sender})
+
+  # Los errores de lectura, envío o revalidación no se pierden con la tarea: la desconexión es el cierre normal
+  for task in (receiver, revoked, sender):
+    if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+      raise task.exception()
+
+  if not revoked.cancelled():
+    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+
+async def _wait_for_revocation(user_id: UUID, exp: int | None, invalidated: asyncio.Event):
+  # Termina cuando expira el tóken o cuando una invalidación del principal deja al usuario sin acceso;
+  # las demás invalidaciones (p. ej. un sign-in en otro dispositivo) solo revalidan
+  while True:
+    timeout = max(0, exp - time.time()) if exp else None
+    try:
+      await asyncio.wait_for(invalidated.wait(), timeout)
+    except asyncio.TimeoutError:
+      return
+    invalidated.clear()
+    async with async_session_factory() as session:
+      principal = await resolve_principal(session, user_id, exp)
+    if not _can_chat(principal):
+      return
+
+async def _receive_messages(websocket: WebSocket, room_id: UUID, user_id: UUID):
+  while True:
+    data = await websocket.receive_text()
+    try:
+      # Un frame que no es JSON también es un ValidationError (json_invalid)
+      message_data = ChatMessageCreate.model_validate_json(data)
+    except ValidationError:
+      await websocket.send_json({"error": "Mensaje inválido."})
+      continue
+    await chat_gateway.publish(room_id, user_id, message_data.content)
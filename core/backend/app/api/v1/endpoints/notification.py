@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+from app.db.session import get_session, get_redis
+from app.schemas.models import User
+from app.schemas.schemas import NotificationCreate, Principal
+from app.security.dependencies import get_current_admin, get_current_user
+from app.services.notifications import push_notification, list_notifications
+
+router = APIRouter()
+
+@router.get("/", response_model=dict)
+async def get_my_notifications(
+  cursor: Optional[str] = None,
+  limit: int = Query(20, ge=1, le=100),
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  principal: Principal = Depends(get_current_user)
+):
+  # Las páginas recientes salen de Redis; PostgreSQL solo para el historial antiguo
+  items, next_cursor = await list_notifications(session, redis, principal.id, cursor, limit)
+  return {"items": items, "next_cursor": next_cursor}
+
+@router.post("/send", status_code=status.HTTP_201_CREATED)
+async def send_notification(
+  notification_data: NotificationCreate,
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  admin_user: Principal = Depends(get_current_admin)
+):
+  # El volcado a PostgreSQL es diferido: un receptor inexistente fallaría recién en el flush
+  if not await session.get(User, notification_data.receiver_id):
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Receiver not found"
+    )
+
+  notification = push_notification(redis, notification_data, sender_id=admin_user.id)
+  return {"message": "Notificación enviada exitosamente.", "id": str(notification.id)}
\ No newline at end of file
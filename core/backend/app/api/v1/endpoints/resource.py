@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+from uuid import UUID
+from app.db.session import get_session
+from app.schemas.enum import ResourceStatus
+from app.schemas.schemas import Principal
+from app.security.dependencies import get_current_admin
+from app.services.resource_search import search_resources
+
+router = APIRouter()
+
+@router.get("/search", response_model=dict)
+async def search(
+  q: str = Query(..., min_length=3, description="Nombre, número de serie o de activo (parcial o aproximado)"),
+  branch_id: Optional[UUID] = None,
+  category_id: Optional[UUID] = None,
+  resource_status: Optional[ResourceStatus] = Query(None, alias="status"),
+  business_id: Optional[UUID] = None,
+  limit: int = Query(20, ge=1, le=100),
+  offset: int = Query(0, ge=0, le=1000),
+  session: AsyncSession = Depends(get_session),
+  _: Principal = Depends(get_current_admin)
+):
+  return await search_resources(session, q, branch_id, category_id, resource_status, business_id, limit, offset)
\ No newline at end of file
@@ -1,92 +1,158 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, Request
+from app.config import settings
 from app.db.session import get_session
 from app.utils.jwt import JWT
-from app.utils.helpers import hash_password, send_email, generate_verification_code, verify_password
-from app.schemas.schemas import UserCreate, UserLogin
-from app.schemas.models import User, Person, UserStatus
-from app.db.session import get_redis
-from app.security.dependencies import get_current_admin
-from sqlmodel import Session, select
+from app.utils.helpers import hash_password, generate_verification_code, verify_password, PENDING_VERIFICATIONS_KEY
+from app.services.email_outbox import enqueue_email
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.export import export_response
+from app.utils.responses import FastJSONResponse, rows_to_dicts
+from app.utils.conditional import (
+  USER_VALIDATOR, invalidate_last_modified, is_not_modified, not_modified_response,
+  resolve_last_modified, validator_headers
+)
+from app.schemas.schemas import CursorPage, UserCreate, UserLogin, UserRead, Principal
+from app.schemas.models import User, Person, UserStatus, UserRole
+from app.db.session import get_redis, redis_client
+from app.db.redis_scripts import consume_verification_code, hset_with_ttl, VerificationCodeMismatch
+from app.security.dependencies import get_current_admin, get_current_user
+from app.security.rate_limit import RateLimit
+from app.security.principal import invalidate_principal
+from app.security.sessions import create_session, rotate_session, revoke_session, revoke_all_sessions, session_owner, REFRESH_TOKEN_TTL, ROTATED, REUSED
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, tuple_
 from sqlalchemy.exc import IntegrityError
 from redis import Redis
 from uuid import UUID
-from datetime import datetime, timezone, timedelta
+from typing import Optional
+from datetime import datetime, timezone
 
 router = APIRouter()
 jwt = JWT()
 
-@router.get("/", response_model=list)
+# Límites por ruta antes del trabajo de bcrypt: por IP y, cuando el cuerpo lo trae, por email
+sign_up_limit = RateLimit("sign-up", ip=settings.RATE_LIMIT_SIGN_UP_IP, email=settings.RATE_LIMIT_SIGN_UP_EMAIL)
+sign_in_limit = RateLimit("sign-in", ip=settings.RATE_LIMIT_SIGN_IN_IP, email=settings.RATE_LIMIT_SIGN_IN_EMAIL)
+verify_email_limit = RateLimit("verify-email", ip=settings.RATE_LIMIT_VERIFY_EMAIL_IP)
+
+# Columnas en el orden y con los nombres de UserRead
+USER_READ_COLUMNS = [
+  User.id.label("user_id"), Person.full_name, User.username, User.email, Person.ci, User.role,
+  Person.branch_id, User.status, User.is_verified, Person.picture, Person.country,
+  User.created_at, User.updated_at,
+]
+
+# El perfil cambia si cambia el usuario o su persona
+USER_LAST_MODIFIED = func.greatest(User.updated_at, Person.updated_at, User.created_at)
+
+@router.get("/", response_model=CursorPage[UserRead])
 async def get_all_users(
-  session: Session = Depends(get_session),
-  _: User = Depends(get_current_admin)
+  role: Optional[UserRole] = None,
+  user_status: Optional[UserStatus] = Query(None, alias="status"),
+  branch_id: Optional[UUID] = None,
+  is_verified: Optional[bool] = None,
+  cursor: Optional[str] = None,
+  limit: int = Query(50, ge=1, le=200),
+  session: AsyncSession = Depends(get_session),
+  _: Principal = Depends(get_current_admin)
 ):
-  users = session.exec(select(User)).all()
-
-  result = []
-  for user in users:
-    person = session.get(Person, user.id)
-    result.append({
-      "user_id": str(user.id),
-      "full_name": person.full_name,
-      "username": user.username,
-      "email": user.email,
-      "ci": person.ci,
-      "role": user.role,
-      "branch_id": person.branch_id,
-      "status": user.status,
-      "picture": person.picture,
-      "country": person.country,
-      "created_at": user.created_at,
-      "updated_at": user.updated_at,
-    })
-  
-  return result
+  # Una sola consulta User + Person, paginada por keyset sobre (created_at, id);
+  # las columnas coinciden con UserRead y se serializan directamente con orjson
+  stmt = (
+    select(*USER_READ_COLUMNS)
+    .join(Person, Person.user_id == User.id, isouter=True)
+    .order_by(User.created_at.desc(), User.id.desc())
+    .limit(limit + 1)
+  )
+
+  if role:
+    stmt = stmt.where(User.role == role)
+  if user_status:
+    stmt = stmt.where(User.status == user_status)
+  if branch_id:
+    stmt = stmt.where(Person.branch_id == branch_id)
+  if is_verified is not None:
+    stmt = stmt.where(User.is_verified == is_verified)
+  if cursor:
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    stmt = stmt.where(tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id))
+
+  rows = (await session.exec(stmt)).all()
+  has_more = len(rows) > limit
+  rows = rows[:limit]
+
+  next_cursor = encode_cursor(rows[-1].created_at, rows[-1].user_id) if has_more else None
+  return FastJSONResponse({"items": rows_to_dicts(rows), "next_cursor": next_cursor})
+
+USER_EXPORT_COLUMNS = [
+  "user_id", "full_name", "username", "email", "ci", "role", "branch_id",
+  "status", "is_verified", "country", "created_at", "updated_at",
+]
+
+@router.get("/export")
+async def export_users(
+  format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+  _: Principal = Depends(get_current_admin)
+):
+  stmt = (
+    select(
+      User.id.label("user_id"), Person.full_name, User.username, User.email, Person.ci, User.role,
+      Person.branch_id, User.status, User.is_verified, Person.country, User.created_at, User.updated_at,
+    )
+    .join(Person, Person.user_id == User.id, isouter=True)
+    .order_by(User.created_at, User.id)
+  )
+  return export_response(stmt, USER_EXPORT_COLUMNS, format, "users")
 
-@router.post("/sign-up", status_code=status.HTTP_201_CREATED)
+@router.post("/sign-up", status_code=status.HTTP_201_CREATED, dependencies=[Depends(sign_up_limit)])
 async def sign_up(
   user: UserCreate,
-  session: Session = Depends(get_session),
+  session: AsyncSession = Depends(get_session),
   redis: Redis = Depends(get_redis)
 ):
   # Verifica si ya existe el usuario
-  existing_user = session.exec(select(User).where(User.email == user.email)).first()
+  existing_user = (await session.exec(select(User).where(User.email == user.email))).first()
   if existing_user:
     raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El usuario ya existe.")
   
   # Hashea la contraseña
-  hashed_pw = hash_password(user.password)
+  hashed_pw = await hash_password(user.password)
 
   try:    
     # Crea y guarda el nuev usuario
     new_user = User(username=user.username, email=user.email, password=hashed_pw)
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
 
     # Crea la persona asociada al usuario
-    new_person = Person(user_id=str(new_user.id), full_name=user.full_name)
+    new_person = Person(user_id=new_user.id, full_name=user.full_name)
     session.add(new_person)
-    session.commit()
-    session.refresh(new_person)
+    await session.commit()
+    await session.refresh(new_person)
 
     # Genera y guarda el token de verificación en Redis
     verification_code = generate_verification_code()
     expires_in = 3600 # 1 hora
-    redis.hset(f"verify_email:{verification_code}", mapping={
-      "user_id": str(new_user.id),
-      "email": new_user.email,
-      "verification_code": verification_code,
-      "created_at": datetime.now(timezone.utc).isoformat()
-    })
-    redis.expire(f"verify_email:{verification_code}", expires_in)
-
-    # Envía el correo de verificación
-    await send_email(user.email, "Verificación de cuenta", f"Por favor, verifica tu cuenta con el código: {verification_code}")
+    with redis.pipeline() as pipe:
+      hset_with_ttl(pipe, f"verify_email:{verification_code}", {
+        "user_id": str(new_user.id),
+        "email": new_user.email,
+        "verification_code": verification_code,
+        "created_at": datetime.now(timezone.utc).isoformat()
+      }, expires_in)
+      # Índice de verificaciones pendientes: user_id -> timestamp de expiración
+      pipe.zadd(PENDING_VERIFICATIONS_KEY, {str(new_user.id): datetime.now(timezone.utc).timestamp() + expires_in})
+      pipe.execute()
+
+    # Encola el correo de verificación; lo entrega el worker del outbox
+    enqueue_email(user.email, "Verificación de cuenta", f"Por favor, verifica tu cuenta con el código: {verification_code}", redis)
 
     return {"message": "Usuario creado exitosamente. Por favor, verifica tu correo electrónico para activar tu cuenta.", "user_id": str(new_user.id)}
 
   except IntegrityError as e:
-    session.rollback()
+    await session.rollback()
     if "unique constraint" in str(e.orig):
       raise HTTPException(
         status_code=status.HTTP_409_CONFLICT,
@@ -98,16 +164,16 @@ async def sign_up(
     )
   
   except Exception as e:
-    session.rollback()
+    await session.rollback()
     raise HTTPException(
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
       detail=str(e)
     )
 
-@router.post("/verify-email", status_code=status.HTTP_200_OK)
+@router.post("/verify-email", status_code=status.HTTP_200_OK, dependencies=[Depends(verify_email_limit)])
 async def verify_email(
   payload: dict,
-  session: Session = Depends(get_session),
+  session: AsyncSession = Depends(get_session),
   redis: Redis = Depends(get_redis)
 ):
   token = payload.get("verification_code")
@@ -117,79 +183,53 @@ async def verify_email(
       detail="El código de verificación es requerido."
     )
 
-  # Recupera los datos del hash en Redis
-  user_id = redis.hget(f"verify_email:{token}", "user_id")
-  email = redis.hget(f"verify_email:{token}", "email")
-  verification_code = redis.hget(f"verify_email:{token}", "verification_code")
-  created_at = redis.hget(f"verify_email:{token}", "created_at")
+  # Lee, valida y elimina el código en un solo round trip atómico:
+  # dos envíos concurrentes del mismo código no pueden verificar dos veces
+  try:
+    data = consume_verification_code(redis, f"verify_email:{token}", PENDING_VERIFICATIONS_KEY, str(token))
+  except VerificationCodeMismatch:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST,
+      detail="El código de verificación no coincide."
+    )
 
-  # Si el hash no existe en Redis, ha expirado o es inválido
-  if not all([user_id, email, verification_code, created_at]):
+  # Si el hash no existe en Redis, ha expirado, es inválido o ya fue usado
+  if not data or not data.get("user_id"):
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail="Token de verificación expirado o inválido."
     )
 
-  # Verifica la expiración del código
-  ttl = redis.ttl(f"verify_email:{token}")
-  if ttl == -2:  # El token ha expirado
-    # Elimina el usuario y la persona asociada
-    user = session.get(User, UUID(user_id))
-    if user:
-      session.delete(user)
-      session.commit()
-      
-      # Borra la persona asociada, si existe
-      person = session.exec(select(Person).where(Person.user_id == user.id)).first()
-      if person:
-        session.delete(person)
-        session.commit()
-
-      # Elimina el token de Redis
-      redis.delete(f"verify_email:{token}")
-
-      raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Token de verificación expirado. El usuario ha sido eliminado."
-      )
-
-  # Continúa con la verificación
-  user = session.get(User, UUID(user_id))
+  user = await session.get(User, UUID(data["user_id"]))
   if not user:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail="Usuario no encontrado."
     )
 
-  # Verifica que el código coincida con el esperado
-  if verification_code != token:
-    raise HTTPException(
-      status_code=status.HTTP_400_BAD_REQUEST,
-      detail="El código de verificación no coincide."
-    )
-
-  print(f"Token recibido: {token}")
-  print(f"Verification code en Redis: {verification_code}")
-
-  # Si está verificado y el token es válido
   user.is_verified = True
   user.updated_at = datetime.now(timezone.utc)
-  session.commit()
-
-  # Elimina el token de Redis tras la verificación exitosa
-  redis.delete(f"verify_email:{token}")
+  await session.commit()
+  invalidate_last_modified(redis, USER_VALIDATOR, user.id)
 
   return {"message": "Cuenta verificada exitosamente."}
 
-@router.post("/sign-in", status_code=status.HTTP_200_OK)
+@router.post("/sign-in", status_code=status.HTTP_200_OK, dependencies=[Depends(sign_in_limit)])
 async def sign_in(
   user: UserLogin,
   response: Response,
-  session: Session = Depends(get_session),
+  session: AsyncSession = Depends(get_session),
   redis: Redis = Depends(get_redis)
 ):
-  db_user = session.exec(select(User).where(User.email == user.email)).first()
-  if not db_user or not verify_password(user.password, db_user.password):
+  db_user = (await session.exec(select(User).where(User.email == user.email))).first()
+  if not db_user:
+    raise HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Credenciales inválidas."
+    )
+
+  is_valid, new_hash = await verify_password(user.password, db_user.password)
+  if not is_valid:
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
       detail="Credenciales inválidas."
@@ -201,50 +241,57 @@ async def sign_in(
       detail="Cuenta no verificada. Por favor, verifica tu correo electrónico."
     )
   
-  # Verificar si el usuario ya tiene un refresh token en Redis y eliminarlo si existe
-  refresh_token_key = f"refresh_token:{db_user.id}"
-  if redis.exists(refresh_token_key):
-    redis.delete(refresh_token_key) # Eliminar el refresh token anterior
-  
   access_token = jwt.create_access_token({"sub": str(db_user.id)})
   refresh_token = jwt.create_refresh_token({"sub": str(db_user.id)})
   jti = jwt.decode(refresh_token).get("jti")
 
-  refresh_token_key = f"refresh_token:{db_user.id}"
-  redis.hset(refresh_token_key, mapping={
-    "user_id": str(db_user.id),
-    "jti": jti,
-    "refresh_token": refresh_token,
-  })
-  ttl_in_seconds = 7 * 24 * 60 * 60 # 7 días
-  redis.expire(refresh_token_key, ttl_in_seconds)
+  # Nueva sesión para este dispositivo; las demás sesiones del usuario se mantienen
+  create_session(redis, db_user.id, jti)
 
+  # Actualiza el hash si fue generado con un costo anterior; se guarda con el commit del inicio de sesión
+  if new_hash:
+    db_user.password = new_hash
   db_user.status = UserStatus.ACTIVE
-  session.commit()
+  await session.commit()
+  invalidate_principal(db_user.id)
+  invalidate_last_modified(redis, USER_VALIDATOR, db_user.id)
+
+  set_refresh_cookie(response, refresh_token)
 
-  # Establecer la cookie HttpOnly con el refresh token
+  return {
+    "message": "Inicio de sesión exitoso.",
+    "access_token": access_token,
+    "token_type": "bearer"
+  }
+
+def set_refresh_cookie(response: Response, refresh_token: str):
+  # Cookie HttpOnly con el refresh token; visible para refresh-token y sign-out
   response.set_cookie(
     key="refresh_token",
     value=refresh_token,
     httponly=True,
     secure=False,
     samesite="strict",
-    max_age=60 * 60 * 24 * 7,
-    path="/api/v1/users/refresh-token"
+    max_age=REFRESH_TOKEN_TTL,
+    path="/api/v1/users"
   )
 
-  return {
-    "message": "Inicio de sesión exitoso.",
-    "access_token": access_token,
-    "token_type": "bearer"
-  }
+def get_refresh_payload(request: Request, user_id: str) -> dict:
+  refresh_token = request.cookies.get("refresh_token")
+  if not refresh_token:
+    raise HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Token de actualización no encontrado en cookies."
+    )
+
+  try:
+    payload = jwt.decode(refresh_token)
+  except Exception:
+    raise HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Token de actualización inválido o expirado."
+    )
 
-@router.post("/sign-out/{user_id}", status_code=status.HTTP_200_OK)
-async def sign_out(
-  user_id: str,
-  session: Session = Depends(get_session),
-  redis: Redis = Depends(get_redis)
-):
   try:
     user_id = UUID(user_id)
   except ValueError:
@@ -253,99 +300,95 @@ async def sign_out(
       detail="ID de usuario inválido."
     )
 
-  db_user = session.get(User, user_id)
-  if not db_user:
+  if payload.get("sub") != str(user_id) or not payload.get("jti"):
     raise HTTPException(
-      status_code=status.HTTP_404_NOT_FOUND,
-      detail="Usuario no encontrado."
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Token de actualización no coincide."
     )
 
-  if not redis.exists(f"refresh_token:{user_id}"):
+  return payload
+
+async def mark_inactive(session: AsyncSession, user_id: UUID):
+  db_user = await session.get(User, user_id)
+  if db_user:
+    db_user.status = UserStatus.INACTIVE
+    await session.commit()
+    invalidate_principal(user_id)
+    invalidate_last_modified(redis_client, USER_VALIDATOR, user_id)
+
+@router.post("/sign-out/{user_id}", status_code=status.HTTP_200_OK)
+async def sign_out(
+  user_id: str,
+  request: Request,
+  response: Response,
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis)
+):
+  # Cierra solo la sesión del dispositivo actual
+  payload = get_refresh_payload(request, user_id)
+  revoked, remaining = revoke_session(redis, payload["sub"], payload["jti"])
+  if not revoked:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail="La sesión ya ha sido cerrada."
     )
 
-  redis.delete(f"refresh_token:{user_id}")
-  db_user.status = UserStatus.INACTIVE
-  session.commit()
+  if not remaining:
+    await mark_inactive(session, UUID(payload["sub"]))
 
+  response.delete_cookie("refresh_token", path="/api/v1/users")
   return {"message": "Sesión cerrada correctamente."}
 
-@router.post("/refresh-token/{user_id}", status_code=status.HTTP_200_OK)
-async def refresh_token(
+@router.post("/sign-out-all/{user_id}", status_code=status.HTTP_200_OK)
+async def sign_out_all(
   user_id: str,
   request: Request,
   response: Response,
-  session: Session = Depends(get_session),
+  session: AsyncSession = Depends(get_session),
   redis: Redis = Depends(get_redis)
 ):
-  refresh_token = request.cookies.get("refresh_token")
-  if not refresh_token:
+  # Cierra todas las sesiones del usuario; exige una sesión vigente como prueba
+  payload = get_refresh_payload(request, user_id)
+  if session_owner(redis, payload["jti"]) != payload["sub"]:
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
-      detail="Token de actualización no encontrado en cookies."
+      detail="Sesión inválida o expirada."
     )
 
-  try:
-    payload = jwt.decode(refresh_token)
-    user_id = payload.get("sub")
-  except Exception:
-    raise HTTPException(
-      status_code=status.HTTP_401_UNAUTHORIZED,
-      detail="Token de actualización inválido o expirado."
-    )
+  revoked = revoke_all_sessions(redis, payload["sub"])
+  await mark_inactive(session, UUID(payload["sub"]))
 
-  try:
-    user_id = UUID(user_id)
-  except ValueError:
-    raise HTTPException(
-      status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-      detail="ID de usuario inválido."
-    )
+  response.delete_cookie("refresh_token", path="/api/v1/users")
+  return {"message": f"Se cerraron {revoked} sesiones correctamente."}
 
-  db_user = session.get(User, user_id)
-  if not db_user:
-    raise HTTPException(
-      status_code=status.HTTP_404_NOT_FOUND,
-      detail="Usuario no encontrado."
-    )
+@router.post("/refresh-token/{user_id}", status_code=status.HTTP_200_OK)
+async def refresh_token(
+  user_id: str,
+  request: Request,
+  response: Response,
+  redis: Redis = Depends(get_redis)
+):
+  payload = get_refresh_payload(request, user_id)
+  user_id = payload["sub"]
 
-  refresh_token_key = f"refresh_token:{user_id}"
-  if not redis.exists(refresh_token_key):
+  new_access_token = jwt.create_access_token({"sub": user_id})
+  new_refresh_token = jwt.create_refresh_token({"sub": user_id})
+  new_jti = jwt.decode(new_refresh_token).get("jti")
+
+  # Rotación atómica en un solo round trip, con detección de reutilización
+  result = rotate_session(redis, user_id, payload["jti"], new_jti)
+  if result == REUSED:
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
-      detail="Sesión inválida o expirada."
+      detail="Token de actualización reutilizado. Se cerraron todas las sesiones."
     )
-
-  stored_token = redis.hget(refresh_token_key, "refresh_token")
-
-  if stored_token != refresh_token:
+  if result != ROTATED:
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
-      detail="Token de actualización no coincide."
+      detail="Sesión inválida o expirada."
     )
 
-  new_access_token = jwt.create_access_token({"sub": str(user_id)})
-  new_refresh_token = jwt.create_refresh_token({"sub": str(user_id)})
-  new_jti = jwt.decode(new_refresh_token).get("jti")
-
-  redis.hset(refresh_token_key, mapping={
-    "user_id": str(user_id),
-    "jti": new_jti,
-    "refresh_token": new_refresh_token
-  })
-  redis.expire(refresh_token_key, timedelta(days=7))
-
-  response.set_cookie(
-    key="refresh_token",
-    value=new_refresh_token,
-    httponly=False,
-    secure=False,
-    samesite="strict",
-    max_age=60 * 60 * 24 * 7,
-    path="/api/v1/users/refresh-token"
-  )
+  set_refresh_cookie(response, new_refresh_token)
 
   return {
     "message": "Tokens generados exitosamente.",
@@ -356,22 +399,67 @@ async def refresh_token(
 @router.delete("/delete/{user_id}", status_code=status.HTTP_200_OK)
 async def delete_user(
   user_id: str,
-  session: Session = Depends(get_session),
-  _: User = Depends(get_current_admin)
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  _: Principal = Depends(get_current_admin)
 ):
-  user = session.get(User, UUID(user_id))
+  user = await session.get(User, UUID(user_id))
   if not user:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail="Usuario no encontrado."
     )
 
-  person = session.exec(select(Person).where(Person.user_id == user.id)).first()
+  person = (await session.exec(select(Person).where(Person.user_id == user.id))).first()
   if person:
-    session.delete(person)
-    session.commit()
+    await session.delete(person)
+    await session.commit()
+
+  await session.delete(user)
+  await session.commit()
+  invalidate_principal(user.id)
+  invalidate_last_modified(redis, USER_VALIDATOR, user.id)
+  revoke_all_sessions(redis, user.id)
+
+  return {"message": "Usuario eliminado exitosamente."}
 
-  session.delete(user)
-  session.commit()
+@router.get("/{user_id}", response_model=UserRead)
+async def get_user_by_id(
+  user_id: UUID,
+  request: Request,
+  session: AsyncSession = Depends(get_session),
+  redis: Redis = Depends(get_redis),
+  principal: Principal = Depends(get_current_user)
+):
+  if principal.id != user_id and principal.role != UserRole.ADMIN:
+    raise HTTPException(
+      status_code=status.HTTP_403_FORBIDDEN,
+      detail="No tienes permisos para ver este usuario."
+    )
+
+  # El validador sale de Redis (o de updated_at): un 304 no carga ni serializa la fila
+  last_modified = await resolve_last_modified(
+    session, redis, USER_VALIDATOR, user_id,
+    select(USER_LAST_MODIFIED).join(Person, Person.user_id == User.id, isouter=True).where(User.id == user_id)
+  )
+  if last_modified is None:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Usuario no encontrado."
+    )
+  if is_not_modified(request, last_modified):
+    return not_modified_response(last_modified)
+
+  row = (await session.exec(
+    select(*USER_READ_COLUMNS, USER_LAST_MODIFIED.label("last_modified"))
+    .join(Person, Person.user_id == User.id, isouter=True)
+    .where(User.id == user_id)
+  )).first()
+  if not row:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Usuario no encontrado."
+    )
 
-  return {"message": "Usuario eliminado exitosamente."}
\ No newline at end of file
+  content = row._asdict()
+  return FastJSONResponse(content, headers=validator_headers(content.pop("last_modified")))
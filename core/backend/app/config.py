@@ -4,11 +4,93 @@ from dotenv import load_dotenv
 class Settings:
   def __init__(self):
     load_dotenv()
+    self.ENV: str = os.getenv("ENV", "development")
     self.DATABASE_URL: str = os.getenv("DATABASE_URL")
     self.REDIS_URL: str = os.getenv("REDIS_URL")
     self.SECRET_KEY: str = os.getenv("SECRET_KEY")
     self.ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     self.SMTP_USER: str = os.getenv("SMTP_USER")
     self.SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD")
+    self.SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    self.SMTP_PORT: int = int(os.getenv("SMTP_PORT", "465"))
+    self.SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    self.EMAIL_FROM: str = os.getenv("EMAIL_FROM", self.SMTP_USER or "")
+
+    # Pool de conexiones a PostgreSQL (por worker de uvicorn)
+    self.DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    self.DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    self.DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    self.DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+    # Caché de principales (rol/estado) para get_current_admin
+    self.PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+    self.PRINCIPAL_LOCAL_TTL: int = int(os.getenv("PRINCIPAL_LOCAL_TTL", "30"))
+
+    # Hashing de contraseñas fuera del event loop
+    self.BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    self.HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", "4"))
+    self.HASH_QUEUE_SIZE: int = int(os.getenv("HASH_QUEUE_SIZE", "64"))
+    self.HASH_QUEUE_TIMEOUT: float = float(os.getenv("HASH_QUEUE_TIMEOUT", "5"))
+
+    # Rate limiting de los endpoints de autenticación ("solicitudes/segundos")
+    self.RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    self.RATE_LIMIT_LOCAL_SIZE: int = int(os.getenv("RATE_LIMIT_LOCAL_SIZE", "10000"))
+    self.RATE_LIMIT_SIGN_UP_IP: str = os.getenv("RATE_LIMIT_SIGN_UP_IP", "10/3600")
+    self.RATE_LIMIT_SIGN_UP_EMAIL: str = os.getenv("RATE_LIMIT_SIGN_UP_EMAIL", "3/3600")
+    self.RATE_LIMIT_SIGN_IN_IP: str = os.getenv("RATE_LIMIT_SIGN_IN_IP", "30/60")
+    self.RATE_LIMIT_SIGN_IN_EMAIL: str = os.getenv("RATE_LIMIT_SIGN_IN_EMAIL", "5/60")
+    self.RATE_LIMIT_VERIFY_EMAIL_IP: str = os.getenv("RATE_LIMIT_VERIFY_EMAIL_IP", "10/60")
+    # Proxies (IPs o redes CIDR, separadas por comas) cuyas cabeceras X-Forwarded-For / X-Real-IP
+    # identifican al cliente real; vacío = se usa la IP de la conexión
+    self.TRUSTED_PROXIES: list[str] = [proxy.strip() for proxy in os.getenv("TRUSTED_PROXIES", "").split(",") if proxy.strip()]
+
+    # Outbox de correos y worker de envío
+    self.EMAIL_BATCH_SIZE: int = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+    self.EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    self.EMAIL_RETRY_BASE_DELAY: int = int(os.getenv("EMAIL_RETRY_BASE_DELAY", "5"))
+    self.EMAIL_RETRY_MAX_DELAY: int = int(os.getenv("EMAIL_RETRY_MAX_DELAY", "600"))
+
+    # Limpieza de usuarios no verificados
+    self.UNVERIFIED_USER_TTL: int = int(os.getenv("UNVERIFIED_USER_TTL", "3600"))
+    self.CLEANUP_BATCH_SIZE: int = int(os.getenv("CLEANUP_BATCH_SIZE", "500"))
+
+    # Scheduler con elección de líder en Redis
+    self.SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    self.SCHEDULER_LEASE_TTL: int = int(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+    self.SCHEDULER_LEASE_RENEW: int = int(os.getenv("SCHEDULER_LEASE_RENEW", "10"))
+
+    # Notificaciones: lista reciente en Redis y volcado por lotes a PostgreSQL
+    self.NOTIFICATIONS_RECENT_LIMIT: int = int(os.getenv("NOTIFICATIONS_RECENT_LIMIT", "200"))
+    self.NOTIFICATIONS_FLUSH_BATCH: int = int(os.getenv("NOTIFICATIONS_FLUSH_BATCH", "1000"))
+    self.NOTIFICATIONS_FLUSH_INTERVAL: int = int(os.getenv("NOTIFICATIONS_FLUSH_INTERVAL", "5"))
+
+    # Chat: últimos mensajes por sala en Redis y volcado por lotes a PostgreSQL
+    self.CHAT_BUFFER_SIZE: int = int(os.getenv("CHAT_BUFFER_SIZE", "200"))
+    self.CHAT_FLUSH_BATCH: int = int(os.getenv("CHAT_FLUSH_BATCH", "1000"))
+    self.CHAT_FLUSH_INTERVAL: int = int(os.getenv("CHAT_FLUSH_INTERVAL", "2"))
+    self.CHAT_SEND_QUEUE_SIZE: int = int(os.getenv("CHAT_SEND_QUEUE_SIZE", "256"))
+    # Vigencia de la membresía de salas cacheada en Redis: la API no modifica participantes,
+    # así que los cambios hechos fuera de ella se ven como mucho tras este tiempo
+    self.CHAT_MEMBERS_TTL: int = int(os.getenv("CHAT_MEMBERS_TTL", "300"))
+
+    # Validadores ETag / Last-Modified cacheados en Redis para GET condicionales
+    self.VALIDATOR_CACHE_TTL: int = int(os.getenv("VALIDATOR_CACHE_TTL", "300"))
+
+    # Caché read-through del catálogo de sucursales
+    self.BRANCH_CACHE_TTL: int = int(os.getenv("BRANCH_CACHE_TTL", "3600"))
+    self.BRANCH_CACHE_LOCK_TTL: int = int(os.getenv("BRANCH_CACHE_LOCK_TTL", "5"))
+
+    # Observabilidad: muestreo del log de SQL (reemplaza echo=True) y puerto de métricas del scheduler dedicado
+    self.METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    self.SQL_LOG_SAMPLE_RATE: float = float(os.getenv("SQL_LOG_SAMPLE_RATE", "0.01"))
+    self.SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    self.SCHEDULER_METRICS_PORT: int = int(os.getenv("SCHEDULER_METRICS_PORT", "9102"))
+
+    # Perfilador de consultas por solicitud y detector de N+1 (solo desarrollo y pruebas)
+    self.QUERY_PROFILER_ENABLED: bool = os.getenv("QUERY_PROFILER_ENABLED", "false").lower() == "true"
+    self.QUERY_PROFILER_N1_THRESHOLD: int = int(os.getenv("QUERY_PROFILER_N1_THRESHOLD", "5"))
+
+    # Particionado mensual opcional de resourcetransferrecord (python -m app.db.partitioning convert)
+    self.TRANSFER_PARTITION_MONTHS_AHEAD: int = int(os.getenv("TRANSFER_PARTITION_MONTHS_AHEAD", "3"))
 
 settings = Settings()
\ No newline at end of file
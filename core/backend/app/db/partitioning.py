@@ -0,0 +1,91 @@
+# Particionado mensual (por created_at) de resourcetransferrecord, opcional.
+# La tabla nace sin particionar; cuando crece a decenas de millones de filas se convierte una vez:
+#   python -m app.db.partitioning convert
+# A partir de ahí el scheduler crea las particiones de los próximos meses (ensure_transfer_partitions).
+import sys
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint
+from app.db.triggers import install_branch_summaries
+from app.schemas.models import ResourceTransferRecord
+
+TABLE = ResourceTransferRecord.__tablename__
+
+def _add_months(month: date, months: int) -> date:
+  index = month.year * 12 + month.month - 1 + months
+  return date(index // 12, index % 12 + 1, 1)
+
+def is_partitioned(connection: Connection) -> bool:
+  return bool(connection.execute(
+    text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+    {"table": TABLE}
+  ).scalar())
+
+def create_month_partitions(connection: Connection, first: date, last: date) -> int:
+  created, month = 0, date(first.year, first.month, 1)
+  while month <= last:
+    next_month = _add_months(month, 1)
+    partition = f"{TABLE}_y{month.year}m{month.month:02d}"
+    exists = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition}).scalar()
+    if not exists:
+      connection.execute(text(
+        f"CREATE TABLE {partition} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+      ))
+      created += 1
+    month = next_month
+  return created
+
+def ensure_transfer_partitions(connection: Connection, months_ahead: int) -> int:
+  # Sin particionado activado no hay nada que preparar
+  if not is_partitioned(connection):
+    return 0
+  today = datetime.now(timezone.utc).date()
+  return create_month_partitions(connection, today, _add_months(today, months_ahead))
+
+def convert_transfer_table(connection: Connection, months_ahead: int):
+  if is_partitioned(connection):
+    return
+
+  legacy = f"{TABLE}_legacy"
+  connection.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+  connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {legacy}"))
+  connection.execute(text(
+    f"CREATE TABLE {TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+  ))
+
+  oldest = connection.execute(text(f"SELECT min(created_at) FROM {legacy}")).scalar()
+  today = datetime.now(timezone.utc).date()
+  create_month_partitions(connection, oldest.date() if oldest else today, _add_months(today, months_ahead))
+  # Filas fuera de los rangos creados (relojes desfasados, meses sin preparar) caen aquí en lugar de fallar
+  connection.execute(text(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT"))
+
+  connection.execute(text(f"UPDATE {legacy} SET created_at = now() WHERE created_at IS NULL"))
+  connection.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {legacy}"))
+  connection.execute(text(f"DROP TABLE {legacy}"))
+
+  # La clave primaria de una tabla particionada debe incluir la columna de partición
+  connection.execute(text(f"ALTER TABLE {TABLE} ALTER COLUMN created_at SET NOT NULL"))
+  connection.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)"))
+  table = ResourceTransferRecord.__table__
+  for constraint in table.foreign_key_constraints:
+    connection.execute(AddConstraint(constraint))
+  for index in table.indexes:
+    index.create(connection)
+
+  # Los triggers de resumen se perdieron con la tabla anterior
+  install_branch_summaries(connection)
+
+if __name__ == "__main__":
+  from app.config import settings
+  from app.db.session import engine
+
+  command = sys.argv[1] if len(sys.argv) > 1 else "ensure"
+  with engine.begin() as connection:
+    if command == "convert":
+      convert_transfer_table(connection, settings.TRANSFER_PARTITION_MONTHS_AHEAD)
+      print(f"{TABLE} particionada por mes")
+    else:
+      created = ensure_transfer_partitions(connection, settings.TRANSFER_PARTITION_MONTHS_AHEAD)
+      print(f"Particiones creadas: {created}")
@@ -0,0 +1,169 @@
+from redis import Redis
+from redis.client import Pipeline
+from app.db.session import redis_client
+
+# Scripts Lua registrados una vez; redis-py usa EVALSHA y recarga el script si hace falta.
+# Se pueden invocar con otro cliente mediante client=...
+
+# Lee, valida y elimina el hash de verificación en un solo round trip.
+# KEYS[1] = verify_email:{code}, KEYS[2] = índice de verificaciones pendientes
+# ARGV[1] = código recibido
+# Devuelve {} si no existe, {"mismatch"} si el código no coincide o los pares campo/valor del hash
+CONSUME_VERIFICATION = """
+local data = redis.call("HGETALL", KEYS[1])
+if #data == 0 then
+  return {}
+end
+
+local fields = {}
+for i = 1, #data, 2 do
+  fields[data[i]] = data[i + 1]
+end
+
+if fields["verification_code"] ~= ARGV[1] then
+  return {"mismatch"}
+end
+
+redis.call("DEL", KEYS[1])
+if fields["user_id"] then
+  redis.call("ZREM", KEYS[2], fields["user_id"])
+end
+return data
+"""
+
+# Renueva o libera una clave de lease solo si sigue perteneciendo a ARGV[1]
+RENEW_IF_OWNER = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_IF_OWNER = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Sesiones de refresh token: refresh_session:{jti} + índice por usuario user_sessions:{user_id}
+# (zset jti -> expiración). refresh_used:{jti} marca los tókens ya rotados para detectar reutilización.
+#
+# KEYS: sesión anterior, índice, sesión nueva, marca de uso de la anterior
+# ARGV: user_id, jti anterior, jti nuevo, ttl, ahora (epoch)
+# Devuelve 1 si rotó, -1 si detectó reutilización y 0 si no existe. Ante una reutilización el
+# llamador revoca todas las sesiones: sus claves salen del índice y el script no puede declararlas
+ROTATE_REFRESH_SESSION = """
+if redis.call("HGET", KEYS[1], "user_id") == ARGV[1] then
+  local expires_at = tonumber(ARGV[5]) + tonumber(ARGV[4])
+  redis.call("DEL", KEYS[1])
+  redis.call("ZREM", KEYS[2], ARGV[2])
+  redis.call("HSET", KEYS[3], "user_id", ARGV[1], "created_at", ARGV[5])
+  redis.call("EXPIRE", KEYS[3], ARGV[4])
+  redis.call("ZADD", KEYS[2], expires_at, ARGV[3])
+  redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", ARGV[5])
+  redis.call("EXPIRE", KEYS[2], ARGV[4])
+  redis.call("SET", KEYS[4], ARGV[3], "EX", ARGV[4])
+  return 1
+end
+
+if redis.call("EXISTS", KEYS[4]) == 1 then
+  return -1
+end
+
+return 0
+"""
+
+# KEYS: sesión, índice; ARGV: user_id, jti, ahora (epoch)
+# Devuelve {revocada (0/1), sesiones vigentes restantes}
+REVOKE_REFRESH_SESSION = """
+local revoked = 0
+if redis.call("HGET", KEYS[1], "user_id") == ARGV[1] then
+  redis.call("DEL", KEYS[1])
+  redis.call("ZREM", KEYS[2], ARGV[2])
+  revoked = 1
+end
+return {revoked, redis.call("ZCOUNT", KEYS[2], ARGV[3], "+inf")}
+"""
+
+# Lectura de caché versionada en un solo round trip: resuelve la versión vigente,
+# lee la entrada y cuenta el acierto o fallo. La entrada guarda "{versión}:{valor}" y solo es
+# válida si su versión coincide con la vigente.
+# KEYS: clave de versión, hash de estadísticas, entrada
+# Devuelve {versión, valor o nil}
+READ_VERSIONED = """
+local version = redis.call("GET", KEYS[1]) or "0"
+local entry = redis.call("GET", KEYS[3])
+if entry then
+  local separator = string.find(entry, ":", 1, true)
+  if separator and string.sub(entry, 1, separator - 1) == version then
+    redis.call("HINCRBY", KEYS[2], "hits", 1)
+    return {version, string.sub(entry, separator + 1)}
+  end
+end
+redis.call("HINCRBY", KEYS[2], "misses", 1)
+return {version, false}
+"""
+
+# Rate limiting por ventana deslizante (aproximación de dos ventanas fijas ponderadas).
+# Evalúa todas las dimensiones (IP, email, ...) y solo cuenta la solicitud si todas la admiten.
+# KEYS: un contador (hash ventana -> solicitudes) por dimensión
+# ARGV: por cada clave, límite y ventana en ms
+# Devuelve {1, 0, 0} si se admite o {0, ms hasta el próximo intento permitido, índice de la clave excedida}
+SLIDING_WINDOW = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2 - 1])
+  local window = tonumber(ARGV[i * 2])
+  local current = math.floor(now / window)
+  local elapsed = now - current * window
+  local counts = redis.call("HMGET", key, current, current - 1)
+  local curr = tonumber(counts[1]) or 0
+  local prev = tonumber(counts[2]) or 0
+  local weight = 1 - elapsed / window
+
+  if prev * weight + curr + 1 > limit then
+    local retry_after = window - elapsed
+    if curr + 1 <= limit and prev > 0 then
+      -- Basta con esperar a que el peso de la ventana anterior baje lo suficiente
+      retry_after = math.ceil((prev * weight + curr + 1 - limit) / prev * window)
+    end
+    return {0, retry_after, i}
+  end
+end
+
+for i, key in ipairs(KEYS) do
+  local window = tonumber(ARGV[i * 2])
+  local current = math.floor(now / window)
+  redis.call("HINCRBY", key, current, 1)
+  redis.call("HDEL", key, current - 2)
+  redis.call("PEXPIRE", key, window * 2)
+end
+return {1, 0, 0}
+"""
+
+consume_verification_script = redis_client.register_script(CONSUME_VERIFICATION)
+rotate_refresh_session = redis_client.register_script(ROTATE_REFRESH_SESSION)
+revoke_refresh_session = redis_client.register_script(REVOKE_REFRESH_SESSION)
+renew_if_owner = redis_client.register_script(RENEW_IF_OWNER)
+release_if_owner = redis_client.register_script(RELEASE_IF_OWNER)
+read_versioned = redis_client.register_script(READ_VERSIONED)
+sliding_window = redis_client.register_script(SLIDING_WINDOW)
+
+class VerificationCodeMismatch(Exception):
+  pass
+
+def consume_verification_code(redis: Redis, key: str, pending_key: str, code: str) -> dict | None:
+  result = consume_verification_script(keys=[key, pending_key], args=[code], client=redis)
+  if not result:
+    return None
+  if result == ["mismatch"]:
+    raise VerificationCodeMismatch()
+  return dict(zip(result[::2], result[1::2]))
+
+# Encola HSET + EXPIRE en un pipeline del llamador: viajan en el mismo round trip que sus demás comandos
+def hset_with_ttl(pipe: Pipeline, key: str, mapping: dict, ttl: int):
+  pipe.hset(key, mapping=mapping)
+  pipe.expire(key, ttl)
@@ -1,18 +1,55 @@
-from sqlmodel import Session, create_engine, SQLModel
+from sqlmodel import create_engine, SQLModel
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.config import settings
-from redis import Redis
+from app.db.triggers import ensure_branch_summaries
+from app.metrics import InstrumentedAsyncRedis, InstrumentedRedis, TimedAsyncQueuePool, TimedQueuePool, instrument_engine
+from app.profiling import instrument_profiler
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+ASYNC_DATABASE_URL = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
 
-def get_session():
-  with Session(engine) as session:
-    return session
+# Motor síncrono: solo para tareas en segundo plano y create_tables
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool, pool_pre_ping=True)
 
-redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Motor asíncrono con pool dimensionado para los endpoints
+async_engine = create_async_engine(
+  ASYNC_DATABASE_URL,
+  poolclass=TimedAsyncQueuePool,
+  pool_size=settings.DB_POOL_SIZE,
+  max_overflow=settings.DB_MAX_OVERFLOW,
+  pool_timeout=settings.DB_POOL_TIMEOUT,
+  pool_recycle=settings.DB_POOL_RECYCLE,
+  pool_pre_ping=True,
+)
+
+# Conteo, duración y log muestreado de cada sentencia (sin echo)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+instrument_profiler(engine)
+instrument_profiler(async_engine.sync_engine)
+
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+async def get_session():
+  # Una sesión por request; se cierra al terminar la respuesta
+  async with async_session_factory() as session:
+    yield session
+
+redis_client = InstrumentedRedis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Cliente asíncrono para operaciones bloqueantes (XREADGROUP, pub/sub) dentro del event loop
+async_redis_client = InstrumentedAsyncRedis.from_url(settings.REDIS_URL, decode_responses=True)
 
 def get_redis():
   return redis_client
 
 def create_tables():
-  SQLModel.metadata.create_all(engine)
\ No newline at end of file
+  # pg_trgm es necesario para los índices GIN de búsqueda de recursos
+  with engine.begin() as connection:
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+  SQLModel.metadata.create_all(engine)
+  with engine.begin() as connection:
+    ensure_branch_summaries(connection)
\ No newline at end of file
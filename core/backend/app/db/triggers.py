@@ -0,0 +1,158 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Resúmenes por sucursal mantenidos de forma incremental con triggers por sentencia:
+# las tablas de transición (new_rows / old_rows) permiten agregar los deltas de un
+# COPY o de un UPDATE masivo en un solo upsert por (sucursal, estado) en lugar de uno por fila.
+
+# Transferencias que aún no llegan a destino
+PENDING_TRANSFER_STATUSES = "('PENDING', 'SENT')"
+
+SUMMARIES = {
+  "resource": {
+    "function": "branch_summary_resource",
+    "deltas": (
+      "SELECT branch_id, status, {sign} AS resource_count, {sign} * price * stock AS inventory_value "
+      "FROM {rows} WHERE branch_id IS NOT NULL"
+    ),
+    "target": "branchresourcesummary",
+    "keys": ["branch_id", "status"],
+    "counters": ["resource_count", "inventory_value"],
+  },
+  "person": {
+    "function": "branch_summary_person",
+    "deltas": "SELECT branch_id, {sign} AS headcount FROM {rows} WHERE branch_id IS NOT NULL",
+    "target": "branchsummary",
+    "keys": ["branch_id"],
+    "counters": ["headcount"],
+  },
+  "resourcetransferrecord": {
+    "function": "branch_summary_transfer",
+    "deltas": (
+      "SELECT to_branch_id AS branch_id, {sign} AS pending_transfers_in, 0 AS pending_transfers_out "
+      f"FROM {{rows}} WHERE status IN {PENDING_TRANSFER_STATUSES} "
+      "UNION ALL "
+      "SELECT from_branch_id, 0, {sign} "
+      f"FROM {{rows}} WHERE status IN {PENDING_TRANSFER_STATUSES}"
+    ),
+    "target": "branchsummary",
+    "keys": ["branch_id"],
+    "counters": ["pending_transfers_in", "pending_transfers_out"],
+  },
+}
+
+def _upsert(summary: dict, deltas: str) -> str:
+  keys, counters, target = ", ".join(summary["keys"]), summary["counters"], summary["target"]
+  # ORDER BY fija el orden de bloqueo de las filas de resumen y evita interbloqueos entre sentencias concurrentes
+  return (
+    f"INSERT INTO {target} ({keys}, {', '.join(counters)}) "
+    f"SELECT {keys}, {', '.join(f'sum({counter})' for counter in counters)} FROM ({deltas}) AS deltas "
+    f"GROUP BY {keys} HAVING {' OR '.join(f'sum({counter}) <> 0' for counter in counters)} "
+    f"ORDER BY {keys} "
+    f"ON CONFLICT ({keys}) DO UPDATE SET "
+    + ", ".join(f"{counter} = {target}.{counter} + EXCLUDED.{counter}" for counter in counters)
+  )
+
+def _function_sql(summary: dict) -> str:
+  added = summary["deltas"].format(sign="1", rows="new_rows")
+  removed = summary["deltas"].format(sign="-1", rows="old_rows")
+  return f"""
+    CREATE OR REPLACE FUNCTION {summary["function"]}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+      IF TG_OP = 'INSERT' THEN
+        {_upsert(summary, added)};
+      ELSIF TG_OP = 'DELETE' THEN
+        {_upsert(summary, removed)};
+      ELSE
+        {_upsert(summary, f"{added} UNION ALL {removed}")};
+      END IF;
+      RETURN NULL;
+    END $$
+  """
+
+def _trigger_sql(table: str, function: str) -> list[str]:
+  # Las tablas de transición exigen un trigger por evento
+  referencing = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+  }
+  statements = []
+  for event, tables in referencing.items():
+    name = f"{table}_summary_{event.lower()}"
+    statements.append(f'DROP TRIGGER IF EXISTS {name} ON "{table}"')
+    statements.append(
+      f'CREATE TRIGGER {name} AFTER {event} ON "{table}" REFERENCING {tables} '
+      f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+    )
+  return statements
+
+REBUILD_SUMMARIES = [
+  # Bloquea escrituras en las tablas de origen mientras se recalcula desde cero
+  "LOCK TABLE resource, person, resourcetransferrecord IN SHARE MODE",
+  "TRUNCATE branchresourcesummary, branchsummary",
+  """
+    INSERT INTO branchresourcesummary (branch_id, status, resource_count, inventory_value)
+    SELECT branch_id, status, count(*), coalesce(sum(price * stock), 0)
+    FROM resource WHERE branch_id IS NOT NULL
+    GROUP BY branch_id, status
+  """,
+  f"""
+    INSERT INTO branchsummary (branch_id, headcount, pending_transfers_in, pending_transfers_out)
+    SELECT branch_id, sum(headcount), sum(pending_in), sum(pending_out) FROM (
+      SELECT branch_id, 1 AS headcount, 0 AS pending_in, 0 AS pending_out FROM person WHERE branch_id IS NOT NULL
+      UNION ALL
+      SELECT to_branch_id, 0, 1, 0 FROM resourcetransferrecord WHERE status IN {PENDING_TRANSFER_STATUSES}
+      UNION ALL
+      SELECT from_branch_id, 0, 0, 1 FROM resourcetransferrecord WHERE status IN {PENDING_TRANSFER_STATUSES}
+    ) AS totals
+    GROUP BY branch_id
+  """,
+]
+
+def install_branch_summaries(connection: Connection):
+  for table, summary in SUMMARIES.items():
+    connection.execute(text(_function_sql(summary)))
+    for statement in _trigger_sql(table, summary["function"]):
+      connection.execute(text(statement))
+
+def rebuild_branch_summaries(connection: Connection):
+  for statement in REBUILD_SUMMARIES:
+    connection.execute(text(statement))
+
+def ensure_branch_summaries(connection: Connection) -> bool:
+  # Instala y recalcula solo si faltan triggers (base nueva creada con create_all): el recálculo
+  # bloquea las tablas de origen, así que no se repite en cada arranque. El candado serializa
+  # a los workers que arrancan a la vez
+  connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('branch_summaries'))"))
+  names = [f"{table}_summary_{event}" for table in SUMMARIES for event in ("insert", "update", "delete")]
+  installed = connection.execute(
+    text("SELECT count(*) FROM pg_trigger WHERE tgname = ANY(:names) AND NOT tgisinternal"), {"names": names}
+  ).scalar()
+  if installed == len(names):
+    return False
+
+  install_branch_summaries(connection)
+  rebuild_branch_summaries(connection)
+  return True
+
+def drop_branch_summaries(connection: Connection):
+  for table, summary in SUMMARIES.items():
+    for event in ("insert", "update", "delete"):
+      connection.execute(text(f'DROP TRIGGER IF EXISTS {table}_summary_{event} ON "{table}"'))
+    connection.execute(text(f"DROP FUNCTION IF EXISTS {summary['function']}()"))
+
+# Recálculo explícito tras una carga fuera de los triggers o una corrección manual:
+#   python -m app.db.triggers rebuild
+if __name__ == "__main__":
+  import sys
+  from app.db.session import engine
+
+  command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+  with engine.begin() as connection:
+    if command == "install":
+      install_branch_summaries(connection)
+      print("Triggers de resúmenes instalados")
+    else:
+      rebuild_branch_summaries(connection)
+      print("Resúmenes por sucursal recalculados")
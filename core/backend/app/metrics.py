@@ -0,0 +1,206 @@
+# Métricas Prometheus de la API: latencia por ruta, SQL, Redis, pool de conexiones y jobs del scheduler.
+# Con varios workers de uvicorn, definir PROMETHEUS_MULTIPROC_DIR (directorio vacío y compartido)
+# para que /metrics agregue los valores de todos los procesos.
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.responses import Response
+from app.config import settings
+import json
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger("app.sql")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+HTTP_REQUEST_DURATION = Histogram(
+  "http_request_duration_seconds", "Latencia de las solicitudes HTTP por ruta",
+  ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+DB_STATEMENTS = Counter("db_statements_total", "Sentencias SQL ejecutadas", ["engine", "operation"])
+DB_STATEMENT_DURATION = Histogram(
+  "db_statement_duration_seconds", "Duración de las sentencias SQL", ["engine", "operation"], buckets=FAST_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+  "db_pool_checkout_wait_seconds", "Espera para obtener una conexión del pool", ["engine"], buckets=FAST_BUCKETS
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Conexiones entregadas por el pool", ["engine"])
+DB_POOL_IN_USE = Gauge(
+  "db_pool_connections_in_use", "Conexiones entregadas y aún no devueltas al pool", ["engine"],
+  multiprocess_mode="livesum"
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Esperas del pool que agotaron DB_POOL_TIMEOUT", ["engine"])
+REDIS_COMMAND_DURATION = Histogram(
+  "redis_command_duration_seconds", "Latencia de los comandos Redis (pipelines como PIPELINE)",
+  ["command"], buckets=FAST_BUCKETS
+)
+SCHEDULER_JOB_DURATION = Histogram(
+  "scheduler_job_duration_seconds", "Duración de los jobs del scheduler", ["job", "result"], buckets=LATENCY_BUCKETS
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+  "scheduler_job_last_success_timestamp_seconds", "Fin de la última ejecución exitosa de cada job (epoch)", ["job"],
+  multiprocess_mode="max"
+)
+
+# --- HTTP -------------------------------------------------------------------------------------
+
+class MetricsMiddleware:
+  # Middleware ASGI puro: no envuelve el cuerpo de las respuestas en streaming ni los WebSocket
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      return await self.app(scope, receive, send)
+
+    started = time.perf_counter()
+    status_code = 500
+
+    async def send_wrapper(message):
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      # Plantilla de la ruta (/api/v1/branches/{branch_id}) para no crear una serie por id
+      route = scope.get("route")
+      HTTP_REQUEST_DURATION.labels(
+        scope["method"], route.path if route else "unmatched", str(status_code)
+      ).observe(time.perf_counter() - started)
+
+def metrics_response() -> Response:
+  registry = None
+  if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+  return Response(generate_latest(registry) if registry else generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# --- SQL ----------------------------------------------------------------------------------------
+
+def _operation(statement: str) -> str:
+  keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+  return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY") else "OTHER"
+
+def configure_sql_logging():
+  # Una línea JSON por sentencia registrada, lista para el agregador de logs
+  if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+  logger.setLevel(logging.INFO)
+  logger.propagate = False
+
+def instrument_engine(engine, name: str):
+  # Sustituye echo=True: cuenta y mide todas las sentencias, pero solo registra una muestra
+  # (SQL_LOG_SAMPLE_RATE) y las lentas (SQL_SLOW_QUERY_MS), como líneas JSON
+  @event.listens_for(engine, "before_cursor_execute")
+  def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+  @event.listens_for(engine, "after_cursor_execute")
+  def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation = _operation(statement)
+    DB_STATEMENTS.labels(name, operation).inc()
+    DB_STATEMENT_DURATION.labels(name, operation).observe(elapsed)
+
+    duration_ms = elapsed * 1000
+    slow = duration_ms >= settings.SQL_SLOW_QUERY_MS
+    if slow or random.random() < settings.SQL_LOG_SAMPLE_RATE:
+      logger.log(logging.WARNING if slow else logging.INFO, json.dumps({
+        "event": "sql_slow" if slow else "sql_sample",
+        "engine": name,
+        "operation": operation,
+        "duration_ms": round(duration_ms, 2),
+        "rowcount": cursor.rowcount if cursor is not None else None,
+        "executemany": executemany,
+        "statement": " ".join(statement.split())[:2000],
+      }))
+
+  @event.listens_for(engine, "handle_error")
+  def handle_error(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+      started.pop()
+
+class _TimedPoolMixin:
+  # _do_get es el punto donde el pool entrega una conexión o espera a que se libere una
+  metrics_name = "default"
+
+  def _do_get(self):
+    started = time.perf_counter()
+    try:
+      connection = super()._do_get()
+    except PoolTimeoutError:
+      DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+      raise
+    DB_POOL_WAIT.labels(self.metrics_name).observe(time.perf_counter() - started)
+    DB_POOL_CHECKOUTS.labels(self.metrics_name).inc()
+    DB_POOL_IN_USE.labels(self.metrics_name).inc()
+    return connection
+
+  def _do_return_conn(self, record):
+    DB_POOL_IN_USE.labels(self.metrics_name).dec()
+    return super()._do_return_conn(record)
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+  metrics_name = "sync"
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+  metrics_name = "async"
+
+# --- Redis --------------------------------------------------------------------------------------
+
+def _command_name(args) -> str:
+  return str(args[0]).split(" ")[0].upper() if args else "UNKNOWN"
+
+class InstrumentedPipeline(Pipeline):
+  def execute(self, raise_on_error: bool = True):
+    started = time.perf_counter()
+    try:
+      return super().execute(raise_on_error)
+    finally:
+      REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - started)
+
+class InstrumentedRedis(Redis):
+  def execute_command(self, *args, **options):
+    started = time.perf_counter()
+    try:
+      return super().execute_command(*args, **options)
+    finally:
+      REDIS_COMMAND_DURATION.labels(_command_name(args)).observe(time.perf_counter() - started)
+
+  def pipeline(self, transaction: bool = True, shard_hint=None):
+    return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+class InstrumentedAsyncPipeline(AsyncPipeline):
+  async def execute(self, raise_on_error: bool = True):
+    started = time.perf_counter()
+    try:
+      return await super().execute(raise_on_error)
+    finally:
+      REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - started)
+
+class InstrumentedAsyncRedis(AsyncRedis):
+  async def execute_command(self, *args, **options):
+    started = time.perf_counter()
+    try:
+      return await super().execute_command(*args, **options)
+    finally:
+      REDIS_COMMAND_DURATION.labels(_command_name(args)).observe(time.perf_counter() - started)
+
+  def pipeline(self, transaction: bool = True, shard_hint=None):
+    return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,126 @@
+# Perfilador de consultas por solicitud y detector de N+1, solo para desarrollo y pruebas.
+# Con QUERY_PROFILER_ENABLED=true cada respuesta HTTP lleva X-Query-Count, X-Query-Duration-Ms,
+# X-Query-N1 y Server-Timing, y las solicitudes con formas repetidas dejan un registro en app.profiler.
+# Fuera de una solicitud: `with profile_queries() as profile: ...` o `with query_budget(3): ...`.
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from app.config import settings
+import json
+import logging
+import re
+import time
+
+logger = logging.getLogger("app.profiler")
+
+_current_profile: ContextVar["QueryProfile | None"] = ContextVar("query_profile", default=None)
+
+_LITERALS = [
+  (re.compile(r"'(?:[^']|'')*'"), "?"),                         # cadenas
+  (re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+"), "?"),           # parámetros asyncpg / psycopg2 / text()
+  (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                       # números
+  (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),            # listas IN (?, ?, ...)
+  (re.compile(r"\s+"), " "),
+]
+
+def normalize(statement: str) -> str:
+  # Misma consulta con distintos valores -> misma forma
+  for pattern, replacement in _LITERALS:
+    statement = pattern.sub(replacement, statement)
+  return statement.strip()
+
+@dataclass
+class QueryProfile:
+  statements: list[tuple[str, float]] = field(default_factory=list)
+
+  def record(self, statement: str, duration: float):
+    self.statements.append((normalize(statement), duration))
+
+  @property
+  def count(self) -> int:
+    return len(self.statements)
+
+  @property
+  def duration_ms(self) -> float:
+    return round(sum(duration for _, duration in self.statements) * 1000, 2)
+
+  def shapes(self) -> Counter:
+    return Counter(shape for shape, _ in self.statements)
+
+  def suspects(self, threshold: int | None = None) -> list[tuple[str, int]]:
+    # Una misma forma repetida dentro de una solicitud suele ser una consulta por elemento de una lista
+    threshold = threshold or settings.QUERY_PROFILER_N1_THRESHOLD
+    return [(shape, count) for shape, count in self.shapes().most_common() if count >= threshold]
+
+  def summary(self) -> dict:
+    return {
+      "queries": self.count,
+      "duration_ms": self.duration_ms,
+      "distinct_shapes": len(self.shapes()),
+      "n_plus_one": [{"count": count, "statement": shape[:500]} for shape, count in self.suspects()],
+    }
+
+def instrument_profiler(engine):
+  # Coste casi nulo sin perfil activo: una lectura de ContextVar por sentencia
+  @event.listens_for(engine, "before_cursor_execute")
+  def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+      conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+  @event.listens_for(engine, "after_cursor_execute")
+  def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = conn.info.get("profile_started")
+    if profile is not None and started:
+      profile.record(statement, time.perf_counter() - started.pop())
+
+@contextmanager
+def profile_queries():
+  profile = QueryProfile()
+  token = _current_profile.set(profile)
+  try:
+    yield profile
+  finally:
+    _current_profile.reset(token)
+
+@contextmanager
+def query_budget(max_queries: int, allow_n_plus_one: bool = False):
+  # Para pruebas: falla si el bloque ejecuta más consultas de las presupuestadas o repite formas
+  with profile_queries() as profile:
+    yield profile
+  summary = profile.summary()
+  if profile.count > max_queries:
+    raise AssertionError(f"{profile.count} consultas, presupuesto {max_queries}: {json.dumps(summary, indent=2)}")
+  if summary["n_plus_one"] and not allow_n_plus_one:
+    raise AssertionError(f"Posible N+1: {json.dumps(summary['n_plus_one'], indent=2)}")
+
+class QueryProfilerMiddleware:
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      return await self.app(scope, receive, send)
+
+    with profile_queries() as profile:
+      async def send_wrapper(message):
+        # Las sentencias posteriores al inicio de la respuesta (streaming) solo quedan en el log
+        if message["type"] == "http.response.start":
+          suspects = profile.suspects()
+          message["headers"] = list(message.get("headers", [])) + [
+            (b"x-query-count", str(profile.count).encode()),
+            (b"x-query-duration-ms", str(profile.duration_ms).encode()),
+            (b"x-query-n1", str(len(suspects)).encode()),
+            (b"server-timing", f'db;dur={profile.duration_ms};desc="{profile.count} queries"'.encode()),
+          ]
+        await send(message)
+
+      await self.app(scope, receive, send_wrapper)
+
+    summary = profile.summary()
+    if summary["n_plus_one"]:
+      logger.warning(json.dumps({"event": "n_plus_one", "method": scope["method"], "path": scope["path"], **summary}))
+    else:
+      logger.debug(json.dumps({"event": "query_profile", "method": scope["method"], "path": scope["path"], **summary}))
@@ -0,0 +1,111 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from redis import Redis
+from uuid import uuid4
+from app.config import settings
+from app.db.session import redis_client
+from app.db.redis_scripts import renew_if_owner, release_if_owner
+from app.metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_LAST_SUCCESS, configure_sql_logging
+from prometheus_client import start_http_server
+from app.tasks import clean_unverified_users, flush_notifications, flush_chat_messages, create_transfer_partitions
+import functools
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "scheduler:leader"
+JOB_LOCK_KEY = "scheduler:lock:{job}"
+
+class LeaderScheduler:
+  def __init__(self, scheduler=None, redis: Redis = redis_client):
+    self.scheduler = scheduler or BackgroundScheduler()
+    self.redis = redis
+    self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+    self.is_leader = False
+
+  def elect(self):
+    lease_ms = settings.SCHEDULER_LEASE_TTL * 1000
+    try:
+      if self.is_leader and renew_if_owner(keys=[LEADER_KEY], args=[self.instance_id, lease_ms], client=self.redis):
+        return
+      acquired = self.redis.set(LEADER_KEY, self.instance_id, nx=True, px=lease_ms)
+    except Exception as e:
+      logger.error(f"[ERROR] No se pudo renovar el liderazgo del scheduler: {e}")
+      acquired = False
+
+    if bool(acquired) != self.is_leader:
+      logger.info(f"[INFO] Scheduler {self.instance_id} {'es ahora líder' if acquired else 'perdió el liderazgo'}.")
+    self.is_leader = bool(acquired)
+
+  def add_job(self, func, trigger, lock_ttl: int = 300, **trigger_args):
+    self.scheduler.add_job(
+      self._wrap(func, lock_ttl), trigger,
+      id=func.__name__, max_instances=1, coalesce=True, **trigger_args
+    )
+
+  def _wrap(self, func, lock_ttl: int):
+    name = func.__name__
+    lock_key = JOB_LOCK_KEY.format(job=name)
+
+    @functools.wraps(func)
+    def run():
+      if not self.is_leader:
+        return
+
+      # Candado por job: evita solapamientos si el liderazgo cambia a mitad de una ejecución
+      if not self.redis.set(lock_key, self.instance_id, nx=True, ex=lock_ttl):
+        logger.warning(f"[WARNING] {name} sigue en ejecución en otra instancia, omitiendo.")
+        return
+
+      # Ejecuciones, fallos y duración se exponen en Prometheus; el detalle de los errores queda en el log
+      started = time.perf_counter()
+      result = "success"
+      try:
+        func()
+        SCHEDULER_JOB_LAST_SUCCESS.labels(name).set_to_current_time()
+      except Exception as e:
+        logger.error(f"[ERROR] Fallo en el job {name}: {e}", exc_info=True)
+        result = "failure"
+      finally:
+        SCHEDULER_JOB_DURATION.labels(name, result).observe(time.perf_counter() - started)
+        release_if_owner(keys=[lock_key], args=[self.instance_id], client=self.redis)
+
+    return run
+
+  def start(self):
+    self.elect()
+    self.scheduler.add_job(
+      self.elect, "interval", seconds=settings.SCHEDULER_LEASE_RENEW,
+      id="scheduler_leader_election", max_instances=1, coalesce=True
+    )
+    self.scheduler.start()
+
+  def shutdown(self):
+    if self.scheduler.running:
+      self.scheduler.shutdown(wait=False)
+    if self.is_leader:
+      release_if_owner(keys=[LEADER_KEY], args=[self.instance_id], client=self.redis)
+      self.is_leader = False
+
+def create_scheduler(scheduler=None) -> LeaderScheduler:
+  leader_scheduler = LeaderScheduler(scheduler)
+  leader_scheduler.add_job(clean_unverified_users, "interval", minutes=1)
+  leader_scheduler.add_job(flush_notifications, "interval", seconds=settings.NOTIFICATIONS_FLUSH_INTERVAL)
+  leader_scheduler.add_job(flush_chat_messages, "interval", seconds=settings.CHAT_FLUSH_INTERVAL)
+  leader_scheduler.add_job(create_transfer_partitions, "interval", hours=6)
+  return leader_scheduler
+
+if __name__ == "__main__":
+  # Proceso dedicado: python -m app.scheduler (con SCHEDULER_ENABLED=false en los workers de la API)
+  logging.basicConfig(level=logging.INFO)
+  configure_sql_logging()
+  # Fuera de la API no hay /metrics: el proceso expone sus propias métricas para Prometheus
+  start_http_server(settings.SCHEDULER_METRICS_PORT)
+  leader_scheduler = create_scheduler(BlockingScheduler())
+  try:
+    leader_scheduler.start()
+  except (KeyboardInterrupt, SystemExit):
+    leader_scheduler.shutdown()
\ No newline at end of file
@@ -1,7 +1,8 @@
 from datetime import datetime, timezone
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from uuid import uuid4, UUID
 from .enum import *
 from sqlalchemy import func
@@ -13,6 +14,11 @@ def utcnow_column():
   )
 
 class User(SQLModel, table=True):
+  __table_args__ = (
+    Index("ix_user_created_at_id", "created_at", "id"),
+    Index("ix_user_unverified_created_at", "created_at", "id", postgresql_where=text("is_verified = false")),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   username: str = Field(index=True)
   email: str = Field(index=True)
@@ -104,20 +110,28 @@ class Business(SQLModel, table=True):
   )
 
 class Resource(SQLModel, table=True):
+  # Índices trigram (pg_trgm) para búsqueda por subcadena y difusa
+  __table_args__ = (
+    Index("ix_resource_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_resource_serial_number_trgm", "serial_number", postgresql_using="gin", postgresql_ops={"serial_number": "gin_trgm_ops"}),
+    Index("ix_resource_asset_number_trgm", "asset_number", postgresql_using="gin", postgresql_ops={"asset_number": "gin_trgm_ops"}),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   name: str = Field(index=True)
   description: Optional[str] = None
   price: float = Field(default=0)
   stock: int = Field(default=1)
-  serial_number: str = Field(index=True)
+  # Único en todo el sistema: la importación se apoya en él para descartar duplicados
+  serial_number: str = Field(index=True, unique=True)
   asset_number: Optional[str] = Field(index=True)
   status: ResourceStatus = Field(default=ResourceStatus.ACTIVE)
   location: Optional[str] = None
   tracking_qr_code: Optional[str] = None
   last_scanned_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
-  category_id: UUID = Field(foreign_key="category.id")
-  branch_id: UUID = Field(default=None, foreign_key="branch.id")
-  business_id: UUID = Field(default=None, foreign_key="business.id")
+  category_id: UUID = Field(foreign_key="category.id", index=True)
+  branch_id: UUID = Field(default=None, foreign_key="branch.id", index=True)
+  business_id: UUID = Field(default=None, foreign_key="business.id", index=True)
   created_by: UUID = Field(foreign_key="user.id")
   created_at: datetime = utcnow_column()
   updated_at: datetime = utcnow_column()
@@ -180,14 +194,24 @@ class ResourceMedia(SQLModel, table=True):
   resource: "Resource" = Relationship(back_populates="media")
 
 class ResourceTransferRecord(SQLModel, table=True):
+  # Las consultas por sucursal (enviadas / recibidas) ordenan por (created_at, id);
+  # los índices de ruta cubren el filtro por sucursal de contraparte en el historial
+  __table_args__ = (
+    Index("ix_transfer_from_branch_created_at", "from_branch_id", "created_at", "id"),
+    Index("ix_transfer_to_branch_created_at", "to_branch_id", "created_at", "id"),
+    Index("ix_transfer_route_sent_created_at", "from_branch_id", "to_branch_id", "created_at", "id"),
+    Index("ix_transfer_route_received_created_at", "to_branch_id", "from_branch_id", "created_at", "id"),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
-  resource_id: UUID = Field(foreign_key="resource.id")
+  resource_id: UUID = Field(foreign_key="resource.id", index=True)
   from_branch_id: UUID = Field(foreign_key="branch.id")
   to_branch_id: UUID = Field(foreign_key="branch.id")
   from_business_id: Optional[UUID] = Field(foreign_key="business.id")
   to_business_id: Optional[UUID] = Field(foreign_key="business.id")
   status: ResourceTransferStatus = Field(default=ResourceTransferStatus.PENDING)
   initiated_by: UUID = Field(foreign_key="user.id")
+  idempotency_key: Optional[str] = Field(default=None, index=True)
   created_at: datetime = utcnow_column()
   updated_at: datetime = utcnow_column()
 
@@ -210,6 +234,16 @@ class ResourceTransferRecord(SQLModel, table=True):
     sa_relationship_kwargs={"foreign_keys": "[ResourceTransferRecord.to_business_id]"}
   )
 
+class ResourceTransferRequest(SQLModel, table=True):
+  # Resultado de cada transferencia con Idempotency-Key, con la clave propia de cada administrador:
+  # un reintento con el mismo cuerpo lo devuelve tal cual y uno con otro cuerpo se rechaza
+  initiated_by: UUID = Field(foreign_key="user.id", primary_key=True)
+  idempotency_key: str = Field(primary_key=True, max_length=255)
+  payload_hash: str
+  transferred: List[str] = Field(sa_column=Column(JSONB, nullable=False))
+  skipped: List[str] = Field(sa_column=Column(JSONB, nullable=False))
+  created_at: datetime = utcnow_column()
+
 class Category(SQLModel, table=True):
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   name: str = Field(index=True)
@@ -227,6 +261,10 @@ class Category(SQLModel, table=True):
   branch: "Branch" = Relationship(back_populates="categories")
 
 class ChatMessage(SQLModel, table=True):
+  __table_args__ = (
+    Index("ix_chatmessage_room_sent_at", "room_id", "sent_at", "id"),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   room_id: UUID = Field(foreign_key="chatroom.id")
   sender_id: UUID = Field(foreign_key="user.id")
@@ -256,9 +294,13 @@ class ChatRoom(SQLModel, table=True):
   branch: "Branch" = Relationship(back_populates="rooms")
 
 class ChatParticipant(SQLModel, table=True):
+  __table_args__ = (
+    Index("ix_chatparticipant_room_user", "room_id", "user_id"),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   room_id: UUID = Field(foreign_key="chatroom.id")
-  user_id: UUID = Field(foreign_key="user.id")
+  user_id: UUID = Field(foreign_key="user.id", index=True)
   joined_at: datetime = utcnow_column()
 
   # relationships
@@ -266,6 +308,11 @@ class ChatParticipant(SQLModel, table=True):
   user: "User" = Relationship(back_populates="rooms")
 
 class Notification(SQLModel, table=True):
+  __table_args__ = (
+    Index("ix_notification_receiver_created_at", "receiver_id", "created_at", "id"),
+    Index("ix_notification_receiver_unread", "receiver_id", "is_read", "created_at"),
+  )
+
   id: UUID = Field(default_factory=uuid4, primary_key=True)
   receiver_id: UUID = Field(foreign_key="user.id")
   sender_id: Optional[UUID] = Field(default=None, foreign_key="user.id")
@@ -329,4 +376,21 @@ class Invitation(SQLModel, table=True):
     sa_relationship_kwargs={"foreign_keys": "[Invitation.invited_user_id]"}
   )
   branch: "Branch" = Relationship(back_populates="invitations")
-  business: "Business" = Relationship(back_populates="invitations")
\ No newline at end of file
+  business: "Business" = Relationship(back_populates="invitations")
+
+# Resúmenes por sucursal mantenidos por triggers (app/db/triggers.py); no se escriben desde la aplicación
+def counter_column():
+  # Valor por defecto en el servidor: los triggers insertan solo las columnas que cambian
+  return Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+class BranchSummary(SQLModel, table=True):
+  branch_id: UUID = Field(foreign_key="branch.id", primary_key=True)
+  headcount: int = counter_column()
+  pending_transfers_in: int = counter_column()
+  pending_transfers_out: int = counter_column()
+
+class BranchResourceSummary(SQLModel, table=True):
+  branch_id: UUID = Field(foreign_key="branch.id", primary_key=True)
+  status: ResourceStatus = Field(primary_key=True)
+  resource_count: int = counter_column()
+  inventory_value: float = counter_column()
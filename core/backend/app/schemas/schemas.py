@@ -1,9 +1,16 @@
 from datetime import datetime
 from uuid import UUID
-from app.schemas.enum import BranchStatus
+from app.schemas.enum import BranchStatus, UserRole, UserStatus, NotificationType, ResourceStatus, ResourceTransferStatus
+from typing import Generic, Literal, Optional, TypeVar
 from sqlmodel import Field
 from pydantic import EmailStr, BaseModel
 
+T = TypeVar("T")
+
+class CursorPage(BaseModel, Generic[T]):
+  items: list[T]
+  next_cursor: Optional[str] = None
+
 class UserCreate(BaseModel):
   full_name: str
   username: str = Field(min_length=3, max_length=20)
@@ -14,6 +21,26 @@ class UserLogin(BaseModel):
   email: EmailStr
   password: str
 
+class UserRead(BaseModel):
+  user_id: UUID
+  full_name: Optional[str] = None
+  username: str
+  email: EmailStr
+  ci: Optional[int] = None
+  role: UserRole
+  branch_id: Optional[UUID] = None
+  status: UserStatus
+  is_verified: bool
+  picture: Optional[str] = None
+  country: Optional[str] = None
+  created_at: datetime
+  updated_at: datetime
+
+class Principal(BaseModel):
+  id: UUID
+  role: UserRole
+  status: UserStatus
+
 class BranchBase(BaseModel):
   name: str = Field(min_length=3, description="Nombre de la sucursal")
   address: str = Field(None, description="Dirección de la sucursal")
@@ -29,4 +56,67 @@ class BranchRead(BranchBase):
   status: BranchStatus
   created_by: UUID
   created_at: datetime
-  updated_at: datetime
\ No newline at end of file
+  updated_at: datetime
+
+class BranchSummaryRead(BaseModel):
+  branch_id: UUID
+  resources_by_status: dict[ResourceStatus, int]
+  total_resources: int
+  inventory_value: float
+  headcount: int
+  pending_transfers_in: int
+  pending_transfers_out: int
+
+class NotificationCreate(BaseModel):
+  receiver_id: UUID
+  type: NotificationType
+  title: str
+  message: str
+  target_id: Optional[UUID] = None
+  url: Optional[str] = None
+  business_id: Optional[UUID] = None
+  branch_id: Optional[UUID] = None
+
+class NotificationRead(NotificationCreate):
+  id: UUID
+  sender_id: Optional[UUID] = None
+  is_read: bool = False
+  created_at: datetime
+
+class ChatMessageCreate(BaseModel):
+  content: str = Field(min_length=1, max_length=4000)
+
+class ChatMessageRead(BaseModel):
+  id: UUID
+  room_id: UUID
+  sender_id: UUID
+  content: str
+  seen: bool = False
+  sent_at: datetime
+
+class ResourceTransferCreate(BaseModel):
+  to_branch_id: UUID
+  resource_ids: list[UUID] = Field(min_length=1, max_length=5000)
+  status: ResourceTransferStatus = ResourceTransferStatus.RECEIVED
+
+class ResourceTransferRecordRead(BaseModel):
+  id: UUID
+  resource_id: UUID
+  from_branch_id: UUID
+  to_branch_id: UUID
+  from_business_id: Optional[UUID] = None
+  to_business_id: Optional[UUID] = None
+  status: ResourceTransferStatus
+  initiated_by: UUID
+  direction: Literal["sent", "received"]
+  created_at: datetime
+  updated_at: datetime
+
+class ResourceImportRow(BaseModel):
+  name: str = Field(min_length=1, max_length=255)
+  serial_number: str = Field(min_length=1, max_length=255)
+  asset_number: Optional[str] = Field(None, max_length=255)
+  category_id: UUID
+  price: float = Field(0, ge=0)
+  stock: int = Field(1, ge=0)
+  description: Optional[str] = None
\ No newline at end of file
@@ -1,29 +1,42 @@
 from fastapi import Request, HTTPException, Depends, status
 from app.db.session import get_session
 from app.utils.jwt import JWT
-from sqlmodel import Session
-from app.schemas.models import User
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
 from app.schemas.enum import UserRole
+from app.schemas.schemas import Principal
+from app.security.principal import resolve_principal
 
 jwt = JWT()
 
-def get_current_admin(
+def decode_access_token(token: str) -> tuple[UUID, dict]:
+  try:
+    payload = jwt.decode(token)
+    return UUID(payload.get("sub")), payload
+  except Exception:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tóken de acceso inválido o expirado.")
+
+async def get_current_user(
   request: Request,
-  session: Session = Depends(get_session)
-) -> User:
+  session: AsyncSession = Depends(get_session)
+) -> Principal:
   auth_header = request.headers.get("Authorization")
   if not auth_header or not auth_header.startswith("Bearer "):
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tóken de acceso no proporcionado.")
   
   token = auth_header.split(" ")[1]
-  try:
-    payload = jwt.decode(token)
-    user_id = payload.get("sub")
-  except Exception:
+  user_id, payload = decode_access_token(token)
+
+  principal = await resolve_principal(session, user_id, payload.get("exp"))
+  if not principal:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tóken de acceso inválido o expirado.")
-  
-  user = session.get(User, user_id)
-  if not user or user.role != UserRole.ADMIN:
+
+  return principal
+
+async def get_current_admin(
+  principal: Principal = Depends(get_current_user)
+) -> Principal:
+  if principal.role != UserRole.ADMIN:
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado: se requiere rol ADMIN.")
   
-  return user
\ No newline at end of file
+  return principal
\ No newline at end of file
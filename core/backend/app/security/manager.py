@@ -3,6 +3,7 @@ from jose import jwt, JWTError
 from redis import Redis
 from app.config import settings
 from app.db.session import get_redis
+from app.security.sessions import session_owner
 
 class SecurityManager():
   def __init__(self, redis: Redis = Depends(get_redis)):
@@ -21,9 +22,9 @@ class SecurityManager():
     try:
       payload = jwt.decode(refresh_token, self.secret, algorithms=[self.algorithm])
       jti = payload.get("jti")
-      stored = self.redis.get(f"refresh_token:{jti}")
 
-      if not stored or stored.decode() != refresh_token:
+      # La sesión vive en refresh_session:{jti} y debe pertenecer al sujeto del tóken
+      if not jti or session_owner(self.redis, jti) != payload.get("sub"):
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Tóken de refresco inválido o expirado.")
 
       return payload
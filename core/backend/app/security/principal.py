@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from uuid import UUID
+from redis.asyncio import Redis as AsyncRedis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db.session import async_redis_client, redis_client
+from app.schemas.models import User
+from app.schemas.schemas import Principal
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY = "principal:{user_id}"
+INVALIDATION_CHANNEL = "principal:invalidate"
+
+# Nivel 1: LRU en memoria del worker. Las invalidaciones llegan a todos los workers por Redis pub/sub;
+# el TTL corto acota el dato viejo si se pierde algún mensaje
+_local_cache: "OrderedDict[UUID, tuple[float, Principal]]" = OrderedDict()
+
+def _seconds_until(exp: Optional[int]) -> int:
+  if not exp:
+    return 0
+  return max(0, int(exp - datetime.now(timezone.utc).timestamp()))
+
+def _get_local(user_id: UUID) -> Optional[Principal]:
+  entry = _local_cache.get(user_id)
+  if not entry:
+    return None
+
+  expires_at, principal = entry
+  if expires_at <= time.monotonic():
+    _local_cache.pop(user_id, None)
+    return None
+
+  _local_cache.move_to_end(user_id)
+  return principal
+
+def _set_local(user_id: UUID, principal: Principal, ttl: int):
+  ttl = min(ttl, settings.PRINCIPAL_LOCAL_TTL)
+  if ttl <= 0:
+    return
+
+  _local_cache[user_id] = (time.monotonic() + ttl, principal)
+  _local_cache.move_to_end(user_id)
+  while len(_local_cache) > settings.PRINCIPAL_CACHE_SIZE:
+    _local_cache.popitem(last=False)
+
+async def resolve_principal(session: AsyncSession, user_id: UUID, exp: Optional[int]) -> Optional[Principal]:
+  # La entrada nunca vive más que el tóken que la originó
+  ttl = _seconds_until(exp)
+
+  principal = _get_local(user_id)
+  if principal:
+    return principal
+
+  # Nivel 2: Redis, compartido entre workers
+  key = PRINCIPAL_KEY.format(user_id=user_id)
+  cached = redis_client.hgetall(key)
+  if cached:
+    principal = Principal(id=user_id, role=cached["role"], status=cached["status"])
+    _set_local(user_id, principal, ttl)
+    return principal
+
+  user = await session.get(User, user_id)
+  if not user:
+    return None
+
+  principal = Principal(id=user.id, role=user.role, status=user.status)
+  if ttl > 0:
+    with redis_client.pipeline() as pipe:
+      pipe.hset(key, mapping={"role": principal.role.value, "status": principal.status.value})
+      pipe.expire(key, ttl)
+      pipe.execute()
+  _set_local(user_id, principal, ttl)
+  return principal
+
+def invalidate_principal(user_id: UUID):
+  # Llamar siempre que cambie el rol o el estado del usuario, o al eliminarlo
+  _local_cache.pop(user_id, None)
+  with redis_client.pipeline() as pipe:
+    pipe.delete(PRINCIPAL_KEY.format(user_id=user_id))
+    pipe.publish(INVALIDATION_CHANNEL, str(user_id))
+    pipe.execute()
+
+class PrincipalInvalidationListener:
+  # Un listener por worker: descarta de su LRU los principals invalidados en cualquier otro worker
+  def __init__(self, redis: AsyncRedis = async_redis_client):
+    self.pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    self._listener: asyncio.Task | None = None
+    # Conexiones largas (WebSocket) que deben revalidar al usuario cuando se invalida
+    self._watchers: dict[UUID, set[asyncio.Event]] = {}
+
+  @contextmanager
+  def watch(self, user_id: UUID) -> Iterator[asyncio.Event]:
+    event = asyncio.Event()
+    self._watchers.setdefault(user_id, set()).add(event)
+    try:
+      yield event
+    finally:
+      watchers = self._watchers.get(user_id)
+      if watchers is not None:
+        watchers.discard(event)
+        if not watchers:
+          del self._watchers[user_id]
+
+  def _notify(self, user_ids):
+    for user_id in user_ids:
+      for event in self._watchers.get(user_id, ()):
+        event.set()
+
+  async def start(self):
+    # Suscrito antes de atender solicitudes: ninguna invalidación posterior al arranque se pierde
+    await self.pubsub.subscribe(INVALIDATION_CHANNEL)
+    self._listener = asyncio.create_task(self._listen())
+
+  async def stop(self):
+    if self._listener:
+      self._listener.cancel()
+      try:
+        await self._listener
+      except asyncio.CancelledError:
+        pass
+    await self.pubsub.aclose()
+
+  async def _listen(self):
+    while True:
+      try:
+        message = await self.pubsub.get_message(timeout=1.0)
+        if message and message["type"] == "message":
+          user_id = UUID(message["data"])
+          _local_cache.pop(user_id, None)
+          self._notify([user_id])
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        # Sin conexión se pudieron perder invalidaciones: se descarta todo el nivel local
+        # y todas las conexiones largas revalidan a su usuario
+        logger.error(f"[ERROR] Listener de invalidación de principals: {e}", exc_info=True)
+        _local_cache.clear()
+        self._notify(list(self._watchers))
+        await asyncio.sleep(1)
+
+principal_invalidations = PrincipalInvalidationListener()
\ No newline at end of file
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from fastapi import Depends, HTTPException, Request, status
+from redis import Redis
+from redis.exceptions import RedisError
+from app.config import settings
+from app.db.redis_scripts import sliding_window
+from app.db.session import get_redis
+import ipaddress
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "ratelimit:{name}:{dimension}:{value}"
+
+# Pre-filtro local: clientes que Redis ya rechazó quedan bloqueados en el worker hasta su Retry-After,
+# así una ráfaga de un cliente excedido no cuesta un round trip a Redis por solicitud
+_blocked: "OrderedDict[str, float]" = OrderedDict()
+
+TRUSTED_NETWORKS = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+def _is_trusted(address: str) -> bool:
+  try:
+    ip = ipaddress.ip_address(address)
+  except ValueError:
+    return False
+  return any(ip in network for network in TRUSTED_NETWORKS)
+
+def client_ip(request: Request) -> str | None:
+  # Detrás de nginx la conexión llega desde el proxy: solo entonces se leen sus cabeceras.
+  # X-Forwarded-For se recorre de derecha a izquierda saltando proxies de confianza, porque
+  # las entradas de la izquierda las escribe el cliente y pueden estar falsificadas
+  peer = request.client.host if request.client else None
+  if not peer or not _is_trusted(peer):
+    return peer
+
+  forwarded = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+  for hop in reversed(forwarded):
+    if not _is_trusted(hop):
+      return hop
+  return request.headers.get("X-Real-IP") or peer
+
+def parse_rate(rate: str) -> tuple[int, int]:
+  # "5/60" -> 5 solicitudes cada 60 segundos
+  limit, seconds = rate.split("/")
+  return int(limit), int(seconds)
+
+def _blocked_for(key: str) -> float:
+  until = _blocked.get(key)
+  if until is None:
+    return 0
+  remaining = until - time.monotonic()
+  if remaining <= 0:
+    _blocked.pop(key, None)
+    return 0
+  return remaining
+
+def _block(key: str, seconds: float):
+  _blocked[key] = time.monotonic() + seconds
+  _blocked.move_to_end(key)
+  while len(_blocked) > settings.RATE_LIMIT_LOCAL_SIZE:
+    _blocked.popitem(last=False)
+
+def _too_many_requests(seconds: float) -> HTTPException:
+  return HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Demasiadas solicitudes. Intenta de nuevo más tarde.",
+    headers={"Retry-After": str(max(1, math.ceil(seconds)))}
+  )
+
+async def _request_email(request: Request) -> str | None:
+  # FastAPI ya leyó el cuerpo para el endpoint; request.json() reutiliza el resultado
+  try:
+    body = await request.json()
+  except Exception:
+    return None
+  email = body.get("email") if isinstance(body, dict) else None
+  return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+class RateLimit:
+  # Dependencia reutilizable: RateLimit("sign-in", ip="30/60", email="5/60")
+  def __init__(self, name: str, ip: str | None = None, email: str | None = None):
+    self.name = name
+    self.rates = {dimension: parse_rate(rate) for dimension, rate in (("ip", ip), ("email", email)) if rate}
+
+  async def __call__(self, request: Request, redis: Redis = Depends(get_redis)):
+    if not settings.RATE_LIMIT_ENABLED or not self.rates:
+      return
+
+    values = {"ip": client_ip(request)}
+    if "email" in self.rates:
+      values["email"] = await _request_email(request)
+
+    keys, args = [], []
+    for dimension, (limit, seconds) in self.rates.items():
+      if not values.get(dimension):
+        continue
+      keys.append(RATE_LIMIT_KEY.format(name=self.name, dimension=dimension, value=values[dimension]))
+      args.extend([limit, seconds * 1000])
+
+    if not keys:
+      return
+
+    remaining = max(_blocked_for(key) for key in keys)
+    if remaining:
+      raise _too_many_requests(remaining)
+
+    try:
+      allowed, retry_after_ms, exceeded = sliding_window(keys=keys, args=args, client=redis)
+    except RedisError as e:
+      # Sin Redis no se bloquea el acceso: el límite es una protección, no una dependencia del login
+      logger.warning(f"[WARNING] Rate limit no disponible para {self.name}: {e}")
+      return
+
+    if not allowed:
+      # Solo se bloquea la dimensión excedida: un email atacado no bloquea a toda una IP compartida
+      seconds = retry_after_ms / 1000
+      _block(keys[exceeded - 1], seconds)
+      raise _too_many_requests(seconds)
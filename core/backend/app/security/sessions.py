@@ -0,0 +1,67 @@
+from redis import Redis
+from uuid import UUID
+from app.db.redis_scripts import rotate_refresh_session, revoke_refresh_session
+import time
+
+SESSION_PREFIX = "refresh_session:"
+SESSION_INDEX_KEY = "user_sessions:{user_id}"
+USED_TOKEN_KEY = "refresh_used:{jti}"
+REFRESH_TOKEN_TTL = 7 * 24 * 60 * 60 # 7 días
+
+ROTATED = 1
+REUSED = -1
+NOT_FOUND = 0
+
+def _session_key(jti: str) -> str:
+  return f"{SESSION_PREFIX}{jti}"
+
+def _index_key(user_id: UUID | str) -> str:
+  return SESSION_INDEX_KEY.format(user_id=user_id)
+
+def create_session(redis: Redis, user_id: UUID | str, jti: str, ttl: int = REFRESH_TOKEN_TTL):
+  # Una sesión por dispositivo: no invalida las sesiones existentes del usuario
+  now = int(time.time())
+  index_key = _index_key(user_id)
+  with redis.pipeline() as pipe:
+    pipe.hset(_session_key(jti), mapping={"user_id": str(user_id), "created_at": now})
+    pipe.expire(_session_key(jti), ttl)
+    pipe.zadd(index_key, {jti: now + ttl})
+    pipe.zremrangebyscore(index_key, "-inf", now)
+    pipe.expire(index_key, ttl)
+    pipe.execute()
+
+def rotate_session(redis: Redis, user_id: UUID | str, old_jti: str, new_jti: str, ttl: int = REFRESH_TOKEN_TTL) -> int:
+  # Un solo round trip; devuelve ROTATED, REUSED o NOT_FOUND. Una reutilización revoca todas las sesiones
+  result = rotate_refresh_session(
+    keys=[_session_key(old_jti), _index_key(user_id), _session_key(new_jti), USED_TOKEN_KEY.format(jti=old_jti)],
+    args=[str(user_id), old_jti, new_jti, ttl, int(time.time())],
+    client=redis,
+  )
+  if result == REUSED:
+    revoke_all_sessions(redis, user_id)
+  return result
+
+def revoke_session(redis: Redis, user_id: UUID | str, jti: str) -> tuple[bool, int]:
+  # Devuelve (revocada, sesiones restantes del usuario)
+  revoked, remaining = revoke_refresh_session(
+    keys=[_session_key(jti), _index_key(user_id)],
+    args=[str(user_id), jti, int(time.time())],
+    client=redis,
+  )
+  return bool(revoked), remaining
+
+def revoke_all_sessions(redis: Redis, user_id: UUID | str) -> int:
+  # WATCH sobre el índice: si otra petición crea o rota una sesión entre la lectura y el borrado,
+  # la transacción se repite con el índice actualizado
+  index_key = _index_key(user_id)
+
+  def revoke(pipe) -> int:
+    jtis = pipe.zrange(index_key, 0, -1)
+    pipe.multi()
+    pipe.delete(index_key, *[_session_key(jti) for jti in jtis])
+    return len(jtis)
+
+  return redis.transaction(revoke, index_key, value_from_callable=True)
+
+def session_owner(redis: Redis, jti: str) -> str | None:
+  return redis.hget(_session_key(jti), "user_id")
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import orjson
+import time
+import weakref
+from datetime import datetime
+from redis import Redis
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID, uuid4
+from app.config import settings
+from app.db.redis_scripts import read_versioned, release_if_owner
+from app.schemas.models import Branch
+from app.schemas.schemas import BranchRead
+from app.utils.responses import dumps, rows_to_dicts, schema_columns
+
+# Caché read-through del catálogo de sucursales y de cada sucursal, ya serializada a JSON.
+# Cada entrada guarda la versión con la que se llenó ("{versión}:{json}"): una escritura hace INCR
+# de la versión y las entradas anteriores dejan de ser válidas, sin borrados ni carreras de invalidación.
+VERSION_KEY = "branches:cache:version"
+STATS_KEY = "branches:cache:stats"
+CATALOG_KEY = "branches:catalog"
+ITEM_KEY = "branches:item:{branch_id}"
+
+POLL_INTERVAL = 0.025
+
+# Un solo recálculo por clave dentro del worker; entre workers lo coordina el lock en Redis
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _local_lock(key: str) -> asyncio.Lock:
+  lock = _local_locks.get(key)
+  if lock is None:
+    lock = asyncio.Lock()
+    _local_locks[key] = lock
+  return lock
+
+def _unpack(entry: str | None, version: str) -> str | None:
+  if entry is None:
+    return None
+  entry_version, _, value = entry.partition(":")
+  return value if entry_version == version else None
+
+async def _fill(redis: Redis, key: str, version: str, load) -> str | bytes | None:
+  lock_key, token = f"{key}:v{version}:lock", str(uuid4())
+  deadline = time.monotonic() + settings.BRANCH_CACHE_LOCK_TTL
+
+  while True:
+    if redis.set(lock_key, token, nx=True, ex=settings.BRANCH_CACHE_LOCK_TTL):
+      try:
+        value = await load()
+        if value is not None:
+          redis.set(key, f"{version}:".encode() + value, ex=settings.BRANCH_CACHE_TTL)
+        return value
+      finally:
+        release_if_owner(keys=[lock_key], args=[token], client=redis)
+
+    # Otro worker está recalculando: se espera su resultado en lugar de ir también a PostgreSQL
+    await asyncio.sleep(POLL_INTERVAL)
+    value = _unpack(redis.get(key), version)
+    if value is not None:
+      return value
+    if time.monotonic() >= deadline:
+      return await load()
+
+async def _read_through(redis: Redis, key: str, load) -> str | bytes | None:
+  version, value = read_versioned(keys=[VERSION_KEY, STATS_KEY, key], client=redis)
+  if value is not None:
+    return value
+
+  async with _local_lock(f"{key}:v{version}"):
+    # Otra corrutina del mismo worker pudo llenarla mientras se esperaba el lock
+    value = _unpack(redis.get(key), version)
+    if value is not None:
+      return value
+    return await _fill(redis, key, version, load)
+
+async def get_branch_catalog(session: AsyncSession, redis: Redis) -> str | bytes:
+  async def load():
+    rows = (await session.exec(select(*schema_columns(Branch, BranchRead)))).all()
+    return dumps(rows_to_dicts(rows))
+
+  return await _read_through(redis, CATALOG_KEY, load)
+
+async def get_branch_json(session: AsyncSession, redis: Redis, branch_id: UUID) -> str | bytes | None:
+  async def load():
+    row = (await session.exec(select(*schema_columns(Branch, BranchRead)).where(Branch.id == branch_id))).first()
+    return dumps(row._asdict()) if row else None
+
+  return await _read_through(redis, ITEM_KEY.format(branch_id=branch_id), load)
+
+def branch_last_modified(body: str | bytes) -> datetime:
+  # Los validadores salen del mismo JSON que se envía: ETag, Last-Modified y cuerpo no pueden divergir
+  branch = orjson.loads(body)
+  return datetime.fromisoformat(branch["updated_at"] or branch["created_at"])
+
+def invalidate_branch_cache(redis: Redis):
+  # Llamar después del commit de cualquier escritura sobre sucursales
+  redis.incr(VERSION_KEY)
+
+def branch_cache_stats(redis: Redis) -> dict:
+  stats = redis.hgetall(STATS_KEY)
+  hits, misses = int(stats.get("hits", 0)), int(stats.get("misses", 0))
+  return {
+    "hits": hits,
+    "misses": misses,
+    "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    "version": int(redis.get(VERSION_KEY) or 0),
+  }
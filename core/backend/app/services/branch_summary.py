@@ -0,0 +1,33 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from app.schemas.enum import ResourceStatus
+from app.schemas.models import Branch, BranchResourceSummary, BranchSummary
+
+async def get_branch_summary(session: AsyncSession, branch_id: UUID) -> dict | None:
+  # Lecturas por clave primaria sobre los resúmenes que mantienen los triggers: sin agregados por llamada
+  row = (await session.exec(
+    select(Branch.id, BranchSummary.headcount, BranchSummary.pending_transfers_in, BranchSummary.pending_transfers_out)
+    .outerjoin(BranchSummary, BranchSummary.branch_id == Branch.id)
+    .where(Branch.id == branch_id)
+  )).first()
+  if not row:
+    return None
+
+  resources = (await session.exec(
+    select(BranchResourceSummary).where(BranchResourceSummary.branch_id == branch_id)
+  )).all()
+
+  resources_by_status = {resource_status: 0 for resource_status in ResourceStatus}
+  for resource in resources:
+    resources_by_status[resource.status] = resource.resource_count
+
+  return {
+    "branch_id": row.id,
+    "resources_by_status": resources_by_status,
+    "total_resources": sum(resources_by_status.values()),
+    "inventory_value": round(sum(resource.inventory_value for resource in resources), 2),
+    "headcount": row.headcount or 0,
+    "pending_transfers_in": row.pending_transfers_in or 0,
+    "pending_transfers_out": row.pending_transfers_out or 0,
+  }
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from redis import Redis
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID, uuid4
+from app.config import settings
+from app.schemas.models import ChatMessage, ChatParticipant
+from app.schemas.schemas import ChatMessageRead
+from app.services.recent_buffer import RecentBuffer
+
+ROOM_MEMBERS_KEY = "chat:room:{room_id}:members"
+# Miembro centinela: el set existe aunque la sala no tenga participantes (nunca coincide con un UUID)
+EMPTY_MEMBER = ""
+
+# chat:messages:{room_id} (últimos CHAT_BUFFER_SIZE mensajes) y chat:messages:flush (cola de write-behind)
+message_buffer = RecentBuffer(
+  name="chat:messages",
+  model=ChatMessage,
+  schema=ChatMessageRead,
+  owner_field="room_id",
+  time_field="sent_at",
+  size=settings.CHAT_BUFFER_SIZE,
+)
+
+def append_message(redis: Redis, room_id: UUID, sender_id: UUID, content: str, pipe=None) -> ChatMessageRead:
+  message = ChatMessageRead(
+    id=uuid4(),
+    room_id=room_id,
+    sender_id=sender_id,
+    content=content,
+    sent_at=datetime.now(timezone.utc),
+  )
+  message_buffer.push(redis, message, pipe)
+  return message
+
+async def get_history(
+  session: AsyncSession,
+  redis: Redis,
+  room_id: UUID,
+  cursor: str | None,
+  limit: int
+) -> tuple[list[ChatMessageRead], str | None]:
+  return await message_buffer.page(session, redis, room_id, cursor, limit)
+
+async def is_room_member(session: AsyncSession, redis: Redis, room_id: UUID, user_id: UUID) -> bool:
+  # Participantes de la sala cacheados en un set; PostgreSQL solo cuando el set no existe.
+  # Sin invalidación explícita: la membresía es eventualmente consistente, con CHAT_MEMBERS_TTL de retraso
+  key = ROOM_MEMBERS_KEY.format(room_id=room_id)
+  with redis.pipeline(transaction=False) as pipe:
+    pipe.exists(key)
+    pipe.sismember(key, str(user_id))
+    exists, is_member = pipe.execute()
+
+  if exists:
+    return bool(is_member)
+
+  members = (await session.exec(select(ChatParticipant.user_id).where(ChatParticipant.room_id == room_id))).all()
+  with redis.pipeline() as pipe:
+    pipe.sadd(key, EMPTY_MEMBER, *[str(member) for member in members])
+    pipe.expire(key, settings.CHAT_MEMBERS_TTL)
+    pipe.execute()
+  return user_id in members
@@ -0,0 +1,119 @@
+from fastapi import WebSocket
+from redis.asyncio import Redis as AsyncRedis
+from uuid import UUID
+from app.config import settings
+from app.db.session import async_redis_client
+from app.services.chat import append_message
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROOM_CHANNEL = "chat:room:{room_id}"
+SLOW_CONSUMER_CLOSE_CODE = 1013 # Try Again Later
+
+class ChatConnection:
+  def __init__(self, websocket: WebSocket, user_id: UUID):
+    self.websocket = websocket
+    self.user_id = user_id
+    # Cola acotada por socket: un cliente lento no frena al resto de la sala
+    self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=settings.CHAT_SEND_QUEUE_SIZE)
+    self.closed = asyncio.Event()
+
+  def offer(self, payload: str) -> bool:
+    try:
+      self.queue.put_nowait(payload)
+      return True
+    except asyncio.QueueFull:
+      return False
+
+  async def sender(self):
+    try:
+      while True:
+        payload = await self.queue.get()
+        await self.websocket.send_text(payload)
+    except Exception:
+      pass
+    finally:
+      self.closed.set()
+
+class ChatGateway:
+  # Membresía activa por worker en memoria; el fan-out entre workers y réplicas va por Redis pub/sub
+  def __init__(self, redis: AsyncRedis = async_redis_client):
+    self.redis = redis
+    self.rooms: dict[UUID, set[ChatConnection]] = {}
+    self.pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    self._listener: asyncio.Task | None = None
+    self._lock = asyncio.Lock()
+
+  async def start(self):
+    self._listener = asyncio.create_task(self._listen())
+
+  async def stop(self):
+    if self._listener:
+      self._listener.cancel()
+      try:
+        await self._listener
+      except asyncio.CancelledError:
+        pass
+    await self.pubsub.aclose()
+
+  async def join(self, room_id: UUID, connection: ChatConnection):
+    async with self._lock:
+      members = self.rooms.setdefault(room_id, set())
+      # Suscripción al canal solo con el primer socket de la sala en este worker
+      if not members:
+        await self.pubsub.subscribe(ROOM_CHANNEL.format(room_id=room_id))
+      members.add(connection)
+
+  async def leave(self, room_id: UUID, connection: ChatConnection):
+    async with self._lock:
+      members = self.rooms.get(room_id)
+      if not members:
+        return
+      members.discard(connection)
+      if not members:
+        del self.rooms[room_id]
+        await self.pubsub.unsubscribe(ROOM_CHANNEL.format(room_id=room_id))
+
+  async def publish(self, room_id: UUID, sender_id: UUID, content: str):
+    # Buffer reciente, cola de volcado y publicación en un solo round trip
+    async with self.redis.pipeline() as pipe:
+      message = append_message(self.redis, room_id, sender_id, content, pipe)
+      pipe.publish(ROOM_CHANNEL.format(room_id=room_id), message.model_dump_json())
+      await pipe.execute()
+    return message
+
+  def dispatch(self, room_id: UUID, payload: str):
+    for connection in list(self.rooms.get(room_id, ())):
+      if not connection.offer(payload):
+        logger.warning(f"[WARNING] Cliente lento en la sala {room_id}, cerrando conexión de {connection.user_id}.")
+        asyncio.create_task(self._drop(room_id, connection))
+
+  async def _drop(self, room_id: UUID, connection: ChatConnection):
+    await self.leave(room_id, connection)
+    try:
+      await connection.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+    except Exception:
+      pass
+
+  async def _listen(self):
+    while True:
+      try:
+        if not self.rooms:
+          await asyncio.sleep(0.1)
+          continue
+
+        message = await self.pubsub.get_message(timeout=1.0)
+        if not message or message["type"] != "message":
+          continue
+
+        room_id = UUID(message["channel"].rsplit(":", 1)[1])
+        self.dispatch(room_id, message["data"])
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        logger.error(f"[ERROR] Listener de chat: {e}", exc_info=True)
+        await asyncio.sleep(1)
+
+chat_gateway = ChatGateway()
\ No newline at end of file
@@ -0,0 +1,155 @@
+from email.message import EmailMessage
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+from app.config import settings
+from app.db.session import redis_client, async_redis_client
+import aiosmtplib
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_STREAM = "email:outbox"
+RETRY_KEY = "email:outbox:retry"
+DEAD_LETTER_STREAM = "email:outbox:dead"
+CONSUMER_GROUP = "email-workers"
+CLAIM_IDLE_MS = 60_000
+
+def enqueue_email(to, subject, body, redis: Redis = redis_client) -> str:
+  if not to or not subject or not body:
+    raise ValueError("Faltan campos obligatorios!")
+
+  # Un solo XADD: la petición no espera el handshake SMTP
+  return redis.xadd(OUTBOX_STREAM, {"to": to, "subject": subject, "body": body, "attempts": 0})
+
+def retry_delay(attempts: int) -> int:
+  return min(settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_DELAY)
+
+def build_message(fields: dict) -> EmailMessage:
+  msg = EmailMessage()
+  msg["From"] = settings.EMAIL_FROM
+  msg["To"] = fields["to"]
+  msg["Subject"] = fields["subject"]
+  msg.set_content(fields["body"])
+  return msg
+
+class EmailOutboxWorker:
+  def __init__(self, redis: AsyncRedis = async_redis_client, consumer: str | None = None):
+    self.redis = redis
+    self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+    self.smtp: aiosmtplib.SMTP | None = None
+    self._stopped = asyncio.Event()
+
+  async def ensure_group(self):
+    try:
+      await self.redis.xgroup_create(OUTBOX_STREAM, CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+      if "BUSYGROUP" not in str(e):
+        raise
+
+  async def connect(self) -> aiosmtplib.SMTP:
+    # Reutiliza la conexión entre lotes; solo se reabre si el servidor la cerró
+    if self.smtp and self.smtp.is_connected:
+      return self.smtp
+
+    self.smtp = aiosmtplib.SMTP(hostname=settings.SMTP_HOST, port=settings.SMTP_PORT, use_tls=settings.SMTP_USE_TLS)
+    await self.smtp.connect()
+    if settings.SMTP_USER and settings.SMTP_PASSWORD:
+      await self.smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return self.smtp
+
+  async def close(self):
+    if self.smtp and self.smtp.is_connected:
+      try:
+        await self.smtp.quit()
+      except aiosmtplib.SMTPException:
+        self.smtp.close()
+    self.smtp = None
+
+  async def deliver(self, fields: dict):
+    msg = build_message(fields)
+    try:
+      smtp = await self.connect()
+      await smtp.send_message(msg)
+    except aiosmtplib.SMTPServerDisconnected:
+      # Conexión caducada por inactividad: un único reintento con una conexión nueva
+      self.smtp = None
+      smtp = await self.connect()
+      await smtp.send_message(msg)
+
+  async def schedule_retry(self, fields: dict, error: Exception):
+    attempts = int(fields.get("attempts", 0)) + 1
+    fields = {**fields, "attempts": attempts, "last_error": str(error)}
+
+    if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+      logger.error(f"[ERROR] Correo a {fields['to']} descartado tras {attempts} intentos: {error}")
+      await self.redis.xadd(DEAD_LETTER_STREAM, fields)
+      return
+
+    due_at = time.time() + retry_delay(attempts)
+    await self.redis.zadd(RETRY_KEY, {json.dumps(fields, sort_keys=True): due_at})
+
+  async def promote_due_retries(self):
+    due = await self.redis.zrangebyscore(RETRY_KEY, 0, time.time(), start=0, num=settings.EMAIL_BATCH_SIZE)
+    for member in due:
+      # ZREM decide qué worker se queda con el reintento
+      if await self.redis.zrem(RETRY_KEY, member):
+        await self.redis.xadd(OUTBOX_STREAM, json.loads(member))
+
+  async def process_batch(self, entries: list):
+    for message_id, fields in entries:
+      if not fields:
+        continue
+
+      try:
+        await self.deliver(fields)
+      except Exception as e:
+        logger.warning(f"[WARNING] Fallo al enviar correo a {fields.get('to')}: {e}")
+        await self.schedule_retry(fields, e)
+
+      # Los entregados y los reprogramados salen del stream
+      async with self.redis.pipeline(transaction=False) as pipe:
+        pipe.xack(OUTBOX_STREAM, CONSUMER_GROUP, message_id)
+        pipe.xdel(OUTBOX_STREAM, message_id)
+        await pipe.execute()
+
+  async def run(self):
+    await self.ensure_group()
+    logger.info(f"[INFO] Worker de correos {self.consumer} iniciado.")
+
+    while not self._stopped.is_set():
+      try:
+        await self.promote_due_retries()
+
+        # Recupera mensajes pendientes de workers caídos
+        _, claimed, *_ = await self.redis.xautoclaim(
+          OUTBOX_STREAM, CONSUMER_GROUP, self.consumer, CLAIM_IDLE_MS, count=settings.EMAIL_BATCH_SIZE
+        )
+        if claimed:
+          await self.process_batch(claimed)
+
+        response = await self.redis.xreadgroup(
+          CONSUMER_GROUP, self.consumer, {OUTBOX_STREAM: ">"}, count=settings.EMAIL_BATCH_SIZE, block=5000
+        )
+        for _, entries in response or []:
+          await self.process_batch(entries)
+
+      except asyncio.CancelledError:
+        break
+      except Exception as e:
+        logger.error(f"[ERROR] Worker de correos: {e}", exc_info=True)
+        await asyncio.sleep(1)
+
+    await self.close()
+
+  def stop(self):
+    self._stopped.set()
+
+if __name__ == "__main__":
+  logging.basicConfig(level=logging.INFO)
+  asyncio.run(EmailOutboxWorker().run())
\ No newline at end of file
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID, uuid4
+from app.config import settings
+from app.schemas.models import Notification
+from app.schemas.schemas import NotificationCreate, NotificationRead
+from app.services.recent_buffer import RecentBuffer
+
+RECENT_TTL = 7 * 24 * 60 * 60 # 7 días
+
+# notifications:{user_id} (lista reciente) y notifications:flush (cola de write-behind)
+notification_buffer = RecentBuffer(
+  name="notifications",
+  model=Notification,
+  schema=NotificationRead,
+  owner_field="receiver_id",
+  time_field="created_at",
+  size=settings.NOTIFICATIONS_RECENT_LIMIT,
+  ttl=RECENT_TTL,
+)
+
+def push_notification(redis: Redis, data: NotificationCreate, sender_id: UUID | None = None) -> NotificationRead:
+  notification = NotificationRead(
+    id=uuid4(),
+    sender_id=sender_id,
+    created_at=datetime.now(timezone.utc),
+    **data.model_dump()
+  )
+  notification_buffer.push(redis, notification)
+  return notification
+
+async def list_notifications(
+  session: AsyncSession,
+  redis: Redis,
+  user_id: UUID,
+  cursor: str | None,
+  limit: int
+) -> tuple[list[NotificationRead], str | None]:
+  return await notification_buffer.page(session, redis, user_id, cursor, limit)
\ No newline at end of file
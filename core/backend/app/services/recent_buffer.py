@@ -0,0 +1,177 @@
+from pydantic import BaseModel, ValidationError
+from redis import Redis
+from redis.exceptions import WatchError
+from sqlalchemy import tuple_
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from app.utils.pagination import encode_cursor, decode_cursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fallos atribuibles a la entrada (FK inexistente, tipos inválidos): reintentarla no sirve
+BAD_ENTRY_ERRORS = (ValidationError, IntegrityError, DataError)
+
+# Lista acotada en Redis con los elementos más recientes de un dueño (usuario, sala...),
+# volcada a PostgreSQL por lotes (write-behind) a través de un stream
+class RecentBuffer:
+  def __init__(
+    self,
+    name: str,
+    model: type[SQLModel],
+    schema: type[BaseModel],
+    owner_field: str,
+    time_field: str,
+    size: int,
+    ttl: int | None = None
+  ):
+    self.model = model
+    self.schema = schema
+    self.owner_field = owner_field
+    self.time_field = time_field
+    self.size = size
+    self.ttl = ttl
+    self.key = f"{name}:{{owner_id}}"
+    self.warm_key = f"{name}:{{owner_id}}:warm"
+    self.flush_stream = f"{name}:flush"
+    self.dead_letter_stream = f"{name}:flush:dead"
+
+  def _sort_key(self, item: BaseModel) -> tuple:
+    return (getattr(item, self.time_field), item.id)
+
+  def push(self, redis: Redis, item: BaseModel, pipe=None):
+    # Sin pipe propio se ejecuta en un solo round trip; con pipe, lo ejecuta quien llama
+    if pipe is None:
+      with redis.pipeline() as pipe:
+        self._queue_push(pipe, item)
+        pipe.execute()
+      return
+    self._queue_push(pipe, item)
+
+  def _queue_push(self, pipe, item: BaseModel):
+    owner_id = getattr(item, self.owner_field)
+    key = self.key.format(owner_id=owner_id)
+    payload = item.model_dump_json()
+
+    pipe.lpush(key, payload)
+    pipe.ltrim(key, 0, self.size - 1)
+    if self.ttl:
+      pipe.expire(key, self.ttl)
+      pipe.expire(self.warm_key.format(owner_id=owner_id), self.ttl)
+    pipe.xadd(self.flush_stream, {"data": payload})
+
+  async def _load_from_db(self, session: AsyncSession, owner_id: UUID, before: tuple | None, limit: int) -> list:
+    time_column = getattr(self.model, self.time_field)
+    stmt = (
+      select(self.model)
+      .where(getattr(self.model, self.owner_field) == owner_id)
+      .order_by(time_column.desc(), self.model.id.desc())
+      .limit(limit)
+    )
+    if before:
+      stmt = stmt.where(tuple_(time_column, self.model.id) < tuple_(*before))
+    rows = (await session.exec(stmt)).all()
+    return [self.schema.model_validate(row, from_attributes=True) for row in rows]
+
+  async def _warm(self, session: AsyncSession, redis: Redis, owner_id: UUID) -> list:
+    # Camino frío: reconstruye la lista desde PostgreSQL y conserva lo aún no volcado.
+    # La consulta va antes del WATCH: la conexión de Redis no queda retenida mientras responde PostgreSQL
+    key = self.key.format(owner_id=owner_id)
+    stored = await self._load_from_db(session, owner_id, None, self.size)
+
+    with redis.pipeline() as pipe:
+      try:
+        pipe.watch(key)
+        pending = [self.schema.model_validate_json(item) for item in pipe.lrange(key, 0, -1)]
+
+        merged = {item.id: item for item in stored}
+        merged.update({item.id: item for item in pending})
+        recent = sorted(merged.values(), key=self._sort_key, reverse=True)[:self.size]
+
+        pipe.multi()
+        pipe.delete(key)
+        if recent:
+          pipe.rpush(key, *[item.model_dump_json() for item in recent])
+          if self.ttl:
+            pipe.expire(key, self.ttl)
+        pipe.set(self.warm_key.format(owner_id=owner_id), 1, ex=self.ttl)
+        pipe.execute()
+        return recent
+      except WatchError:
+        # Llegó un elemento nuevo mientras se calentaba: se reintenta en la próxima lectura
+        return recent
+
+  async def page(
+    self,
+    session: AsyncSession,
+    redis: Redis,
+    owner_id: UUID,
+    cursor: str | None,
+    limit: int
+  ) -> tuple[list, str | None]:
+    with redis.pipeline(transaction=False) as pipe:
+      pipe.lrange(self.key.format(owner_id=owner_id), 0, -1)
+      pipe.exists(self.warm_key.format(owner_id=owner_id))
+      raw, is_warm = pipe.execute()
+
+    if is_warm:
+      recent = [self.schema.model_validate_json(item) for item in raw]
+    else:
+      recent = await self._warm(session, redis, owner_id)
+
+    buffer_is_full = len(recent) >= self.size
+    before = decode_cursor(cursor) if cursor else None
+    if before:
+      recent = [item for item in recent if self._sort_key(item) < before]
+
+    items = recent[:limit]
+
+    # Solo se consulta PostgreSQL cuando la página va más allá de la lista en Redis
+    if len(items) < limit and buffer_is_full:
+      last = self._sort_key(items[-1]) if items else before
+      items += await self._load_from_db(session, owner_id, last, limit - len(items))
+
+    next_cursor = encode_cursor(*self._sort_key(items[-1])) if len(items) == limit else None
+    return items, next_cursor
+
+  def _insert(self, engine, entries: list):
+    rows = [self.schema.model_validate_json(fields["data"]).model_dump() for _, fields in entries]
+    with Session(engine) as session:
+      session.exec(insert(self.model).values(rows).on_conflict_do_nothing(index_elements=["id"]))
+      session.commit()
+
+  def flush(self, redis: Redis, engine, batch_size: int) -> int:
+    # Inserts multi-fila por lote; idempotente si un lote se reintenta tras un fallo
+    total_flushed = 0
+
+    while True:
+      entries = redis.xrange(self.flush_stream, count=batch_size)
+      if not entries:
+        break
+
+      dead = 0
+      try:
+        self._insert(engine, entries)
+      except BAD_ENTRY_ERRORS:
+        # Una entrada inválida no puede bloquear la cola: se reintenta fila a fila y las que
+        # siguen fallando pasan al dead-letter. Los errores de conexión se propagan y el lote
+        # queda en el stream para el próximo volcado
+        for entry in entries:
+          try:
+            self._insert(engine, [entry])
+          except BAD_ENTRY_ERRORS as e:
+            error = str(getattr(e, "orig", e)).strip()
+            logger.error(f"[ERROR] Entrada {entry[0]} de {self.flush_stream} movida a dead-letter: {error}")
+            redis.xadd(self.dead_letter_stream, {**entry[1], "error": error})
+            dead += 1
+
+      redis.xdel(self.flush_stream, *[entry_id for entry_id, _ in entries])
+      total_flushed += len(entries) - dead
+
+      if len(entries) < batch_size:
+        break
+
+    return total_flushed
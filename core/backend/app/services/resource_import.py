@@ -0,0 +1,166 @@
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from uuid import UUID, uuid4
+from app.schemas.schemas import ResourceImportRow
+import codecs
+import csv
+import json
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+
+STAGING_COLUMNS = [
+  "id", "row_number", "name", "description", "serial_number", "asset_number", "category_id", "price", "stock",
+]
+
+CREATE_STAGING = """
+CREATE TEMP TABLE resource_import (
+  id uuid PRIMARY KEY,
+  row_number integer NOT NULL,
+  name varchar NOT NULL,
+  description varchar,
+  serial_number varchar NOT NULL,
+  asset_number varchar,
+  category_id uuid NOT NULL,
+  price double precision NOT NULL,
+  stock integer NOT NULL
+) ON COMMIT DROP
+"""
+
+# Inserta en resource lo que pasó la validación; descarta duplicados (en el archivo o ya existentes)
+# y categorías inexistentes, devolviendo las filas rechazadas para el reporte.
+# ON CONFLICT se apoya en el índice único de serial_number: dos importaciones concurrentes del
+# mismo archivo no pueden insertar el mismo número de serie, la segunda lo reporta como duplicado
+MERGE_STAGING = """
+WITH candidates AS (
+  SELECT DISTINCT ON (s.serial_number) s.*
+  FROM resource_import s
+  JOIN category c ON c.id = s.category_id
+  ORDER BY s.serial_number, s.row_number
+),
+inserted AS (
+  INSERT INTO resource (
+    id, name, description, serial_number, asset_number, category_id, price, stock,
+    status, branch_id, business_id, created_by
+  )
+  SELECT
+    id, name, description, serial_number, asset_number, category_id, price, stock,
+    'ACTIVE', CAST(:branch_id AS uuid), CAST(:business_id AS uuid), CAST(:created_by AS uuid)
+  FROM candidates
+  ON CONFLICT (serial_number) DO NOTHING
+  RETURNING id
+)
+SELECT
+  s.row_number,
+  s.serial_number,
+  CASE WHEN c.id IS NULL THEN 'Categoría inexistente.' ELSE 'Número de serie duplicado.' END AS error
+FROM resource_import s
+LEFT JOIN category c ON c.id = s.category_id
+WHERE s.id NOT IN (SELECT id FROM inserted)
+ORDER BY s.row_number
+"""
+
+def _iter_rows(upload: UploadFile):
+  # Lectura incremental del archivo subido; nunca se carga completo en memoria.
+  # Las filas ilegibles se entregan como excepción para no cortar la lectura
+  reader = codecs.getreader("utf-8-sig")(upload.file)
+  is_csv = (upload.filename or "").lower().endswith(".csv") or upload.content_type == "text/csv"
+
+  if is_csv:
+    rows = csv.DictReader(reader)
+    while True:
+      try:
+        yield next(rows)
+      except StopIteration:
+        return
+      except csv.Error as e:
+        yield e
+    return
+
+  for line in reader:
+    if not line.strip():
+      continue
+    try:
+      row = json.loads(line)
+      yield row if isinstance(row, dict) else ValueError("se esperaba un objeto JSON")
+    except ValueError as e:
+      yield e
+
+def _read_chunk(rows, start: int) -> list[tuple[int, dict | Exception]]:
+  chunk = []
+  for row_number in range(start, start + IMPORT_CHUNK_SIZE):
+    row = next(rows, None)
+    if row is None:
+      break
+    chunk.append((row_number, row))
+  return chunk
+
+async def import_resources(
+  session: AsyncSession,
+  upload: UploadFile,
+  branch_id: UUID,
+  business_id: UUID | None,
+  created_by: UUID
+) -> dict:
+  connection = await session.connection()
+  await connection.execute(text(CREATE_STAGING))
+  raw_connection = (await connection.get_raw_connection()).driver_connection
+
+  rows = _iter_rows(upload)
+  errors, total_errors, total_rows, staged = [], 0, 0, 0
+
+  def report(row_number: int, error: str):
+    nonlocal total_errors
+    total_errors += 1
+    if len(errors) < IMPORT_MAX_ERRORS:
+      errors.append({"row": row_number, "error": error})
+
+  while True:
+    chunk = await run_in_threadpool(_read_chunk, rows, total_rows + 1)
+    if not chunk:
+      break
+    total_rows += len(chunk)
+
+    # Validación por bloque; solo las filas válidas llegan al staging
+    records = []
+    for row_number, row in chunk:
+      if isinstance(row, Exception):
+        report(row_number, f"Fila ilegible: {row}")
+        continue
+      try:
+        item = ResourceImportRow.model_validate({k: v for k, v in row.items() if v not in ("", None)})
+      except ValidationError as e:
+        report(row_number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+        continue
+      records.append((
+        uuid4(), row_number, item.name, item.description, item.serial_number,
+        item.asset_number, item.category_id, item.price, item.stock,
+      ))
+
+    if records:
+      # COPY binario de asyncpg: mucho más rápido que INSERTs por fila
+      await raw_connection.copy_records_to_table("resource_import", records=records, columns=STAGING_COLUMNS)
+      staged += len(records)
+
+  # Las filas rechazadas se leen en streaming: el reporte queda acotado a IMPORT_MAX_ERRORS
+  rejected = 0
+  result = await connection.stream(
+    text(MERGE_STAGING),
+    {"branch_id": branch_id, "business_id": business_id, "created_by": created_by}
+  )
+  async for row in result:
+    rejected += 1
+    report(row.row_number, f"{row.error} ({row.serial_number})")
+
+  await session.commit()
+
+  return {
+    "total_rows": total_rows,
+    "imported": staged - rejected,
+    "failed": total_errors,
+    "errors": errors,
+    "errors_truncated": total_errors > len(errors),
+  }
\ No newline at end of file
@@ -0,0 +1,85 @@
+from sqlalchemy import JSON, func, literal_column, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from app.schemas.enum import ResourceStatus
+from app.schemas.models import Resource
+
+def _escape_like(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+async def search_resources(
+  session: AsyncSession,
+  query: str,
+  branch_id: UUID | None = None,
+  category_id: UUID | None = None,
+  resource_status: ResourceStatus | None = None,
+  business_id: UUID | None = None,
+  limit: int = 20,
+  offset: int = 0
+) -> dict:
+  query = query.strip()
+  pattern = f"%{_escape_like(query)}%"
+
+  # Subcadena (ILIKE) y coincidencia difusa (%) resueltas por los índices GIN gin_trgm_ops
+  score = func.greatest(
+    func.similarity(Resource.serial_number, query),
+    func.similarity(func.coalesce(Resource.asset_number, ""), query),
+    func.similarity(Resource.name, query),
+  )
+  conditions = [
+    or_(
+      Resource.serial_number.ilike(pattern, escape="\\"),
+      Resource.asset_number.ilike(pattern, escape="\\"),
+      Resource.name.ilike(pattern, escape="\\"),
+      Resource.serial_number.op("%")(query),
+      Resource.asset_number.op("%")(query),
+      Resource.name.op("%")(query),
+    )
+  ]
+  if branch_id:
+    conditions.append(Resource.branch_id == branch_id)
+  if category_id:
+    conditions.append(Resource.category_id == category_id)
+  if resource_status:
+    conditions.append(Resource.status == resource_status)
+  if business_id:
+    conditions.append(Resource.business_id == business_id)
+
+  matches = (
+    select(
+      Resource.id, Resource.name, Resource.serial_number, Resource.asset_number, Resource.status,
+      Resource.category_id, Resource.branch_id, Resource.business_id, Resource.price, Resource.stock,
+      score.label("score"),
+    )
+    .where(*conditions)
+    .cte("matches")
+  )
+
+  page = (
+    select(matches)
+    .order_by(matches.c.score.desc(), matches.c.id)
+    .limit(limit)
+    .offset(offset)
+    .subquery("page")
+  )
+  status_counts = select(matches.c.status, func.count().label("n")).group_by(matches.c.status).subquery("sc")
+  category_counts = select(matches.c.category_id, func.count().label("n")).group_by(matches.c.category_id).subquery("cc")
+
+  # Resultados, total y facetas en un solo round trip; el CTE se materializa una vez
+  empty_list, empty_object = literal_column("'[]'::json"), literal_column("'{}'::json")
+  stmt = select(
+    select(func.coalesce(func.json_agg(literal_column("page")), empty_list, type_=JSON))
+      .select_from(page).scalar_subquery().label("items"),
+    select(func.count()).select_from(matches).scalar_subquery().label("total"),
+    select(func.coalesce(func.json_object_agg(status_counts.c.status, status_counts.c.n), empty_object, type_=JSON))
+      .select_from(status_counts).scalar_subquery().label("status_facets"),
+    select(func.coalesce(func.json_object_agg(category_counts.c.category_id, category_counts.c.n), empty_object, type_=JSON))
+      .select_from(category_counts).scalar_subquery().label("category_facets"),
+  )
+
+  row = (await session.exec(stmt)).one()
+  return {
+    "items": row.items,
+    "total": row.total,
+    "facets": {"status": row.status_facets, "category": row.category_facets},
+  }
\ No newline at end of file
@@ -0,0 +1,77 @@
+from datetime import datetime
+from sqlalchemy import literal, tuple_, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from app.schemas.enum import ResourceTransferStatus
+from app.schemas.models import ResourceTransferRecord
+from app.utils.pagination import decode_cursor, encode_cursor
+
+SENT, RECEIVED = "sent", "received"
+
+COLUMNS = [
+  ResourceTransferRecord.id, ResourceTransferRecord.resource_id,
+  ResourceTransferRecord.from_branch_id, ResourceTransferRecord.to_branch_id,
+  ResourceTransferRecord.from_business_id, ResourceTransferRecord.to_business_id,
+  ResourceTransferRecord.status, ResourceTransferRecord.initiated_by,
+  ResourceTransferRecord.created_at, ResourceTransferRecord.updated_at,
+]
+
+def _side(
+  direction: str,
+  branch_id: UUID,
+  transfer_status: ResourceTransferStatus | None,
+  created_from: datetime | None,
+  created_to: datetime | None,
+  counterparty_id: UUID | None,
+  cursor: tuple[datetime, UUID] | None,
+  limit: int
+):
+  own, other = (
+    (ResourceTransferRecord.from_branch_id, ResourceTransferRecord.to_branch_id) if direction == SENT
+    else (ResourceTransferRecord.to_branch_id, ResourceTransferRecord.from_branch_id)
+  )
+  # Cada lado es un rango sobre su propio índice (sucursal, created_at, id): sin OR ni OFFSET
+  stmt = select(*COLUMNS, literal(direction).label("direction")).where(own == branch_id)
+  if counterparty_id:
+    stmt = stmt.where(other == counterparty_id)
+  if transfer_status:
+    stmt = stmt.where(ResourceTransferRecord.status == transfer_status)
+  if created_from:
+    stmt = stmt.where(ResourceTransferRecord.created_at >= created_from)
+  if created_to:
+    stmt = stmt.where(ResourceTransferRecord.created_at < created_to)
+  if cursor:
+    stmt = stmt.where(tuple_(ResourceTransferRecord.created_at, ResourceTransferRecord.id) < tuple_(*cursor))
+  return stmt.order_by(ResourceTransferRecord.created_at.desc(), ResourceTransferRecord.id.desc()).limit(limit + 1)
+
+async def list_transfer_records(
+  session: AsyncSession,
+  branch_id: UUID,
+  direction: str | None = None,
+  transfer_status: ResourceTransferStatus | None = None,
+  created_from: datetime | None = None,
+  created_to: datetime | None = None,
+  counterparty_id: UUID | None = None,
+  cursor: str | None = None,
+  limit: int = 50
+) -> tuple[list[dict], str | None]:
+  position = decode_cursor(cursor) if cursor else None
+  sides = [
+    _side(side, branch_id, transfer_status, created_from, created_to, counterparty_id, position, limit)
+    for side in (SENT, RECEIVED) if direction in (None, side)
+  ]
+
+  if len(sides) == 1:
+    stmt = sides[0]
+  else:
+    # Mezcla de las dos ramas ya ordenadas y acotadas a limit + 1 filas cada una
+    merged = union_all(*sides).subquery()
+    stmt = select(merged).order_by(merged.c.created_at.desc(), merged.c.id.desc()).limit(limit + 1)
+
+  rows = (await session.exec(stmt)).all()
+  has_more = len(rows) > limit
+  rows = rows[:limit]
+
+  next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+  return [dict(row._mapping) for row in rows], next_cursor
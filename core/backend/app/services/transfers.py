@@ -0,0 +1,106 @@
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID, uuid4
+from app.schemas.enum import ResourceTransferStatus
+from app.schemas.models import Branch, Resource, ResourceTransferRecord, ResourceTransferRequest
+import hashlib
+
+def payload_hash(to_branch_id: UUID, resource_ids: list[UUID], transfer_status: ResourceTransferStatus) -> str:
+  # El orden de los recursos no cambia la solicitud
+  payload = f"{to_branch_id}:{transfer_status.value}:{','.join(sorted(map(str, resource_ids)))}"
+  return hashlib.sha256(payload.encode()).hexdigest()
+
+async def transfer_resources(
+  session: AsyncSession,
+  initiated_by: UUID,
+  to_branch_id: UUID,
+  resource_ids: list[UUID],
+  transfer_status: ResourceTransferStatus,
+  idempotency_key: str | None = None
+) -> dict:
+  resource_ids = list(dict.fromkeys(resource_ids))
+
+  to_branch = await session.get(Branch, to_branch_id)
+  if not to_branch:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sucursal de destino no encontrada.")
+
+  if idempotency_key:
+    request_hash = payload_hash(to_branch_id, resource_ids, transfer_status)
+    # Serializa reintentos concurrentes con la misma clave del mismo administrador dentro de la transacción
+    await session.exec(select(func.pg_advisory_xact_lock(func.hashtext(f"{initiated_by}:{idempotency_key}"))))
+
+    previous = (await session.exec(
+      select(ResourceTransferRequest).where(
+        ResourceTransferRequest.initiated_by == initiated_by,
+        ResourceTransferRequest.idempotency_key == idempotency_key
+      )
+    )).first()
+    if previous:
+      replay = {"transferred": previous.transferred, "skipped": previous.skipped, "replayed": True}
+      same_payload = previous.payload_hash == request_hash
+      await session.rollback()
+      if not same_payload:
+        raise HTTPException(
+          status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+          detail="La Idempotency-Key ya se usó con una solicitud distinta."
+        )
+      return replay
+
+  # Bloqueo por fila: los recursos tomados por otra transferencia en curso se omiten sin esperar
+  locked = (await session.exec(
+    select(Resource.id, Resource.branch_id, Resource.business_id)
+    .where(Resource.id.in_(resource_ids), Resource.branch_id != to_branch_id)
+    .with_for_update(skip_locked=True)
+  )).all()
+
+  if locked:
+    await _move(session, initiated_by, to_branch, locked, transfer_status, idempotency_key)
+
+  locked_ids = [row.id for row in locked]
+  transferred = set(locked_ids)
+  result = {
+    "transferred": [str(resource_id) for resource_id in locked_ids],
+    "skipped": [str(resource_id) for resource_id in resource_ids if resource_id not in transferred],
+  }
+  # También se registra el lote sin movimientos: un reintento devuelve el mismo resultado
+  if idempotency_key:
+    session.add(ResourceTransferRequest(
+      initiated_by=initiated_by, idempotency_key=idempotency_key, payload_hash=request_hash, **result
+    ))
+  await session.commit()
+  return {**result, "replayed": False}
+
+async def _move(
+  session: AsyncSession,
+  initiated_by: UUID,
+  to_branch: Branch,
+  locked: list,
+  transfer_status: ResourceTransferStatus,
+  idempotency_key: str | None
+):
+  locked_ids = [row.id for row in locked]
+
+  if transfer_status == ResourceTransferStatus.RECEIVED:
+    await session.exec(
+      update(Resource)
+      .where(Resource.id.in_(locked_ids))
+      .values(branch_id=to_branch.id, business_id=to_branch.business_id, updated_at=func.now())
+    )
+
+  # Un solo INSERT multi-fila para todos los registros de la transferencia
+  await session.exec(insert(ResourceTransferRecord).values([
+    {
+      "id": uuid4(),
+      "resource_id": row.id,
+      "from_branch_id": row.branch_id,
+      "to_branch_id": to_branch.id,
+      "from_business_id": row.business_id,
+      "to_business_id": to_branch.business_id,
+      "status": transfer_status,
+      "initiated_by": initiated_by,
+      "idempotency_key": idempotency_key,
+    }
+    for row in locked
+  ]))
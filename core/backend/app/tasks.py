@@ -1,90 +1,89 @@
-from uuid import UUID
+from app.config import settings
 from app.db.session import redis_client, engine
+from app.db.partitioning import ensure_transfer_partitions
 from app.schemas.models import User, Person
+from app.services.notifications import notification_buffer
+from app.services.chat import message_buffer
+from app.utils.helpers import PENDING_VERIFICATIONS_KEY
+from app.utils.conditional import USER_VALIDATOR, invalidate_last_modified
 from sqlmodel import Session, select, delete
-from sqlalchemy.orm import joinedload
+from sqlalchemy import tuple_
 from datetime import datetime, timezone, timedelta
 import logging
-import functools
 
 logger = logging.getLogger(__name__)
 
-# Decorador para acceso seguro a atributos opcionales
-def safe_field_access(func):
-  @functools.wraps(func)
-  def wrapper(*args, **kwargs):
-    try:
-      return func(*args, **kwargs)
-    except (AttributeError, TypeError) as e:
-      logger.error(f"[ERROR] Fallo de acceso seguro a campo: {e}")
-      logger.error(f"[ERROR] Detalles completos: {str(e)}")
-      logger.error(f"[ERROR] En la función: {func.__name__} con los argumentos: {args} {kwargs}")
-      return None
-  return wrapper
-
-@safe_field_access
-def get_user_age(user: User, now: datetime) -> timedelta:
-  if not user.created_at:
-    logger.warning(f"[WARNING] Usuario {user.id} no tiene created_at, omitiendo...")
-    return None
-  return now - user.created_at
-
-def safe_delete(session: Session, model, condition):
-  try:
-    session.exec(delete(model).where(condition))
-  except Exception as e:
-    logger.warning(f"[WARNING] No se pudo eliminar en {model.__tablename__}: {e}", exc_info=True)
-
 def clean_unverified_users():
-  with Session(engine) as session:
-    now = datetime.now(timezone.utc)
-
-    stmt = select(User).where(User.is_verified == False).options(joinedload(User.person, innerjoin=False))
-    unverified_users = session.exec(stmt).all()
-    logger.info(f"[INFO] Total de usuarios no verificados: {len(unverified_users)}")
-
-    if not unverified_users:
-      logger.info("[INFO] No hay usuarios no verificados para limpiar.")
-      return
-
-    redis = redis_client
-    verification_keys = redis.keys("verify_email:*")
-    user_ids_with_active_codes = {
-      UUID(redis.hget(key, "user_id").decode())
-      for key in verification_keys
-      if redis.hget(key, "user_id")
-    }
-
-    users_to_delete = []
-
-    for user in unverified_users:
-      if not isinstance(user, User):
-        logger.error(f"[ERROR] Objeto no es instancia de User: {user}")
-        continue
-
-      if user.id in user_ids_with_active_codes:
-        logger.info(f"[INFO] Usuario {user.email} tiene código de verificación activo, no eliminar.")
-        continue
-
-      user_age = get_user_age(user, now)
-      if user_age and user_age > timedelta(hours=1):
-        users_to_delete.append(user)
-
-    user_ids = [user.id for user in users_to_delete]
-
-    if not user_ids:
-      logger.info("[INFO] No hay usuarios candidatos para eliminar.")
-      return
-
-    try:
-      with session.begin():
-        logger.info(f"[INFO] Eliminando usuarios: {user_ids}")
-
-        safe_delete(session, Person, Person.user_id.in_(user_ids))
-        safe_delete(session, User, User.id.in_(user_ids))
-
-        logger.info(f"[INFO] Eliminados {len(user_ids)} usuarios no verificados exitosamente.")
-
-    except Exception as e:
-      logger.error(f"[ERROR] Fallo al eliminar usuarios: {e}", exc_info=True)
-      session.rollback()
\ No newline at end of file
+  now = datetime.now(timezone.utc)
+  cutoff = now - timedelta(seconds=settings.UNVERIFIED_USER_TTL)
+  batch_size = settings.CLEANUP_BATCH_SIZE
+  redis = redis_client
+  last_key = None
+  total_deleted = 0
+
+  # El filtro por antigüedad vive en SQL (índice parcial ix_user_unverified_created_at)
+  # y se recorre por keyset en lotes acotados
+  while True:
+    with Session(engine) as session:
+      stmt = (
+        select(User.created_at, User.id)
+        .where(User.is_verified == False, User.created_at < cutoff)
+        .order_by(User.created_at, User.id)
+        .limit(batch_size)
+      )
+      if last_key:
+        stmt = stmt.where(tuple_(User.created_at, User.id) > last_key)
+
+      candidates = session.exec(stmt).all()
+      if not candidates:
+        break
+      last_key = tuple(candidates[-1])
+
+      # Un solo ZMSCORE por lote: descarta los que aún tienen un código vigente
+      candidate_ids = [user_id for _, user_id in candidates]
+      scores = redis.zmscore(PENDING_VERIFICATIONS_KEY, [str(user_id) for user_id in candidate_ids])
+      user_ids = [
+        user_id for user_id, score in zip(candidate_ids, scores)
+        if score is None or score <= now.timestamp()
+      ]
+
+      if user_ids:
+        # Un fallo en cualquiera de los DELETE revierte el lote completo: Redis solo se
+        # actualiza después de un commit exitoso
+        try:
+          session.exec(delete(Person).where(Person.user_id.in_(user_ids)))
+          session.exec(delete(User).where(User.id.in_(user_ids)))
+          session.commit()
+          redis.zrem(PENDING_VERIFICATIONS_KEY, *[str(user_id) for user_id in user_ids])
+          invalidate_last_modified(redis, USER_VALIDATOR, *user_ids)
+          total_deleted += len(user_ids)
+        except Exception as e:
+          logger.error(f"[ERROR] Fallo al eliminar usuarios: {e}", exc_info=True)
+          session.rollback()
+
+    if len(candidates) < batch_size:
+      break
+
+  # Entradas vencidas que ya no corresponden a ningún usuario pendiente
+  redis.zremrangebyscore(PENDING_VERIFICATIONS_KEY, "-inf", now.timestamp())
+
+  if total_deleted:
+    logger.info(f"[INFO] Eliminados {total_deleted} usuarios no verificados exitosamente.")
+  else:
+    logger.info("[INFO] No hay usuarios candidatos para eliminar.")
+
+def flush_notifications():
+  total_flushed = notification_buffer.flush(redis_client, engine, settings.NOTIFICATIONS_FLUSH_BATCH)
+  if total_flushed:
+    logger.info(f"[INFO] Volcadas {total_flushed} notificaciones a PostgreSQL.")
+
+def flush_chat_messages():
+  total_flushed = message_buffer.flush(redis_client, engine, settings.CHAT_FLUSH_BATCH)
+  if total_flushed:
+    logger.info(f"[INFO] Volcados {total_flushed} mensajes de chat a PostgreSQL.")
+
+def create_transfer_partitions():
+  with engine.begin() as connection:
+    created = ensure_transfer_partitions(connection, settings.TRANSFER_PARTITION_MONTHS_AHEAD)
+  if created:
+    logger.info(f"[INFO] Creadas {created} particiones de resourcetransferrecord.")
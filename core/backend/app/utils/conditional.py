@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+
+# Validadores HTTP (ETag / Last-Modified) derivados de updated_at y cacheados en Redis,
+# para responder 304 sin cargar ni serializar la fila
+VALIDATOR_KEY = "last_modified:{kind}:{id}"
+USER_VALIDATOR = "user"
+
+# Cambiar cuando cambie la forma de la representación, para invalidar los ETag ya emitidos
+REPRESENTATION_VERSION = "1"
+
+# Marca que deja una escritura: durante unos segundos ninguna lectura concurrente que
+# haya leído el valor anterior puede volver a cachearlo (SET NX)
+TOMBSTONE, TOMBSTONE_TTL = "", 5
+
+def make_etag(last_modified: datetime) -> str:
+  return f'W/"{REPRESENTATION_VERSION}-{int(last_modified.timestamp() * 1_000_000):x}"'
+
+def validator_headers(last_modified: datetime) -> dict:
+  return {
+    "ETag": make_etag(last_modified),
+    "Last-Modified": format_datetime(last_modified.astimezone(timezone.utc), usegmt=True),
+    "Cache-Control": "private, no-cache",
+  }
+
+def is_not_modified(request: Request, last_modified: datetime) -> bool:
+  # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110, 13.2.2)
+  if_none_match = request.headers.get("if-none-match")
+  if if_none_match is not None:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or make_etag(last_modified).removeprefix("W/") in tags
+
+  if_modified_since = request.headers.get("if-modified-since")
+  if if_modified_since:
+    try:
+      since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+      return False
+    if since.tzinfo is None:
+      since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified tiene resolución de segundos
+    return last_modified.replace(microsecond=0) <= since
+  return False
+
+def not_modified_response(last_modified: datetime) -> Response:
+  return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(last_modified))
+
+async def resolve_last_modified(session: AsyncSession, redis: Redis, kind: str, id, stmt) -> datetime | None:
+  # stmt selecciona solo la marca de tiempo: nunca la fila completa
+  key = VALIDATOR_KEY.format(kind=kind, id=id)
+  cached = redis.get(key)
+  if cached:
+    return datetime.fromisoformat(cached)
+
+  last_modified = (await session.exec(stmt)).first()
+  if last_modified is None:
+    return None
+
+  if cached is None:
+    redis.set(key, last_modified.isoformat(), ex=settings.VALIDATOR_CACHE_TTL, nx=True)
+  return last_modified
+
+def invalidate_last_modified(redis: Redis, kind: str, *ids):
+  # Llamar después del commit de cualquier escritura que cambie updated_at
+  if not ids:
+    return
+  with redis.pipeline(transaction=False) as pipe:
+    for id in ids:
+      pipe.set(VALIDATOR_KEY.format(kind=kind, id=id), TOMBSTONE, ex=TOMBSTONE_TTL)
+    pipe.execute()
@@ -0,0 +1,43 @@
+from fastapi.responses import StreamingResponse
+from app.db.session import async_session_factory
+import csv
+import io
+import json
+
+EXPORT_CHUNK_SIZE = 1000
+
+async def iter_row_chunks(stmt, chunk_size: int = EXPORT_CHUNK_SIZE):
+  # Sesión propia: el stream sigue vivo después de que termina la dependencia get_session
+  async with async_session_factory() as session:
+    result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+    async for chunk in result.mappings().partitions(chunk_size):
+      yield chunk
+
+async def iter_ndjson(stmt):
+  async for chunk in iter_row_chunks(stmt):
+    yield "".join(json.dumps(dict(row), default=str) + "\n" for row in chunk)
+
+async def iter_csv(stmt, columns: list[str]):
+  buffer = io.StringIO()
+  writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+  writer.writeheader()
+  yield buffer.getvalue()
+
+  async for chunk in iter_row_chunks(stmt):
+    buffer.seek(0)
+    buffer.truncate()
+    writer.writerows(chunk)
+    yield buffer.getvalue()
+
+def export_response(stmt, columns: list[str], fmt: str, filename: str) -> StreamingResponse:
+  if fmt == "csv":
+    return StreamingResponse(
+      iter_csv(stmt, columns),
+      media_type="text/csv",
+      headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+    )
+  return StreamingResponse(
+    iter_ndjson(stmt),
+    media_type="application/x-ndjson",
+    headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+  )
\ No newline at end of file
@@ -1,44 +1,49 @@
-from email.message import EmailMessage
 from fastapi import Header, HTTPException, status
 from passlib.context import CryptContext
 from app.config import settings
-import aiosmtplib
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import random
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds = rounds: los hashes con un costo menor se marcan para rehash al iniciar sesión
+pwd_context = CryptContext(
+  schemes=["bcrypt"],
+  deprecated="auto",
+  bcrypt__rounds=settings.BCRYPT_ROUNDS,
+  bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt libera el GIL, así que un pool de hilos basta para sacarlo del event loop
+hashing_executor = ThreadPoolExecutor(max_workers=settings.HASH_WORKERS, thread_name_prefix="hashing")
+_hashing_slots = asyncio.Semaphore(settings.HASH_WORKERS + settings.HASH_QUEUE_SIZE)
+
+async def run_hashing(func, *args):
+  # Cola acotada: si está llena por mucho tiempo, se rechaza en lugar de acumular trabajo
+  try:
+    await asyncio.wait_for(_hashing_slots.acquire(), timeout=settings.HASH_QUEUE_TIMEOUT)
+  except asyncio.TimeoutError:
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Servidor ocupado, intenta nuevamente.")
+
+  try:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, func, *args)
+  finally:
+    _hashing_slots.release()
 
 def get_bearer_token(authorization: str = Header(...)) -> str:
   if not authorization.startswith("Bearer "):
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Formato de autorización inválido.")
   return authorization.split(" ")[1]
 
-def hash_password(password: str) -> str:
-  return pwd_context.hash(password)
-
-def verify_password(password: str, hashed_password: str) -> bool:
-  return pwd_context.verify(password, hashed_password)
-
-async def send_email(to, subject, body):
-  if not to or not subject or not body:
-    raise ValueError("Faltan campos obligatorios!")
-  
-  msg = EmailMessage()
-  msg["From"] = settings.SMTP_USER
-  msg["To"] = to
-  msg["Subject"] = subject
-  msg.set_content(body)
-  
-  try:
-    await aiosmtplib.send(
-      msg,
-      hostname="smtp.gmail.com",
-      port=465,
-      username=settings.SMTP_USER,
-      password=settings.SMTP_PASSWORD,
-      use_tls=True
-    )
-  except Exception as e:
-    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+async def hash_password(password: str) -> str:
+  return await run_hashing(pwd_context.hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+  # Devuelve (válida, nuevo_hash); nuevo_hash no es None si el hash guardado usa parámetros antiguos
+  return await run_hashing(pwd_context.verify_and_update, password, hashed_password)
+
+# Sorted set con los usuarios que tienen un código de verificación vigente (score = expiración)
+PENDING_VERIFICATIONS_KEY = "verify_email:pending"
 
 def generate_verification_code():
   return random.randint(100000, 999999)
\ No newline at end of file
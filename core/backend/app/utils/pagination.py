@@ -0,0 +1,16 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+
+# Cursor opaco para paginación por keyset sobre (created_at, id)
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+  raw = f"{created_at.isoformat()}|{id}"
+  return urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+  try:
+    created_at, id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), UUID(id)
+  except Exception:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación inválido.")
\ No newline at end of file
@@ -0,0 +1,29 @@
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from uuid import UUID
+import orjson
+
+def _default(value):
+  # Modelos anidados ya construidos (p. ej. desde caché); el resto lo resuelve orjson de forma nativa
+  if isinstance(value, BaseModel):
+    return value.model_dump()
+  # asyncpg devuelve su propia subclase de UUID, que orjson no reconoce como nativa
+  if isinstance(value, UUID):
+    return str(value)
+  raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def dumps(content) -> bytes:
+  return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(ORJSONResponse):
+  # Devolver esta respuesta directamente evita la validación contra response_model y jsonable_encoder:
+  # el contenido ya sale de columnas seleccionadas según el esquema de lectura (UUID, datetime y enums
+  # los serializa orjson). response_model se mantiene en el endpoint solo para documentar OpenAPI.
+  def render(self, content) -> bytes:
+    return dumps(content)
+
+def schema_columns(model, schema: type[BaseModel]) -> list:
+  return [getattr(model, name) for name in schema.model_fields]
+
+def rows_to_dicts(rows) -> list[dict]:
+  return [row._asdict() for row in rows]
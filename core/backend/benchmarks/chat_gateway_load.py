@@ -0,0 +1,61 @@
+# Prueba de carga del gateway de chat: abre miles de sockets a una sala, publica mensajes
+# desde uno de ellos y mide la latencia de entrega al resto (p50/p99/máx).
+#
+# Requiere el servidor en marcha, una sala existente y un access token de un participante.
+# Uso (desde core/backend):
+#   python -m benchmarks.chat_gateway_load --url ws://localhost:8000 --room <room_id> --token <token> \
+#     --sockets 2000 --messages 50
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import websockets
+
+async def listener(url: str, expected: int, latencies: list, ready: asyncio.Event, counter: list, total: int):
+  async with websockets.connect(url, max_queue=None) as ws:
+    counter[0] += 1
+    if counter[0] == total:
+      ready.set()
+
+    received = 0
+    while received < expected:
+      data = json.loads(await ws.recv())
+      sent_at = float(data["content"].split(":", 1)[0])
+      latencies.append((time.time() - sent_at) * 1000)
+      received += 1
+
+async def main(args):
+  url = f"{args.url}/api/v1/chat/ws/rooms/{args.room}?token={args.token}"
+  latencies, ready, counter = [], asyncio.Event(), [0]
+
+  started = time.perf_counter()
+  listeners = [
+    asyncio.create_task(listener(url, args.messages, latencies, ready, counter, args.sockets))
+    for _ in range(args.sockets)
+  ]
+  await asyncio.wait_for(ready.wait(), timeout=120)
+  print(f"{args.sockets} sockets conectados en {time.perf_counter() - started:.2f}s")
+
+  async with websockets.connect(url) as publisher:
+    for _ in range(args.messages):
+      await publisher.send(json.dumps({"content": f"{time.time()}:benchmark"}))
+      await asyncio.sleep(args.interval)
+
+    await asyncio.wait_for(asyncio.gather(*listeners), timeout=120)
+
+  latencies.sort()
+  print(
+    f"entregas={len(latencies)} p50={statistics.median(latencies):.1f}ms "
+    f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms max={latencies[-1]:.1f}ms"
+  )
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--url", default="ws://localhost:8000")
+  parser.add_argument("--room", required=True)
+  parser.add_argument("--token", required=True)
+  parser.add_argument("--sockets", type=int, default=1000)
+  parser.add_argument("--messages", type=int, default=20)
+  parser.add_argument("--interval", type=float, default=0.05)
+  asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -0,0 +1,49 @@
+# Mide la latencia del event loop durante una ráfaga de inicios de sesión.
+# Compara bcrypt ejecutado directamente en el loop contra el executor de hashing.
+#
+# Uso (desde core/backend): python -m benchmarks.hashing_event_loop [logins]
+import asyncio
+import statistics
+import sys
+import time
+from app.utils.helpers import pwd_context, verify_password
+
+TICK = 0.005
+
+async def monitor_lag(samples: list, stop: asyncio.Event):
+  while not stop.is_set():
+    start = time.perf_counter()
+    await asyncio.sleep(TICK)
+    samples.append((time.perf_counter() - start - TICK) * 1000)
+
+async def inline_login(password: str, hashed: str):
+  pwd_context.verify(password, hashed)
+
+async def executor_login(password: str, hashed: str):
+  await verify_password(password, hashed)
+
+async def run(label: str, login, logins: int, hashed: str):
+  samples, stop = [], asyncio.Event()
+  monitor = asyncio.create_task(monitor_lag(samples, stop))
+  await asyncio.sleep(TICK * 2)
+
+  start = time.perf_counter()
+  await asyncio.gather(*(login("s3cret-password", hashed) for _ in range(logins)))
+  elapsed = time.perf_counter() - start
+
+  stop.set()
+  await monitor
+  samples.sort()
+  p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0
+  print(
+    f"{label:<10} logins={logins} total={elapsed:.2f}s "
+    f"lag_mean={statistics.mean(samples or [0]):.1f}ms lag_p99={p99:.1f}ms lag_max={max(samples or [0]):.1f}ms"
+  )
+
+async def main(logins: int):
+  hashed = pwd_context.hash("s3cret-password")
+  await run("inline", inline_login, logins, hashed)
+  await run("executor", executor_login, logins, hashed)
+
+if __name__ == "__main__":
+  asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
\ No newline at end of file
@@ -0,0 +1,104 @@
+# Benchmark de búsqueda de recursos sobre un millón de filas sintéticas.
+# Siembra los datos con COPY (una sola vez) y mide p50/p99 de search_resources
+# con números de serie parciales, con y sin filtros, contra el objetivo de latencia.
+#
+# Uso (desde core/backend, con DATABASE_URL apuntando a una base de pruebas):
+#   python -m benchmarks.resource_search --rows 1000000 --queries 500 --target-p99-ms 150
+import argparse
+import asyncio
+import random
+import string
+import time
+from uuid import uuid4
+from app.db.session import async_engine, async_session_factory, create_tables
+from app.services.resource_search import search_resources
+
+STATUSES = ["ACTIVE", "INACTIVE", "MAINTENANCE", "LOST", "DISCARDED"]
+
+def random_serial() -> str:
+  return "SN-" + "".join(random.choices(string.ascii_uppercase + string.digits, k=10))
+
+async def seed(rows: int) -> tuple[list, list]:
+  async with async_engine.connect() as connection:
+    raw = (await connection.get_raw_connection()).driver_connection
+    user_id, business_id = uuid4(), uuid4()
+    branch_ids, category_ids = [uuid4() for _ in range(20)], [uuid4() for _ in range(50)]
+
+    await raw.execute(
+      "INSERT INTO \"user\" (id, username, email, role, password, status, is_verified) "
+      "VALUES ($1, 'bench', $2, 'ADMIN', 'x', 'ACTIVE', true)", user_id, f"bench-{user_id}@example.com"
+    )
+    await raw.execute("INSERT INTO business (id, name, created_by) VALUES ($1, 'bench', $2)", business_id, user_id)
+    await raw.executemany(
+      "INSERT INTO branch (id, name, business_id, status, country, created_by) VALUES ($1, $2, $3, 'ACTIVE', 'Bolivia', $4)",
+      [(branch_id, f"branch-{i}", business_id, user_id) for i, branch_id in enumerate(branch_ids)]
+    )
+    await raw.executemany(
+      "INSERT INTO category (id, name, business_id, branch_id, created_by) VALUES ($1, $2, $3, $4, $5)",
+      [(category_id, f"category-{i}", business_id, random.choice(branch_ids), user_id) for i, category_id in enumerate(category_ids)]
+    )
+
+    started = time.perf_counter()
+    batch = 100_000
+    for offset in range(0, rows, batch):
+      records = [
+        (
+          uuid4(), f"Recurso {offset + i}", random_serial(), f"AS-{offset + i:08d}", random.choice(STATUSES),
+          random.choice(category_ids), random.choice(branch_ids), business_id, user_id,
+          round(random.uniform(1, 5000), 2), random.randint(1, 20),
+        )
+        for i in range(min(batch, rows - offset))
+      ]
+      await raw.copy_records_to_table(
+        "resource", records=records,
+        columns=["id", "name", "serial_number", "asset_number", "status", "category_id",
+                 "branch_id", "business_id", "created_by", "price", "stock"]
+      )
+    await raw.execute("ANALYZE resource")
+    print(f"Sembrados {rows} recursos en {time.perf_counter() - started:.1f}s")
+    return branch_ids, category_ids
+
+async def sample_serials(count: int) -> list[str]:
+  async with async_engine.connect() as connection:
+    raw = (await connection.get_raw_connection()).driver_connection
+    rows = await raw.fetch("SELECT serial_number FROM resource TABLESAMPLE SYSTEM (1) LIMIT $1", count)
+    return [row["serial_number"] for row in rows]
+
+async def measure(label: str, queries: list, branch_ids: list, with_filters: bool) -> float:
+  latencies = []
+  async with async_session_factory() as session:
+    for serial in queries:
+      # Fragmento parcial del número de serie, como al escanear una etiqueta dañada
+      start = random.randint(3, 6)
+      fragment = serial[start:start + random.randint(4, 6)]
+      started = time.perf_counter()
+      await search_resources(session, fragment, branch_id=random.choice(branch_ids) if with_filters else None)
+      latencies.append((time.perf_counter() - started) * 1000)
+
+  latencies.sort()
+  p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+  print(f"{label:<12} consultas={len(latencies)} p50={p50:.1f}ms p99={p99:.1f}ms max={latencies[-1]:.1f}ms")
+  return p99
+
+async def main(args):
+  create_tables()
+  branch_ids, _ = await seed(args.rows) if not args.skip_seed else ([None], None)
+  queries = await sample_serials(args.queries)
+
+  p99 = max(
+    await measure("sin filtros", queries, branch_ids, with_filters=False),
+    await measure("por sucursal", queries, branch_ids, with_filters=bool(branch_ids[0])),
+  )
+  await async_engine.dispose()
+
+  if p99 > args.target_p99_ms:
+    raise SystemExit(f"p99 {p99:.1f}ms supera el objetivo de {args.target_p99_ms}ms")
+  print(f"p99 dentro del objetivo de {args.target_p99_ms}ms")
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--rows", type=int, default=1_000_000)
+  parser.add_argument("--queries", type=int, default=500)
+  parser.add_argument("--target-p99-ms", type=float, default=150)
+  parser.add_argument("--skip-seed", action="store_true")
+  asyncio.run(main(parser.parse_args()))
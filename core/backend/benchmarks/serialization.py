@@ -0,0 +1,67 @@
+# Micro-benchmark de serialización de respuestas de listado (10k filas por defecto).
+# Compara lo que hacía FastAPI con los endpoints anteriores frente a FastJSONResponse:
+#   - dicts + jsonable_encoder + json.dumps (get_all_branches con response_model=list)
+#   - validación contra response_model=list[BranchRead] + serialización + json.dumps
+#   - filas con las columnas de BranchRead serializadas directamente con orjson
+# No necesita base de datos. Uso (desde core/backend):
+#   python -m benchmarks.serialization --rows 10000 --repeat 20
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.schemas.enum import BranchStatus
+from app.schemas.schemas import BranchRead
+from app.utils.responses import FastJSONResponse
+
+def make_rows(count: int) -> list[dict]:
+  now = datetime.now(timezone.utc)
+  return [
+    {
+      "name": f"Sucursal {i}", "address": f"Av. Siempre Viva {i}", "city": "La Paz", "state": "La Paz",
+      "country": "Bolivia", "id": uuid4(), "status": random.choice(list(BranchStatus)), "created_by": uuid4(),
+      "created_at": now - timedelta(days=i), "updated_at": now,
+    }
+    for i in range(count)
+  ]
+
+def encoder_path(rows: list[dict]) -> bytes:
+  return JSONResponse(jsonable_encoder(rows)).body
+
+branch_list_adapter = TypeAdapter(list[BranchRead])
+
+def response_model_path(rows: list[dict]) -> bytes:
+  validated = branch_list_adapter.validate_python(rows)
+  return JSONResponse(branch_list_adapter.dump_python(validated, mode="json")).body
+
+def fast_path(rows: list[dict]) -> bytes:
+  return FastJSONResponse(rows).body
+
+def measure(label: str, render, rows: list[dict], repeat: int) -> float:
+  render(rows)
+  timings = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    body = render(rows)
+    timings.append((time.perf_counter() - started) * 1000)
+  median = statistics.median(timings)
+  print(f"{label:<28} mediana={median:8.1f}ms  min={min(timings):8.1f}ms  tamaño={len(body) / 1024:.0f}KiB")
+  return median
+
+def main(args):
+  rows = make_rows(args.rows)
+  print(f"Serializando {args.rows} sucursales, {args.repeat} repeticiones")
+  baseline = measure("jsonable_encoder + json", encoder_path, rows, args.repeat)
+  validated = measure("response_model validado", response_model_path, rows, args.repeat)
+  fast = measure("FastJSONResponse (orjson)", fast_path, rows, args.repeat)
+  print(f"Mejora: {baseline / fast:.1f}x frente a jsonable_encoder, {validated / fast:.1f}x frente a response_model")
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--rows", type=int, default=10_000)
+  parser.add_argument("--repeat", type=int, default=20)
+  main(parser.parse_args())
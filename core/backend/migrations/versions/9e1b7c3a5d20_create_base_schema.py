@@ -0,0 +1,217 @@
+"""Create the base schema
+
+Revision ID: 9e1b7c3a5d20
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e1b7c3a5d20"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUMS = [
+    ("userrole", ["USER", "ADMIN", "OWNER"]),
+    ("userstatus", ["ACTIVE", "INACTIVE"]),
+    ("branchstatus", ["ACTIVE", "INACTIVE", "CLOSED", "MAINTENANCE"]),
+    ("resourcestatus", ["ACTIVE", "INACTIVE", "MAINTENANCE", "LOST", "DISCARDED"]),
+    ("mediatype", ["IMAGE", "VIDEO", "AUDIO", "DOCUMENT", "OTHER"]),
+    ("resourcetransferstatus", ["PENDING", "SENT", "RECEIVED", "CANCELLED"]),
+    ("chatroomtype", ["PRIVATE", "BRANCH", "INTER_BRANCH"]),
+    ("notificationtype", ["INVITATION", "ALERT", "MESSAGE", "SYSTEM"]),
+    ("invitationstatus", ["PENDING", "ACCEPTED", "DECLINED", "EXPIRED"]),
+]
+
+
+def _enum(name: str) -> postgresql.ENUM:
+    # Los tipos se crean una sola vez en upgrade(); las columnas solo los referencian
+    return postgresql.ENUM(*dict(ENUMS)[name], name=name, create_type=False)
+
+
+def _timestamp(name: str) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True)
+
+
+def _tables() -> list:
+    # Esquema anterior a a3f1c9d2e7b4: los índices compuestos, idempotency_key y los resúmenes
+    # por sucursal los añaden las migraciones siguientes
+    return [
+        ("user", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False, index=True),
+            sa.Column("email", sa.String(), nullable=False, index=True),
+            sa.Column("role", _enum("userrole"), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("status", _enum("userstatus"), nullable=False),
+            sa.Column("is_verified", sa.Boolean(), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("business", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False, index=True),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("created_by", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("branch", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False, index=True),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=True),
+            sa.Column("status", _enum("branchstatus"), nullable=False),
+            sa.Column("address", sa.String(), nullable=True),
+            sa.Column("city", sa.String(), nullable=True),
+            sa.Column("state", sa.String(), nullable=True),
+            sa.Column("country", sa.String(), nullable=False),
+            sa.Column("created_by", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("person", [
+            sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+            sa.Column("full_name", sa.String(), nullable=False),
+            sa.Column("picture", sa.String(), nullable=True),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=True, index=True),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=True, index=True),
+            sa.Column("ci", sa.Integer(), nullable=True, index=True),
+            sa.Column("phone_number", sa.String(), nullable=True, index=True),
+            sa.Column("address", sa.String(), nullable=True),
+            sa.Column("city", sa.String(), nullable=True),
+            sa.Column("state", sa.String(), nullable=True),
+            sa.Column("country", sa.String(), nullable=False),
+            sa.Column("birth_date", sa.DateTime(timezone=True), nullable=True),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("category", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False, index=True),
+            sa.Column("type", sa.String(), nullable=True),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=False),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            sa.Column("created_by", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("resource", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False, index=True),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("stock", sa.Integer(), nullable=False),
+            sa.Column("serial_number", sa.String(), nullable=False, index=True),
+            sa.Column("asset_number", sa.String(), nullable=True, index=True),
+            sa.Column("status", _enum("resourcestatus"), nullable=False),
+            sa.Column("location", sa.String(), nullable=True),
+            sa.Column("tracking_qr_code", sa.String(), nullable=True),
+            sa.Column("last_scanned_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("category_id", sa.Uuid(), sa.ForeignKey("category.id"), nullable=False),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=False),
+            sa.Column("created_by", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("resourcemedia", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column("type", _enum("mediatype"), nullable=False),
+            sa.Column("resource_id", sa.Uuid(), sa.ForeignKey("resource.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("resourcetransferrecord", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("resource_id", sa.Uuid(), sa.ForeignKey("resource.id"), nullable=False),
+            sa.Column("from_branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            sa.Column("to_branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            sa.Column("from_business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=True),
+            sa.Column("to_business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=True),
+            sa.Column("status", _enum("resourcetransferstatus"), nullable=False),
+            sa.Column("initiated_by", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("chatroom", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("type", _enum("chatroomtype"), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=False),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=False),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("chatmessage", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("room_id", sa.Uuid(), sa.ForeignKey("chatroom.id"), nullable=False),
+            sa.Column("sender_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("content", sa.String(), nullable=False),
+            sa.Column("seen", sa.Boolean(), nullable=False),
+            _timestamp("sent_at"),
+            _timestamp("updated_at"),
+        ]),
+        ("chatparticipant", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("room_id", sa.Uuid(), sa.ForeignKey("chatroom.id"), nullable=False),
+            sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            _timestamp("joined_at"),
+        ]),
+        ("notification", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("receiver_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("sender_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=True),
+            sa.Column("type", _enum("notificationtype"), nullable=False),
+            sa.Column("target_id", sa.Uuid(), nullable=True, index=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("message", sa.String(), nullable=False),
+            sa.Column("url", sa.String(), nullable=True),
+            sa.Column("is_read", sa.Boolean(), nullable=False),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=True),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=True),
+            _timestamp("created_at"),
+        ]),
+        ("invitation", [
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), nullable=False),
+            sa.Column("business_id", sa.Uuid(), sa.ForeignKey("business.id"), nullable=False),
+            sa.Column("invited_user_email", sa.String(), nullable=False),
+            sa.Column("invited_user_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=True),
+            sa.Column("inviter_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("status", _enum("invitationstatus"), nullable=False),
+            sa.Column("token", sa.Uuid(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            _timestamp("created_at"),
+        ]),
+    ]
+
+
+def upgrade() -> None:
+    # Las bases creadas antes con create_tables() ya tienen estas tablas: se omiten y
+    # las migraciones siguientes completan índices y columnas de forma idempotente
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    for name, values in ENUMS:
+        postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+
+    for name, columns in _tables():
+        if name not in tables:
+            op.create_table(name, *columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name, _ in reversed(_tables()):
+        op.drop_table(name)
+    for name, values in reversed(ENUMS):
+        postgresql.ENUM(*values, name=name).drop(bind, checkfirst=True)
@@ -0,0 +1,76 @@
+"""Add foreign-key and composite indexes
+
+Revision ID: a3f1c9d2e7b4
+Revises: 9e1b7c3a5d20
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f1c9d2e7b4"
+down_revision: Union[str, None] = "9e1b7c3a5d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nombre, tabla, columnas, opciones extra de create_index)
+INDEXES = [
+    ("ix_user_created_at_id", "user", ["created_at", "id"], {}),
+    ("ix_user_unverified_created_at", "user", ["created_at", "id"], {"postgresql_where": sa.text("is_verified = false")}),
+    ("ix_resource_branch_id", "resource", ["branch_id"], {}),
+    ("ix_resource_category_id", "resource", ["category_id"], {}),
+    ("ix_resource_business_id", "resource", ["business_id"], {}),
+    ("ix_resource_name_trgm", "resource", ["name"], {"postgresql_using": "gin", "postgresql_ops": {"name": "gin_trgm_ops"}}),
+    ("ix_resource_serial_number_trgm", "resource", ["serial_number"], {"postgresql_using": "gin", "postgresql_ops": {"serial_number": "gin_trgm_ops"}}),
+    ("ix_resource_asset_number_trgm", "resource", ["asset_number"], {"postgresql_using": "gin", "postgresql_ops": {"asset_number": "gin_trgm_ops"}}),
+    ("ix_resourcetransferrecord_resource_id", "resourcetransferrecord", ["resource_id"], {}),
+    ("ix_resourcetransferrecord_idempotency_key", "resourcetransferrecord", ["idempotency_key"], {}),
+    ("ix_transfer_from_branch_created_at", "resourcetransferrecord", ["from_branch_id", "created_at", "id"], {}),
+    ("ix_transfer_to_branch_created_at", "resourcetransferrecord", ["to_branch_id", "created_at", "id"], {}),
+    ("ix_notification_receiver_created_at", "notification", ["receiver_id", "created_at", "id"], {}),
+    ("ix_notification_receiver_unread", "notification", ["receiver_id", "is_read", "created_at"], {}),
+    ("ix_chatmessage_room_sent_at", "chatmessage", ["room_id", "sent_at", "id"], {}),
+    ("ix_chatparticipant_room_user", "chatparticipant", ["room_id", "user_id"], {}),
+    ("ix_chatparticipant_user_id", "chatparticipant", ["user_id"], {}),
+]
+
+
+def _existing_indexes(inspector, table: str) -> set:
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    # Idempotente: las bases creadas con create_tables() pueden tener ya parte de estos índices,
+    # y las tablas que aún no existen se crean con sus índices desde los modelos.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "resourcetransferrecord" in tables:
+        op.execute("ALTER TABLE resourcetransferrecord ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR")
+
+    pending = [
+        (name, table, columns, options)
+        for name, table, columns, options in INDEXES
+        if table in tables and name not in _existing_indexes(inspector, table)
+    ]
+
+    # CONCURRENTLY evita bloquear escrituras en tablas grandes; requiere ejecutarse fuera de la transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in pending:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if table in tables and name in _existing_indexes(inspector, table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""Add incrementally maintained branch summaries
+
+Revision ID: b7e2d4c8f1a6
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.triggers import drop_branch_summaries, install_branch_summaries, rebuild_branch_summaries
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d4c8f1a6"
+down_revision: Union[str, None] = "a3f1c9d2e7b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    if "branchsummary" not in tables:
+        op.create_table(
+            "branchsummary",
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), primary_key=True),
+            sa.Column("headcount", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("pending_transfers_in", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("pending_transfers_out", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if "branchresourcesummary" not in tables:
+        op.create_table(
+            "branchresourcesummary",
+            sa.Column("branch_id", sa.Uuid(), sa.ForeignKey("branch.id"), primary_key=True),
+            sa.Column("status", postgresql.ENUM(name="resourcestatus", create_type=False), primary_key=True),
+            sa.Column("resource_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("inventory_value", sa.Float(), nullable=False, server_default="0"),
+        )
+
+    install_branch_summaries(bind)
+    rebuild_branch_summaries(bind)
+
+
+def downgrade() -> None:
+    drop_branch_summaries(op.get_bind())
+    op.drop_table("branchresourcesummary")
+    op.drop_table("branchsummary")
@@ -0,0 +1,43 @@
+"""Add transfer route indexes for the branch transfer history
+
+Revision ID: c4d1e8a9b2f3
+Revises: b7e2d4c8f1a6
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d1e8a9b2f3"
+down_revision: Union[str, None] = "b7e2d4c8f1a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_transfer_route_sent_created_at", ["from_branch_id", "to_branch_id", "created_at", "id"]),
+    ("ix_transfer_route_received_created_at", ["to_branch_id", "from_branch_id", "created_at", "id"]),
+]
+
+
+def _existing_indexes() -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("resourcetransferrecord")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            if name not in existing:
+                op.create_index(name, "resourcetransferrecord", columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            if name in existing:
+                op.drop_index(name, table_name="resourcetransferrecord", postgresql_concurrently=True)
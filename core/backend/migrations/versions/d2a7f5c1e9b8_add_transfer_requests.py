@@ -0,0 +1,37 @@
+"""Add per-admin idempotency records for resource transfers
+
+Revision ID: d2a7f5c1e9b8
+Revises: c4d1e8a9b2f3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7f5c1e9b8"
+down_revision: Union[str, None] = "c4d1e8a9b2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "resourcetransferrequest" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "resourcetransferrequest",
+        sa.Column("initiated_by", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("idempotency_key", sa.String(length=255), primary_key=True),
+        sa.Column("payload_hash", sa.String(), nullable=False),
+        sa.Column("transferred", postgresql.JSONB(), nullable=False),
+        sa.Column("skipped", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("resourcetransferrequest")
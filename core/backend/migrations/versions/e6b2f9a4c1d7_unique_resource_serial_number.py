@@ -0,0 +1,59 @@
+"""Make resource.serial_number unique
+
+Revision ID: e6b2f9a4c1d7
+Revises: d2a7f5c1e9b8
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2f9a4c1d7"
+down_revision: Union[str, None] = "d2a7f5c1e9b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_resource_serial_number"
+NEW_INDEX = "ix_resource_serial_number_unique"
+
+
+def _indexes() -> dict:
+    return {index["name"]: index for index in sa.inspect(op.get_bind()).get_indexes("resource")}
+
+
+def upgrade() -> None:
+    indexes = _indexes()
+    if INDEX in indexes and indexes[INDEX]["unique"]:
+        return
+
+    # Un índice único CONCURRENTLY que falla queda INVALID: se verifica antes para dar un error claro
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM resource GROUP BY serial_number HAVING count(*) > 1) d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"resource tiene {duplicates} números de serie repetidos; deben depurarse antes de esta migración"
+        )
+
+    # Se construye el índice nuevo antes de quitar el anterior: la búsqueda por serie nunca queda sin índice
+    with op.get_context().autocommit_block():
+        if NEW_INDEX not in indexes:
+            op.create_index(NEW_INDEX, "resource", ["serial_number"], unique=True, postgresql_concurrently=True)
+        if INDEX in indexes:
+            op.drop_index(INDEX, table_name="resource", postgresql_concurrently=True)
+    op.execute(f"ALTER INDEX {NEW_INDEX} RENAME TO {INDEX}")
+
+
+def downgrade() -> None:
+    indexes = _indexes()
+    if INDEX not in indexes or not indexes[INDEX]["unique"]:
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index(NEW_INDEX, "resource", ["serial_number"], postgresql_concurrently=True)
+        op.drop_index(INDEX, table_name="resource", postgresql_concurrently=True)
+    op.execute(f"ALTER INDEX {NEW_INDEX} RENAME TO {INDEX}")
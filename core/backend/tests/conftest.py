@@ -0,0 +1,94 @@
+import os
+import pytest
+
+# Las pruebas de integración usan servicios dedicados (TEST_DATABASE_URL / TEST_REDIS_URL),
+# nunca los del .env: se copian antes de que app.config los lea al importarse
+if os.getenv("TEST_DATABASE_URL"):
+  os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+if os.getenv("TEST_REDIS_URL"):
+  os.environ["REDIS_URL"] = os.environ["TEST_REDIS_URL"]
+# Los jobs periódicos no deben correr contra los datos de las pruebas
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+@pytest.fixture(scope="session")
+def database():
+  from app.db.session import create_tables, engine
+  create_tables()
+  yield engine
+  engine.dispose()
+
+@pytest.fixture
+def redis():
+  from app.db.session import redis_client
+  redis_client.flushdb()
+  yield redis_client
+  redis_client.flushdb()
+
+@pytest.fixture
+def user(database):
+  from uuid import uuid4
+  from sqlmodel import Session, delete
+  from app.schemas.models import Notification, User
+
+  suffix = uuid4().hex[:8]
+  user = User(username=f"test-{suffix}", email=f"test-{suffix}@example.com", password="x", is_verified=True)
+  with Session(database) as session:
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+  yield user
+  with Session(database) as session:
+    session.exec(delete(Notification).where(Notification.receiver_id == user.id))
+    session.exec(delete(User).where(User.id == user.id))
+    session.commit()
+
+@pytest.fixture
+def branch(database, user):
+  from uuid import uuid4
+  from sqlmodel import Session, delete
+  from app.schemas.models import Branch
+
+  branch = Branch(name=f"test-{uuid4().hex[:8]}", address="Av. Principal", city="La Paz", state="La Paz", created_by=user.id)
+  with Session(database) as session:
+    session.add(branch)
+    session.commit()
+    session.refresh(branch)
+  yield branch
+  with Session(database) as session:
+    session.exec(delete(Branch).where(Branch.id == branch.id))
+    session.commit()
+
+@pytest.fixture(scope="session")
+def client(database):
+  from fastapi.testclient import TestClient
+  from app import create_app
+
+  with TestClient(create_app()) as client:
+    yield client
+
+@pytest.fixture
+def admin_headers(user, database):
+  from sqlmodel import Session
+  from app.schemas.enum import UserRole
+  from app.schemas.models import User
+  from app.security.principal import invalidate_principal
+  from app.utils.jwt import JWT
+
+  with Session(database) as session:
+    session.get(User, user.id).role = UserRole.ADMIN
+    session.commit()
+  invalidate_principal(user.id)
+  return {"Authorization": f"Bearer {JWT().create_access_token({'sub': str(user.id)})}"}
+
+@pytest.fixture
+def within_budget(client):
+  # Petición del TestClient dentro de query_budget: falla si supera max_queries o repite
+  # una misma forma de consulta (N+1). Devuelve la respuesta para las demás aserciones
+  from app.profiling import query_budget
+
+  def request(method: str, url: str, max_queries: int, allow_n_plus_one: bool = False, **kwargs):
+    with query_budget(max_queries, allow_n_plus_one):
+      return client.request(method, url, **kwargs)
+  return request
+
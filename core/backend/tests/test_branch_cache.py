@@ -0,0 +1,31 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from app.services.branch_cache import STATS_KEY
+
+def test_item_is_served_from_cache_until_a_write(client, redis, admin_headers, branch):
+  url = f"/api/v1/branches/{branch.id}"
+  assert client.get(url, headers=admin_headers).json()["name"] == branch.name
+  assert client.get(url, headers=admin_headers).json()["name"] == branch.name
+  assert redis.hgetall(STATS_KEY) == {"hits": "1", "misses": "1"}
+
+  client.put(f"/api/v1/branches/update/{branch.id}", json={"name": "Renombrada"}, headers=admin_headers)
+
+  # La escritura sube la versión: la entrada anterior ya no es válida
+  assert client.get(url, headers=admin_headers).json()["name"] == "Renombrada"
+  assert redis.hgetall(STATS_KEY) == {"hits": "1", "misses": "2"}
+
+def test_validators_follow_the_cached_body(client, admin_headers, branch):
+  url = f"/api/v1/branches/{branch.id}"
+  first = client.get(url, headers=admin_headers)
+  assert client.get(url, headers={**admin_headers, "If-None-Match": first.headers["ETag"]}).status_code == 304
+
+  client.put(f"/api/v1/branches/update/{branch.id}", json={"name": "Renombrada"}, headers=admin_headers)
+
+  # El ETag anterior ya no valida: el cuerpo nuevo llega con su propio validador
+  second = client.get(url, headers={**admin_headers, "If-None-Match": first.headers["ETag"]})
+  assert second.status_code == 200 and second.json()["name"] == "Renombrada"
+  assert second.headers["ETag"] != first.headers["ETag"]
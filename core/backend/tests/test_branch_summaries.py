@@ -0,0 +1,20 @@
+import os
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+  pytest.skip("TEST_DATABASE_URL no está definida", allow_module_level=True)
+
+from sqlalchemy import text
+from app.db.triggers import ensure_branch_summaries
+
+def test_ensure_skips_when_triggers_are_installed(database):
+  with database.begin() as connection:
+    assert ensure_branch_summaries(connection) is False
+
+def test_ensure_reinstalls_missing_triggers(database):
+  with database.connect() as connection:
+    transaction = connection.begin()
+    connection.execute(text('DROP TRIGGER resource_summary_insert ON "resource"'))
+    assert ensure_branch_summaries(connection) is True
+    assert ensure_branch_summaries(connection) is False
+    transaction.rollback()
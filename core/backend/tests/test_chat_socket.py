@@ -0,0 +1,83 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from datetime import timedelta
+from uuid import uuid4
+from sqlmodel import Session, delete
+from app.schemas.enum import ChatRoomType, UserStatus
+from app.schemas.models import Business, ChatParticipant, ChatRoom, User
+from app.security.principal import invalidate_principal
+from app.services.chat import ROOM_MEMBERS_KEY
+from app.utils.jwt import JWT
+
+@pytest.fixture
+def room(database, redis, user, branch):
+  business = Business(name="Negocio", created_by=user.id)
+  room = ChatRoom(type=ChatRoomType.BRANCH, title="Sala", description="", business_id=business.id, branch_id=branch.id)
+  with Session(database) as session:
+    # Solo un usuario con sesión activa puede abrir el socket
+    session.get(User, user.id).status = UserStatus.ACTIVE
+    session.add(business)
+    session.flush()
+    session.add(room)
+    session.flush()
+    session.add(ChatParticipant(room_id=room.id, user_id=user.id))
+    session.commit()
+    session.refresh(room)
+    session.refresh(business)
+  yield room
+  with Session(database) as session:
+    session.exec(delete(ChatParticipant).where(ChatParticipant.room_id == room.id))
+    session.exec(delete(ChatRoom).where(ChatRoom.id == room.id))
+    session.exec(delete(Business).where(Business.id == business.id))
+    session.commit()
+
+def socket_url(room, user, expires_delta: timedelta = timedelta(minutes=15)) -> str:
+  token = JWT().create_access_token({"sub": str(user.id)}, expires_delta)
+  return f"/api/v1/chat/ws/rooms/{room.id}?token={token}"
+
+def test_invalid_frames_are_answered_without_closing(client, room, user):
+  with client.websocket_connect(socket_url(room, user)) as websocket:
+    websocket.send_text("{no es json")
+    assert websocket.receive_json() == {"error": "Mensaje inválido."}
+    websocket.send_json({"content": ""})
+    assert websocket.receive_json() == {"error": "Mensaje inválido."}
+
+    websocket.send_json({"content": "Hola"})
+    assert websocket.receive_json()["content"] == "Hola"
+
+def test_signed_out_user_is_disconnected(client, database, room, user):
+  with client.websocket_connect(socket_url(room, user)) as websocket:
+    # Lo que hace sign-out-all: el usuario queda INACTIVE y se invalida su principal
+    with Session(database) as session:
+      session.get(User, user.id).status = UserStatus.INACTIVE
+      session.commit()
+    invalidate_principal(user.id)
+
+    assert websocket.receive() == {"type": "websocket.close", "code": 1008, "reason": ""}
+
+def test_socket_closes_when_the_token_expires(client, room, user):
+  with client.websocket_connect(socket_url(room, user, timedelta(seconds=2))) as websocket:
+    assert websocket.receive() == {"type": "websocket.close", "code": 1008, "reason": ""}
+
+def test_rooms_without_members_are_cached_too(client, within_budget, redis, user):
+  room_id = uuid4()
+  headers = {"Authorization": f"Bearer {JWT().create_access_token({'sub': str(user.id)})}"}
+
+  assert client.get(f"/api/v1/chat/rooms/{room_id}/messages", headers=headers).status_code == 403
+  # El centinela mantiene el set: la siguiente solicitud no vuelve a PostgreSQL
+  assert redis.exists(ROOM_MEMBERS_KEY.format(room_id=room_id))
+  assert not redis.sismember(ROOM_MEMBERS_KEY.format(room_id=room_id), str(user.id))
+  response = within_budget("GET", f"/api/v1/chat/rooms/{room_id}/messages", max_queries=0, headers=headers)
+  assert response.status_code == 403
+
+def test_cold_history_keeps_unflushed_messages(client, room, user):
+  headers = {"Authorization": f"Bearer {JWT().create_access_token({'sub': str(user.id)})}"}
+  url = f"/api/v1/chat/rooms/{room.id}/messages"
+  client.post(url, json={"content": "Pendiente"}, headers=headers)
+
+  # Sin marca de calentamiento: la lista se reconstruye desde PostgreSQL sin perder el mensaje
+  assert [item["content"] for item in client.get(url, headers=headers).json()["items"]] == ["Pendiente"]
@@ -0,0 +1,134 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+import asyncio
+import json
+import socket
+import time
+from aiosmtpd.controller import Controller
+from redis.asyncio import Redis as AsyncRedis
+from app.config import settings
+from app.services.email_outbox import (
+  CONSUMER_GROUP, DEAD_LETTER_STREAM, OUTBOX_STREAM, RETRY_KEY, EmailOutboxWorker, enqueue_email, retry_delay
+)
+
+class Inbox:
+  # Servidor SMTP de pruebas: rechaza con 451 los primeros `failures` envíos
+  def __init__(self):
+    self.messages = []
+    self.failures = 0
+
+  async def handle_DATA(self, server, session, envelope):
+    if self.failures:
+      self.failures -= 1
+      return "451 Buzón temporalmente no disponible"
+    self.messages.append(envelope)
+    return "250 OK"
+
+def free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp(monkeypatch):
+  inbox = Inbox()
+  controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+  controller.start()
+  monkeypatch.setattr(settings, "SMTP_HOST", controller.hostname)
+  monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+  monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+  monkeypatch.setattr(settings, "SMTP_USER", None)
+  monkeypatch.setattr(settings, "EMAIL_FROM", "noreply@example.com")
+  monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_DELAY", 10)
+  monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+  yield inbox
+  controller.stop()
+
+def run_worker(scenario):
+  # Cliente asíncrono propio por prueba: cada asyncio.run usa un event loop nuevo
+  async def main():
+    worker = EmailOutboxWorker(redis=AsyncRedis.from_url(settings.REDIS_URL, decode_responses=True), consumer="test")
+    try:
+      await worker.ensure_group()
+      await scenario(worker)
+    finally:
+      await worker.close()
+      await worker.redis.aclose()
+  asyncio.run(main())
+
+async def read_and_process(worker: EmailOutboxWorker):
+  response = await worker.redis.xreadgroup(CONSUMER_GROUP, worker.consumer, {OUTBOX_STREAM: ">"}, count=10)
+  for _, entries in response or []:
+    await worker.process_batch(entries)
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+  monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_DELAY", 5)
+  monkeypatch.setattr(settings, "EMAIL_RETRY_MAX_DELAY", 30)
+  assert [retry_delay(attempts) for attempts in range(1, 6)] == [5, 10, 20, 30, 30]
+
+def test_worker_delivers_queued_messages(redis, smtp):
+  enqueue_email("ana@example.com", "Bienvenida", "Hola Ana", redis=redis)
+  enqueue_email("luis@example.com", "Bienvenida", "Hola Luis", redis=redis)
+
+  async def scenario(worker):
+    task = asyncio.create_task(worker.run())
+    for _ in range(100):
+      if len(smtp.messages) == 2:
+        break
+      await asyncio.sleep(0.05)
+    worker.stop()
+    task.cancel()
+    try:
+      await task
+    except asyncio.CancelledError:
+      pass
+
+  run_worker(scenario)
+  assert sorted(envelope.rcpt_tos[0] for envelope in smtp.messages) == ["ana@example.com", "luis@example.com"]
+  assert "Hola Ana" in next(e.content.decode() for e in smtp.messages if e.rcpt_tos == ["ana@example.com"])
+  assert redis.xlen(OUTBOX_STREAM) == 0
+
+def test_failed_delivery_is_retried_with_backoff(redis, smtp):
+  smtp.failures = 1
+  enqueue_email("ana@example.com", "Bienvenida", "Hola Ana", redis=redis)
+
+  async def scenario(worker):
+    await read_and_process(worker)
+    [(member, due_at)] = await worker.redis.zrange(RETRY_KEY, 0, -1, withscores=True)
+    assert json.loads(member)["attempts"] == 1
+    assert due_at == pytest.approx(time.time() + settings.EMAIL_RETRY_BASE_DELAY, abs=2)
+    assert await worker.redis.xlen(OUTBOX_STREAM) == 0
+
+    # Vencido el plazo, el reintento vuelve al stream y se entrega
+    await worker.redis.zadd(RETRY_KEY, {member: 0})
+    await worker.promote_due_retries()
+    await read_and_process(worker)
+
+  run_worker(scenario)
+  assert [envelope.rcpt_tos for envelope in smtp.messages] == [["ana@example.com"]]
+  assert redis.zcard(RETRY_KEY) == 0
+
+def test_backoff_grows_then_dead_letters(redis, smtp):
+  smtp.failures = settings.EMAIL_MAX_ATTEMPTS
+  enqueue_email("ana@example.com", "Bienvenida", "Hola Ana", redis=redis)
+
+  async def scenario(worker):
+    await read_and_process(worker)
+    for attempts in range(2, settings.EMAIL_MAX_ATTEMPTS + 1):
+      [(member, due_at)] = await worker.redis.zrange(RETRY_KEY, 0, -1, withscores=True)
+      assert due_at == pytest.approx(time.time() + retry_delay(attempts - 1), abs=2)
+      await worker.redis.zadd(RETRY_KEY, {member: 0})
+      await worker.promote_due_retries()
+      await read_and_process(worker)
+
+  run_worker(scenario)
+  assert smtp.messages == []
+  assert redis.zcard(RETRY_KEY) == 0
+  [(_, dead)] = redis.xrange(DEAD_LETTER_STREAM)
+  assert dead["to"] == "ana@example.com"
+  assert int(dead["attempts"]) == settings.EMAIL_MAX_ATTEMPTS
+  assert "451" in dead["last_error"]
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+import time
+from uuid import uuid4
+from app.schemas.enum import UserRole, UserStatus
+from app.schemas.schemas import Principal
+from app.security.principal import INVALIDATION_CHANNEL, _local_cache, _set_local
+
+def test_invalidation_from_another_worker_clears_local_cache(client, redis):
+  user_id = uuid4()
+  _set_local(user_id, Principal(id=user_id, role=UserRole.ADMIN, status=UserStatus.ACTIVE), ttl=60)
+
+  # Lo publicado por otro worker llega al listener de esta aplicación
+  redis.publish(INVALIDATION_CHANNEL, str(user_id))
+  deadline = time.monotonic() + 5
+  while user_id in _local_cache and time.monotonic() < deadline:
+    time.sleep(0.05)
+  assert user_id not in _local_cache
@@ -0,0 +1,40 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from uuid import uuid4
+from sqlmodel import Session, delete
+from app.schemas.models import Person, User
+
+@pytest.fixture
+def people(database):
+  users = [
+    User(username=f"people-{i}-{uuid4().hex[:6]}", email=f"people-{i}-{uuid4().hex[:6]}@example.com", password="x")
+    for i in range(30)
+  ]
+  ids = [user.id for user in users]
+  with Session(database) as session:
+    session.add_all(users)
+    session.flush()
+    session.add_all([Person(user_id=user.id, full_name=f"Persona {i}") for i, user in enumerate(users)])
+    session.commit()
+  yield ids
+  with Session(database) as session:
+    session.exec(delete(Person).where(Person.user_id.in_(ids)))
+    session.exec(delete(User).where(User.id.in_(ids)))
+    session.commit()
+
+def test_list_users_is_one_query_per_page(within_budget, admin_headers, people):
+  # Principal en frío (1) + User JOIN Person (1), sin consultas por fila
+  response = within_budget("GET", "/api/v1/users/", max_queries=2, params={"limit": 20}, headers=admin_headers)
+  assert response.status_code == 200
+  page = response.json()
+  assert len(page["items"]) == 20 and page["next_cursor"]
+
+  response = within_budget(
+    "GET", "/api/v1/users/", max_queries=1, params={"limit": 20, "cursor": page["next_cursor"]}, headers=admin_headers
+  )
+  assert response.status_code == 200
+  assert {item["user_id"] for item in response.json()["items"]}.isdisjoint(item["user_id"] for item in page["items"])
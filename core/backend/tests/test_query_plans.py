@@ -0,0 +1,221 @@
+# Regresión de planes de consulta: ejecuta EXPLAIN (FORMAT JSON) sobre las consultas
+# críticas de la API contra datos sembrados con volumen y distribución realistas
+# (estadísticas reales tras ANALYZE) y falla si alguna recorre con Seq Scan una tabla vigilada.
+# Todo ocurre en una transacción que se revierte al terminar.
+#
+# Uso (desde core/backend, con una base de pruebas dedicada):
+#   TEST_DATABASE_URL=postgresql://... pytest tests/test_query_plans.py
+import os
+import json
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+  pytest.skip("TEST_DATABASE_URL no está definida", allow_module_level=True)
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import and_, or_, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from app.schemas.models import (
+  ChatMessage, ChatParticipant, Notification, Resource, ResourceTransferRecord, User
+)
+
+WATCHED_TABLES = {"user", "resource", "resourcetransferrecord", "notification", "chatmessage", "chatparticipant"}
+
+# Filas por tabla: suficientes para que el planificador prefiera los índices por coste
+VOLUME = {
+  "users": 20_000,
+  "businesses": 20,
+  "branches": 100,
+  "categories": 200,
+  "resources": 50_000,
+  "transfers": 100_000,
+  "rooms": 200,
+  "participants": 20_000,
+  "messages": 100_000,
+  "notifications": 100_000,
+}
+
+# Cada sentencia toma sus claves de arreglos ya sembrados, repartidas por módulo
+SEED_SQL = [
+  # 1 de cada 20 usuarios sin verificar, como en producción tras la limpieza periódica
+  """
+  INSERT INTO "user" (id, username, email, role, password, status, is_verified, created_at, updated_at)
+  SELECT gen_random_uuid(), 'user-' || i, 'user-' || i || '@example.com', 'USER'::userrole, 'x',
+         'ACTIVE'::userstatus, i % 20 <> 0, now() - i * interval '1 minute', now()
+  FROM generate_series(1, :users) AS i
+  """,
+  """
+  INSERT INTO business (id, name, created_by)
+  SELECT gen_random_uuid(), 'business-' || i, owner.id
+  FROM generate_series(1, :businesses) AS i, (SELECT id FROM "user" LIMIT 1) AS owner
+  """,
+  """
+  INSERT INTO branch (id, name, business_id, status, country, created_by)
+  SELECT gen_random_uuid(), 'branch-' || i, b.ids[1 + i % array_length(b.ids, 1)],
+         'ACTIVE'::branchstatus, 'Bolivia', owner.id
+  FROM generate_series(1, :branches) AS i,
+       (SELECT array_agg(id) AS ids FROM business) AS b,
+       (SELECT id FROM "user" LIMIT 1) AS owner
+  """,
+  """
+  INSERT INTO category (id, name, business_id, branch_id, created_by)
+  SELECT gen_random_uuid(), 'category-' || i, b.ids[1 + i % array_length(b.ids, 1)],
+         br.ids[1 + i % array_length(br.ids, 1)], owner.id
+  FROM generate_series(1, :categories) AS i,
+       (SELECT array_agg(id) AS ids FROM business) AS b,
+       (SELECT array_agg(id) AS ids FROM branch) AS br,
+       (SELECT id FROM "user" LIMIT 1) AS owner
+  """,
+  """
+  INSERT INTO resource (id, name, price, stock, serial_number, asset_number, status,
+                        category_id, branch_id, business_id, created_by)
+  SELECT gen_random_uuid(), 'Recurso ' || i, (i % 5000) + 0.5, 1 + i % 20,
+         'SN-' || upper(substr(md5(i::text), 1, 10)), 'AS-' || lpad(i::text, 8, '0'),
+         'ACTIVE'::resourcestatus, c.ids[1 + i % array_length(c.ids, 1)],
+         br.ids[1 + i % array_length(br.ids, 1)], b.ids[1 + i % array_length(b.ids, 1)], owner.id
+  FROM generate_series(1, :resources) AS i,
+       (SELECT array_agg(id) AS ids FROM category) AS c,
+       (SELECT array_agg(id) AS ids FROM branch) AS br,
+       (SELECT array_agg(id) AS ids FROM business) AS b,
+       (SELECT id FROM "user" LIMIT 1) AS owner
+  """,
+  # Solo los traspasos creados por la API llevan clave de idempotencia
+  """
+  INSERT INTO resourcetransferrecord (id, resource_id, from_branch_id, to_branch_id, status,
+                                      initiated_by, idempotency_key, created_at)
+  SELECT gen_random_uuid(), r.ids[1 + i % array_length(r.ids, 1)],
+         br.ids[1 + i % array_length(br.ids, 1)], br.ids[1 + (i * 7 + 3) % array_length(br.ids, 1)],
+         'RECEIVED'::resourcetransferstatus, owner.id,
+         CASE WHEN i % 10 = 0 THEN 'key-' || i END, now() - i * interval '1 minute'
+  FROM generate_series(1, :transfers) AS i,
+       (SELECT array_agg(id) AS ids FROM resource) AS r,
+       (SELECT array_agg(id) AS ids FROM branch) AS br,
+       (SELECT id FROM "user" LIMIT 1) AS owner
+  """,
+  """
+  INSERT INTO chatroom (id, type, title, description, business_id, branch_id)
+  SELECT gen_random_uuid(), 'BRANCH'::chatroomtype, 'room-' || i, '',
+         b.ids[1 + i % array_length(b.ids, 1)], br.ids[1 + i % array_length(br.ids, 1)]
+  FROM generate_series(1, :rooms) AS i,
+       (SELECT array_agg(id) AS ids FROM business) AS b,
+       (SELECT array_agg(id) AS ids FROM branch) AS br
+  """,
+  """
+  INSERT INTO chatparticipant (id, room_id, user_id)
+  SELECT gen_random_uuid(), rm.ids[1 + i % array_length(rm.ids, 1)], u.ids[1 + i % array_length(u.ids, 1)]
+  FROM generate_series(1, :participants) AS i,
+       (SELECT array_agg(id) AS ids FROM chatroom) AS rm,
+       (SELECT array_agg(id) AS ids FROM "user") AS u
+  """,
+  """
+  INSERT INTO chatmessage (id, room_id, sender_id, content, seen, sent_at)
+  SELECT gen_random_uuid(), rm.ids[1 + i % array_length(rm.ids, 1)], u.ids[1 + i % array_length(u.ids, 1)],
+         'mensaje ' || i, i % 2 = 0, now() - i * interval '1 second'
+  FROM generate_series(1, :messages) AS i,
+       (SELECT array_agg(id) AS ids FROM chatroom) AS rm,
+       (SELECT array_agg(id) AS ids FROM "user") AS u
+  """,
+  """
+  INSERT INTO notification (id, receiver_id, type, title, message, is_read, created_at)
+  SELECT gen_random_uuid(), u.ids[1 + i % array_length(u.ids, 1)], 'ALERT'::notificationtype,
+         'aviso ' || i, 'mensaje ' || i, i % 3 <> 0, now() - i * interval '1 minute'
+  FROM generate_series(1, :notifications) AS i,
+       (SELECT array_agg(id) AS ids FROM "user") AS u
+  """,
+]
+
+SEEDED_TABLES = ["user", "business", "branch", "category", "resource", "resourcetransferrecord",
+                 "chatroom", "chatparticipant", "chatmessage", "notification"]
+
+def build_queries(ids: dict) -> dict:
+  now, limit = datetime.now(timezone.utc), 20
+  return {
+    "usuarios (keyset)": select(User)
+      .where(tuple_(User.created_at, User.id) < tuple_(now, ids["user"]))
+      .order_by(User.created_at.desc(), User.id.desc()).limit(limit),
+    "usuarios sin verificar": select(User.id)
+      .where(User.is_verified == False, User.created_at < now)
+      .order_by(User.created_at, User.id).limit(limit),
+    "notificaciones por receptor": select(Notification)
+      .where(Notification.receiver_id == ids["user"])
+      .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit),
+    "notificaciones sin leer": select(Notification.id)
+      .where(Notification.receiver_id == ids["user"], Notification.is_read == False),
+    "historial de chat": select(ChatMessage)
+      .where(ChatMessage.room_id == ids["room"])
+      .order_by(ChatMessage.sent_at.desc(), ChatMessage.id.desc()).limit(limit),
+    "miembro de sala": select(ChatParticipant.id)
+      .where(ChatParticipant.room_id == ids["room"], ChatParticipant.user_id == ids["user"]),
+    "salas de usuario": select(ChatParticipant.room_id).where(ChatParticipant.user_id == ids["user"]),
+    "traspasos enviados": select(ResourceTransferRecord)
+      .where(ResourceTransferRecord.from_branch_id == ids["branch"])
+      .order_by(ResourceTransferRecord.created_at.desc(), ResourceTransferRecord.id.desc()).limit(limit),
+    "traspasos recibidos": select(ResourceTransferRecord)
+      .where(ResourceTransferRecord.to_branch_id == ids["branch"])
+      .order_by(ResourceTransferRecord.created_at.desc(), ResourceTransferRecord.id.desc()).limit(limit),
+    "historial con contraparte": select(ResourceTransferRecord)
+      .where(ResourceTransferRecord.to_branch_id == ids["branch"], ResourceTransferRecord.from_branch_id == ids["other_branch"])
+      .order_by(ResourceTransferRecord.created_at.desc(), ResourceTransferRecord.id.desc()).limit(limit),
+    "traspasos por recurso": select(ResourceTransferRecord.id).where(ResourceTransferRecord.resource_id == ids["resource"]),
+    "traspasos por idempotencia": select(ResourceTransferRecord.id)
+      .where(ResourceTransferRecord.idempotency_key == "key-10"),
+    "recursos por sucursal": select(Resource.id).where(Resource.branch_id == ids["branch"]),
+    "recursos por categoría": select(Resource.id).where(Resource.category_id == ids["category"]),
+    "recursos por negocio": select(Resource.id).where(Resource.business_id == ids["business"]),
+    "búsqueda de recursos": select(Resource.id).where(
+      or_(Resource.serial_number.ilike("%SN-ABC%"), Resource.name.ilike("%SN-ABC%"))
+    ).limit(limit),
+    "búsqueda por sucursal": select(Resource.id).where(
+      and_(Resource.branch_id == ids["branch"], Resource.serial_number.ilike("%SN-ABC%"))
+    ).limit(limit),
+  }
+
+QUERY_LABELS = list(build_queries(defaultdict(lambda: None)))
+
+def compile_sql(stmt) -> str:
+  return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def seq_scans(plan: dict) -> list[str]:
+  found = []
+  if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+    found.append(plan["Relation Name"])
+  for child in plan.get("Plans", []):
+    found.extend(seq_scans(child))
+  return found
+
+@pytest.fixture(scope="module")
+def seeded(database):
+  with database.connect() as connection:
+    transaction = connection.begin()
+    for statement in SEED_SQL:
+      connection.execute(text(statement), VOLUME)
+    for table in SEEDED_TABLES:
+      connection.exec_driver_sql(f'ANALYZE "{table}"')
+
+    # Claves reales del conjunto sembrado, como las que llegarían desde la API
+    ids = {
+      "user": connection.execute(text('SELECT id FROM "user" ORDER BY created_at LIMIT 1')).scalar(),
+      "room": connection.execute(text("SELECT id FROM chatroom LIMIT 1")).scalar(),
+      "resource": connection.execute(text("SELECT id FROM resource LIMIT 1")).scalar(),
+      "category": connection.execute(text("SELECT id FROM category LIMIT 1")).scalar(),
+      "business": connection.execute(text("SELECT id FROM business LIMIT 1")).scalar(),
+    }
+    ids["branch"], ids["other_branch"] = connection.execute(text("SELECT id FROM branch LIMIT 2")).scalars().all()
+    yield connection, ids
+    transaction.rollback()
+
+def test_seed_covers_watched_tables(seeded):
+  connection, _ = seeded
+  for table in WATCHED_TABLES:
+    analyzed = connection.execute(
+      text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar()
+    assert analyzed >= 10_000, f"{table} tiene {analyzed:.0f} filas sembradas"
+
+@pytest.mark.parametrize("label", QUERY_LABELS)
+def test_query_uses_index(seeded, label):
+  connection, ids = seeded
+  plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compile_sql(build_queries(ids)[label])}").scalar()
+  root = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+  assert not seq_scans(root), f"{label}: Seq Scan sobre {', '.join(sorted(set(seq_scans(root))))}"
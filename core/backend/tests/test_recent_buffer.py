@@ -0,0 +1,41 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+import json
+from uuid import uuid4
+from sqlmodel import Session
+from app.schemas.enum import NotificationType
+from app.schemas.models import Notification
+from app.schemas.schemas import NotificationCreate
+from app.services.notifications import notification_buffer, push_notification
+
+def notification_for(receiver_id) -> NotificationCreate:
+  return NotificationCreate(receiver_id=receiver_id, type=NotificationType.ALERT, title="Aviso", message="Mensaje")
+
+def test_flush_inserts_batch(database, redis, user):
+  pushed = [push_notification(redis, notification_for(user.id)) for _ in range(3)]
+
+  assert notification_buffer.flush(redis, database, batch_size=2) == 3
+  assert redis.xlen(notification_buffer.flush_stream) == 0
+  with Session(database) as session:
+    assert all(session.get(Notification, item.id) for item in pushed)
+
+def test_flush_dead_letters_entries_that_keep_failing(database, redis, user):
+  valid = push_notification(redis, notification_for(user.id))
+  orphan = push_notification(redis, notification_for(uuid4()))
+  redis.xadd(notification_buffer.flush_stream, {"data": "{no es json"})
+  after = push_notification(redis, notification_for(user.id))
+
+  # La FK inválida y la entrada corrupta no bloquean a las demás del mismo lote
+  assert notification_buffer.flush(redis, database, batch_size=10) == 2
+  assert redis.xlen(notification_buffer.flush_stream) == 0
+
+  dead = [fields for _, fields in redis.xrange(notification_buffer.dead_letter_stream)]
+  assert json.loads(dead[0]["data"])["id"] == str(orphan.id)
+  assert "foreign key" in dead[0]["error"]
+  assert dead[1]["data"] == "{no es json"
+  with Session(database) as session:
+    assert session.get(Notification, valid.id) and session.get(Notification, after.id)
@@ -0,0 +1,60 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from sqlmodel import Session, delete
+from app.schemas.models import Branch, BranchResourceSummary, Business, Category, Resource
+
+@pytest.fixture
+def category(database, user, branch):
+  business = Business(name="Negocio", created_by=user.id)
+  category = Category(name="Equipos", business_id=business.id, branch_id=branch.id, created_by=user.id)
+  with Session(database) as session:
+    session.add(business)
+    session.flush()
+    session.get(Branch, branch.id).business_id = business.id
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    session.refresh(business)
+  yield category
+  with Session(database) as session:
+    session.exec(delete(Resource).where(Resource.category_id == category.id))
+    session.exec(delete(BranchResourceSummary).where(BranchResourceSummary.branch_id == branch.id))
+    session.exec(delete(Category).where(Category.id == category.id))
+    session.get(Branch, branch.id).business_id = None
+    session.flush()
+    session.exec(delete(Business).where(Business.id == business.id))
+    session.commit()
+
+def test_reimported_serial_numbers_are_reported_as_duplicates(client, admin_headers, branch, category):
+  url = f"/api/v1/branches/{branch.id}/resources/import"
+  content = (
+    "name,serial_number,category_id\n"
+    f"Laptop,SN-0001,{category.id}\n"
+    f"Monitor,SN-0002,{category.id}\n"
+    f"Laptop repetida,SN-0001,{category.id}\n"
+  )
+  files = {"file": ("recursos.csv", content, "text/csv")}
+
+  first = client.post(url, files=files, headers=admin_headers).json()
+  assert first["imported"] == 2
+  assert first["errors"] == [{"row": 3, "error": "Número de serie duplicado. (SN-0001)"}]
+
+  # El índice único descarta lo ya insertado: nada se duplica al repetir la importación
+  second = client.post(url, files=files, headers=admin_headers).json()
+  assert second["imported"] == 0 and second["failed"] == 3
+
+def test_imported_resources_are_found_by_a_mistyped_asset_number(client, admin_headers, branch, category):
+  content = f"name,serial_number,asset_number,category_id\nLaptop,SN-0001,ACT-2024-00917,{category.id}\n"
+  client.post(
+    f"/api/v1/branches/{branch.id}/resources/import",
+    files={"file": ("recursos.csv", content, "text/csv")},
+    headers=admin_headers
+  )
+
+  # Dígitos transpuestos: solo la coincidencia difusa sobre asset_number lo encuentra
+  response = client.get("/api/v1/resources/search", params={"q": "ACT-2024-00971", "branch_id": str(branch.id)}, headers=admin_headers)
+  assert [item["serial_number"] for item in response.json()["items"]] == ["SN-0001"]
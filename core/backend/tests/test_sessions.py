@@ -0,0 +1,22 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from uuid import uuid4
+from app.security.sessions import REUSED, ROTATED, create_session, rotate_session, session_owner
+
+def test_reused_token_revokes_every_session(redis):
+  user_id = uuid4()
+  create_session(redis, user_id, "laptop")
+  create_session(redis, user_id, "phone")
+
+  assert rotate_session(redis, user_id, "laptop", "laptop-2") == ROTATED
+  assert session_owner(redis, "laptop-2") == str(user_id)
+
+  # El jti ya rotado vuelve a presentarse: se cierran todas las sesiones del usuario
+  assert rotate_session(redis, user_id, "laptop", "laptop-3") == REUSED
+  assert session_owner(redis, "laptop-2") is None
+  assert session_owner(redis, "phone") is None
+  assert session_owner(redis, "laptop-3") is None
@@ -0,0 +1,29 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from passlib.hash import bcrypt
+from sqlmodel import Session
+from app.schemas.models import User
+
+@pytest.fixture
+def legacy_hash(database, user):
+  # Hash con un costo menor que BCRYPT_ROUNDS: se actualiza en el siguiente inicio de sesión válido
+  legacy = bcrypt.using(rounds=4).hash("secreto")
+  with Session(database) as session:
+    session.get(User, user.id).password = legacy
+    session.commit()
+  return legacy
+
+def stored_hash(database, user) -> str:
+  with Session(database) as session:
+    return session.get(User, user.id).password
+
+def test_sign_in_persists_the_rehash(client, redis, database, user, legacy_hash):
+  response = client.post("/api/v1/users/sign-in", json={"email": user.email, "password": "secreto"})
+
+  assert response.status_code == 200
+  assert stored_hash(database, user) != legacy_hash
+  assert bcrypt.verify("secreto", stored_hash(database, user))
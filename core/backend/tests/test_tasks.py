@@ -0,0 +1,42 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from datetime import datetime, timezone, timedelta
+from sqlmodel import Session, delete
+from app.schemas.enum import NotificationType
+from app.schemas.models import Notification, User
+from app.tasks import clean_unverified_users
+from app.utils.conditional import USER_VALIDATOR, VALIDATOR_KEY
+
+@pytest.fixture
+def stale_user(database, user):
+  with Session(database) as session:
+    stale = session.get(User, user.id)
+    stale.is_verified = False
+    stale.created_at = datetime.now(timezone.utc) - timedelta(days=30)
+    session.commit()
+  return user
+
+def test_failed_batch_leaves_redis_untouched(database, redis, stale_user):
+  # La notificación mantiene viva la FK: el DELETE falla y el lote completo se revierte
+  with Session(database) as session:
+    session.add(Notification(receiver_id=stale_user.id, type=NotificationType.SYSTEM, title="Aviso", message="Mensaje"))
+    session.commit()
+
+  clean_unverified_users()
+
+  validator = VALIDATOR_KEY.format(kind=USER_VALIDATOR, id=stale_user.id)
+  assert redis.get(validator) is None
+  with Session(database) as session:
+    assert session.get(User, stale_user.id)
+    session.exec(delete(Notification).where(Notification.receiver_id == stale_user.id))
+    session.commit()
+
+  clean_unverified_users()
+
+  assert redis.get(validator) is not None
+  with Session(database) as session:
+    assert session.get(User, stale_user.id) is None
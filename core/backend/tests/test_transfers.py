@@ -0,0 +1,38 @@
+import os
+import pytest
+
+if not (os.getenv("TEST_DATABASE_URL") and os.getenv("TEST_REDIS_URL")):
+  pytest.skip("TEST_DATABASE_URL / TEST_REDIS_URL no están definidas", allow_module_level=True)
+
+from uuid import uuid4
+from sqlmodel import Session, delete
+from app.schemas.models import ResourceTransferRequest
+
+URL = "/api/v1/branches/transfer-resources"
+
+@pytest.fixture(autouse=True)
+def clean_requests(database, user):
+  yield
+  with Session(database) as session:
+    session.exec(delete(ResourceTransferRequest).where(ResourceTransferRequest.initiated_by == user.id))
+    session.commit()
+
+def test_skipped_batch_is_replayed(client, admin_headers, branch):
+  payload = {"to_branch_id": str(branch.id), "resource_ids": [str(uuid4()), str(uuid4())]}
+  headers = {**admin_headers, "Idempotency-Key": "lote-1"}
+
+  first = client.post(URL, json=payload, headers=headers).json()
+  assert first["transferred"] == [] and first["replayed"] is False
+
+  # El orden de los recursos no cambia la solicitud
+  payload["resource_ids"].reverse()
+  retry = client.post(URL, json=payload, headers=headers).json()
+  assert retry["replayed"] is True
+  assert retry["skipped"] == first["skipped"]
+
+def test_key_reused_with_another_payload_is_rejected(client, admin_headers, branch):
+  headers = {**admin_headers, "Idempotency-Key": "lote-2"}
+  client.post(URL, json={"to_branch_id": str(branch.id), "resource_ids": [str(uuid4())]}, headers=headers)
+
+  response = client.post(URL, json={"to_branch_id": str(branch.id), "resource_ids": [str(uuid4())]}, headers=headers)
+  assert response.status_code == 422